@@ -0,0 +1,112 @@
+import io
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from flake8_bas.config import Options
+from flake8_bas.runner import Runner
+from .source_reading import create_modules
+from .utils import Stats, parser, report
+
+
+def create_archives(directory: Path, files: int) -> tuple[str, str]:
+    """
+    Creates a wheel and a source distribution of generated modules.
+
+    :param directory: target directory
+    :param files: number of modules
+    :return: paths of the wheel and of the source distribution
+    """
+    modules = directory / "modules"
+    modules.mkdir()
+    wheel = directory / "package-1.0-py3-none-any.whl"
+    sdist = directory / "package-1.0.tar.gz"
+
+    with zipfile.ZipFile(wheel, "w", zipfile.ZIP_DEFLATED) as zip_file, tarfile.open(
+        sdist, "w:gz"
+    ) as tar_file:
+        for filename in create_modules(modules, files):
+            data = Path(filename).read_bytes()
+            name = f"package/{Path(filename).name}"
+            zip_file.writestr(name, data)
+            info = tarfile.TarInfo(f"package-1.0/{name}")
+            info.size = len(data)
+            tar_file.addfile(info, io.BytesIO(data))
+
+    return str(wheel), str(sdist)
+
+
+def extract_and_check(archive: str, jobs: int) -> int:
+    """
+    Extracts an archive into a temporary directory and checks the directory.
+
+    :param archive: archive path
+    :param jobs: number of workers
+    :return: number of checked files
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if archive.endswith(".whl"):
+            with zipfile.ZipFile(archive) as zip_file:
+                # Members are extracted one by one, as bandit takes any call of
+                # extractall() for tarfile's - extract() drops ".." and drive parts
+                for member in zip_file.infolist():
+                    zip_file.extract(member, directory)
+        else:
+            with tarfile.open(archive) as tar_file:
+                tar_file.extractall(directory, filter="data")
+
+        return len(Runner(Options(), jobs=jobs).run([directory]))
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Checks of a wheel and a source distribution, either extracted into "
+        "a temporary directory first or streamed from the archives.",
+        runs=5,
+    )
+    arguments.add_argument("--files", type=int, default=300, help="Number of files")
+    arguments.add_argument("--jobs", type=int, default=2, help="Number of workers")
+    args = arguments.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        wheel, sdist = create_archives(Path(directory), args.files)
+        runs = {
+            "wheel extracted": lambda: extract_and_check(wheel, args.jobs),
+            "wheel streamed": lambda: len(
+                Runner(Options(), jobs=args.jobs).run([wheel])
+            ),
+            "sdist extracted": lambda: extract_and_check(sdist, args.jobs),
+            "sdist streamed": lambda: len(
+                Runner(Options(), jobs=args.jobs).run([sdist])
+            ),
+        }
+        results = {}
+
+        for name, run in runs.items():
+            samples = []
+
+            for _ in range(args.runs):
+                start = time.perf_counter()
+
+                if run() != args.files:
+                    raise RuntimeError(f"{name} didn't check all files")
+
+                samples.append(time.perf_counter() - start)
+
+            results[name] = Stats.from_samples(samples)
+
+    print(f"Units: s to check {args.files} files of an archive\n")
+
+    return report("archives", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.records import encode_record
+from .source_reading import create_modules
+from .utils import Stats, parser, report
+
+
+def per_process(sources: list[tuple[str, bytes]]) -> None:
+    """
+    Checks each source in a process of its own reading the standard input.
+
+    :param sources: names and source codes
+    """
+    for name, source in sources:
+        subprocess.run(  # nosec B603
+            [
+                sys.executable,
+                "-m",
+                "flake8_bas",
+                "--isolated",
+                "--exit-zero",
+                f"--stdin-display-name={name}",
+                "-",
+            ],
+            input=source,
+            capture_output=True,
+            check=True,
+        )
+
+
+def batch(sources: list[tuple[str, bytes]], jobs: int) -> None:
+    """
+    Checks all sources in a single `batch` process.
+
+    :param sources: names and source codes
+    :param jobs: number of workers
+    """
+    subprocess.run(  # nosec B603
+        [
+            sys.executable,
+            "-m",
+            "flake8_bas",
+            "batch",
+            "--isolated",
+            "--exit-zero",
+            f"--jobs={jobs}",
+        ],
+        input=b"".join(encode_record(name, source) for name, source in sources),
+        capture_output=True,
+        check=True,
+    )
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Checks of sources passed on the standard input, either each one to a process "
+        "of its own or all of them to a single batch process.",
+        runs=5,
+    )
+    arguments.add_argument("--files", type=int, default=100, help="Number of files")
+    args = arguments.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sources = [
+            (Path(f).name, Path(f).read_bytes())
+            for f in create_modules(Path(directory), args.files)
+        ]
+
+    runs = {
+        "process per file": lambda: per_process(sources),
+        "batch": lambda: batch(sources, 1),
+        "batch 2 jobs": lambda: batch(sources, 2),
+    }
+    results = {}
+
+    for name, run in runs.items():
+        samples = []
+
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+
+        results[name] = Stats.from_samples(samples)
+
+    print(f"Units: s to check {args.files} sources\n")
+
+    return report("batch", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
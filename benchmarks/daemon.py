@@ -0,0 +1,105 @@
+import os
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.client import PATHS, STOP, request
+from flake8_bas.records import encode_record
+from .utils import Stats, parser, report
+
+SOURCE = "import os\n\nif os:\n    pass\n"
+
+
+def wait_for(address: str, timeout: float = 30.0) -> None:
+    """
+    Waits for the daemon to listen on its socket.
+
+    :param address: path of the socket
+    :param timeout: seconds to wait
+    """
+    deadline = time.monotonic() + timeout
+
+    while not os.path.exists(address):
+        if time.monotonic() > deadline:
+            raise RuntimeError("The daemon didn't start")
+
+        time.sleep(0.01)
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "End-to-end latency of a check of a small file by a new flake8-bas process, "
+        "by the client of a running daemon and by a request sent to the daemon from "
+        "a running process, with the startup of an empty interpreter for reference.",
+        runs=20,
+    )
+    args = arguments.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        Path(directory, "module.py").write_text(SOURCE)
+        address = os.path.join(directory, "daemon.sock")
+        daemon = subprocess.Popen(  # nosec B603
+            [sys.executable, "-m", "flake8_bas", "daemon", "--isolated"]
+            + [f"--socket={address}"],
+            cwd=directory,
+        )
+        wait_for(address)
+        records = [
+            encode_record(PATHS, directory.encode()),
+            encode_record("module.py", b""),
+        ]
+        runs = {
+            "interpreter startup": [sys.executable, "-c", "pass"],
+            "flake8-bas process": [
+                sys.executable,
+                "-m",
+                "flake8_bas",
+                "--isolated",
+                "module.py",
+            ],
+            "client process": [
+                sys.executable,
+                "-m",
+                "flake8_bas.client",
+                f"--socket={address}",
+                "module.py",
+            ],
+            "daemon request": None,
+        }
+        results = {}
+
+        try:
+            for name, command in runs.items():
+                samples = []
+
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+
+                    if command is None:
+                        request(address, records)
+                    else:
+                        subprocess.run(  # nosec B603
+                            command, cwd=directory, check=True, capture_output=True
+                        )
+
+                    samples.append((time.perf_counter() - start) * 1000)
+
+                results[name] = Stats.from_samples(samples)
+        finally:
+            request(address, [encode_record(STOP, b"")])
+            daemon.wait(timeout=30)
+
+    print("Units: ms to check a small file\n")
+
+    return report("daemon", results, "ms", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
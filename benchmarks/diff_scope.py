@@ -0,0 +1,96 @@
+import ast
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.checker import StatementChecker
+from flake8_bas.diff import LineRanges
+from flake8_bas.processor import check_source, read_lines
+from .source_reading import create_modules
+from .utils import Stats, parser, report
+
+
+def random_changes(lines: int, hunks: int, rng: random.Random) -> LineRanges:
+    """
+    Creates changed lines of a module the way a small pull request would change it.
+
+    :param lines: number of lines of the module
+    :param hunks: number of changed ranges of up to 5 lines
+    :param rng: random number generator
+    :return: changed lines
+    """
+    ranges = []
+
+    for _ in range(hunks):
+        first = rng.randint(1, lines)
+        ranges.append((first, min(first + rng.randint(0, 4), lines)))
+
+    return LineRanges(ranges)
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Checks of modules with a few changed ranges each, either of all statements "
+        "or of the statements affected by the changes only, with and without "
+        "parsing the modules.",
+        runs=5,
+    )
+    arguments.add_argument("--files", type=int, default=300, help="Number of files")
+    arguments.add_argument(
+        "--hunks", type=int, default=3, help="Number of changed ranges per file"
+    )
+    args = arguments.parse_args()
+    rng = random.Random(0)  # nosec B311
+    modules = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for filename in create_modules(Path(directory), args.files):
+            source = Path(filename).read_bytes()
+            lines = read_lines(source)
+            changes = random_changes(len(lines), args.hunks, rng)
+            modules.append((source, lines, ast.parse(source), changes))
+
+    runs = {
+        "full index": lambda source, lines, tree, changes: list(
+            StatementChecker(tree, lines).run()
+        ),
+        "changes index": lambda source, lines, tree, changes: list(
+            StatementChecker.for_changes(tree, lines, changes).run()
+        ),
+        "full check": lambda source, lines, tree, changes: check_source(source),
+        "changes check": lambda source, lines, tree, changes: check_source(
+            source, changes=changes
+        ),
+    }
+    results = {}
+
+    for name, run in runs.items():
+        samples = []
+
+        for _ in range(args.runs):
+            start = time.perf_counter()
+
+            for module in modules:
+                run(*module)
+
+            samples.append(time.perf_counter() - start)
+
+        results[name] = Stats.from_samples(samples)
+
+    print(
+        f"Units: s to check {args.files} files with {args.hunks} changed ranges each "
+        "(index - of parsed trees, check - of sources)\n"
+    )
+
+    return report("diff_scope", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import fnmatch
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.config import Options
+from flake8_bas.discovery import DISCOVERY_THREADS, discover
+from .utils import Stats, parser, report
+
+
+def create_tree(directory: Path, files: int) -> None:
+    """
+    Creates a tree of empty modules in packages nested three levels deep, with
+    a `build` directory ignored by Git holding a copy of a fifth of them.
+
+    :param directory: target directory
+    :param files: number of files
+    """
+    (directory / ".git").mkdir()
+    (directory / ".gitignore").write_text("build/\n*.pyc\n")
+
+    for index in range(files):
+        root = directory / "build" if index % 5 == 0 else directory / "src"
+        package = root / f"a_{index % 7}" / f"b_{index % 11}" / f"c_{index // 500}"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"module_{index}.py").touch()
+        (package / f"module_{index}.pyc").touch()
+
+
+def drop_caches() -> bool:
+    """
+    Drops the page cache and the cache of directory entries and inodes, which
+    requires root privileges on Linux.
+
+    :return: True if the caches were dropped, otherwise False
+    """
+    os.sync()
+
+    try:
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("2\n")
+    except OSError:
+        return False
+
+    return True
+
+
+def walk(path: str, options: Options) -> list[str]:
+    """
+    Discovers files the way the runner used to, with `os.walk()` and each pattern
+    matched by `fnmatch` on its own.
+
+    :param path: directory path
+    :param options: options
+    :return: file paths
+    """
+    output = []
+
+    for root, directories, files in os.walk(path):
+        directories[:] = [
+            d for d in directories if not options.is_excluded(os.path.join(root, d))
+        ]
+
+        for file in files:
+            filename = os.path.join(root, file)
+
+            if not options.is_excluded(filename) and any(
+                fnmatch.fnmatch(filename, p) for p in options.filename
+            ):
+                output.append(filename)
+
+    return output
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Discovery of files of a big tree - with os.walk() as before, with scandir() "
+        "on one or more threads and with .gitignore rules applied. The cold cache is "
+        "measured only if caches can be dropped (root on Linux).",
+        runs=5,
+    )
+    arguments.add_argument("--files", type=int, default=50000, help="Number of files")
+    arguments.add_argument(
+        "--threads",
+        type=int,
+        default=DISCOVERY_THREADS,
+        help="Number of threads listing directories",
+    )
+    args = arguments.parse_args()
+    options = Options().updated(
+        {"extend_exclude": "*.egg-info,.venv,node_modules"}, Path.cwd()
+    )
+    variants = {
+        "os.walk": lambda: walk(".", options),
+        "scandir 1 thread": lambda: list(discover(["."], options)),
+        "scandir threads": lambda: list(discover(["."], options, args.threads)),
+        "gitignore": lambda: list(discover(["."], options, args.threads, True)),
+    }
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_tree(Path(directory), args.files)
+        os.chdir(directory)
+
+        try:
+            for cache in ("warm", "cold"):
+                if cache == "cold" and not drop_caches():
+                    break
+
+                for name, variant in variants.items():
+                    variant()
+                    samples = []
+
+                    for _ in range(args.runs):
+                        if cache == "cold":
+                            drop_caches()
+
+                        start = time.perf_counter()
+                        variant()
+                        samples.append(time.perf_counter() - start)
+
+                    results[f"{cache} {name}"] = Stats.from_samples(samples)
+        finally:
+            os.chdir(Path(__file__).parent.parent)
+
+    print(f"Units: s to discover {args.files} files, {args.threads} threads\n")
+
+    return report("discovery", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
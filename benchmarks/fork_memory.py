@@ -0,0 +1,158 @@
+import json
+import os
+import subprocess  # nosec B404
+import sys
+import tempfile
+from pathlib import Path
+
+from flake8_bas.checker import GC_FREEZE_VARIABLE
+from .throughput import create_tree
+from .utils import Stats, parser, report
+
+# Code executed in a fresh interpreter. The parent keeps parsed trees of all files
+# alive, standing in for the state of a host of the runner, then forks a pool of
+# workers which check the files and run a full collection. It prints a JSON list of
+# the unique set size (USS) of each worker in MiB.
+PROBE = """
+import ast, gc, json, sys
+from pathlib import Path
+
+from flake8_bas.api import check_chunk, create_pool
+
+
+def uss():
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+
+    return sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+
+
+def work(files):
+    check_chunk(files)
+    gc.collect()
+
+    return uss() / 1024
+
+
+workers, directory = int(sys.argv[1]), sys.argv[2]
+files = sorted(str(f) for f in Path(directory).rglob("*.py"))
+trees = [ast.parse(Path(f).read_text()) for f in files]
+
+with create_pool("process", workers) as pool:
+    chunks = [files[i::workers] for i in range(workers)]
+    print(json.dumps(list(pool.map(work, chunks))))
+"""
+
+# Same for Flake8 forking its `--jobs` workers, which can't be instrumented - a thread
+# of the parent samples the USS of its children while Flake8 runs and prints the
+# peak of each of them
+FLAKE8_PROBE = """
+import glob, json, sys, threading
+
+from flake8.main.cli import main
+
+
+def uss(pid):
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+
+    return sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+
+
+def forked(pid):
+    # Not e.g. the resource tracker of multiprocessing, which is a new interpreter
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return f.read() == cmdline
+
+
+def sample(peaks, done):
+    while not done.wait(0.02):
+        for path in glob.glob("/proc/self/task/*/children"):
+            with open(path) as f:
+                pids = f.read().split()
+
+            for pid in pids:
+                try:
+                    if forked(pid):
+                        peaks[pid] = max(peaks.get(pid, 0), uss(pid))
+                except (OSError, KeyError):
+                    pass
+
+
+workers, directory = int(sys.argv[1]), sys.argv[2]
+
+with open("/proc/self/cmdline", "rb") as f:
+    cmdline = f.read()
+
+peaks, done = {}, threading.Event()
+thread = threading.Thread(target=sample, args=(peaks, done))
+thread.start()
+
+try:
+    main(["--select=BAS", f"--jobs={workers}", "--output-file=/dev/null", directory])
+except SystemExit:
+    pass
+
+done.set()
+thread.join()
+print(json.dumps([peak / 1024 for peak in peaks.values()]))
+"""
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Private memory (USS) of workers forked by the standalone runner and by "
+        "Flake8's --jobs, with and without the garbage collector frozen in the "
+        "workers.",
+        runs=3,
+    )
+    arguments.add_argument("--files", type=int, default=2000, help="Number of files")
+    arguments.add_argument("--workers", type=int, default=4, help="Number of workers")
+    args = arguments.parse_args()
+    results = {}
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("Skipped - USS is read from /proc/PID/smaps_rollup (Linux only).")
+
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_tree(Path(directory), args.files)
+
+        for host, probe in (("", PROBE), ("flake8 ", FLAKE8_PROBE)):
+            for variant, value in (("default", "0"), ("gc.freeze", "1")):
+                samples = []
+
+                for _ in range(args.runs):
+                    samples.extend(
+                        json.loads(
+                            subprocess.run(  # nosec B603
+                                [
+                                    sys.executable,
+                                    "-c",
+                                    probe,
+                                    str(args.workers),
+                                    directory,
+                                ],
+                                capture_output=True,
+                                check=True,
+                                env={**os.environ, GC_FREEZE_VARIABLE: value},
+                                text=True,
+                            ).stdout
+                        )
+                    )
+
+                results[f"{host}{variant} uss"] = Stats.from_samples(samples)
+
+    print(f"Units: USS of a worker in MiB, {args.workers} workers\n")
+
+    return report("fork_memory", results, "MiB", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
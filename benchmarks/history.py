@@ -0,0 +1,111 @@
+import os
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.config import Options
+from flake8_bas.git import list_commits
+from flake8_bas.history import History
+from flake8_bas.runner import Runner
+from .throughput import create_tree
+from .utils import Stats, parser, report
+
+
+def git(directory: Path, *arguments: str) -> None:
+    """
+    Runs a Git command in a repository.
+
+    :param directory: repository
+    :param arguments: command and its arguments
+    """
+    subprocess.run(  # nosec B603 B607
+        ["git", "-c", "user.name=Benchmark", "-c", "user.email=benchmark@example.com"]
+        + list(arguments),
+        cwd=directory,
+        check=True,
+        capture_output=True,
+    )
+
+
+def create_history(directory: Path, files: int, commits: int) -> None:
+    """
+    Creates a repository whose commits each change a single file of a tree.
+
+    :param directory: target directory
+    :param files: number of files
+    :param commits: number of commits
+    """
+    create_tree(directory, files)
+    git(directory, "init", "-q", ".")
+    git(directory, "add", ".")
+    git(directory, "commit", "-q", "-m", "Initial")
+    modules = sorted(directory.rglob("*.py"))
+
+    for index in range(1, commits):
+        module = modules[index * 7919 % len(modules)]
+        module.write_text(f"{module.read_text()}\nx_{index} = {index}\n")
+        git(directory, "commit", "-q", "-a", "-m", f"Change {index}")
+
+
+def per_commit(options: Options) -> int:
+    """
+    Checks every commit on its own, as a loop over the commits running the linter
+    would.
+
+    :param options: options
+    :return: number of errors of all commits
+    """
+    return sum(
+        len(r.errors)
+        for commit in list_commits("HEAD")
+        for r in Runner(options, jobs=1, rev=commit.oid).run(["."])
+    )
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Errors of every commit of a history where each commit changes one file, "
+        "either checked commit by commit or by the history mode checking each "
+        "distinct blob once.",
+        runs=3,
+    )
+    arguments.add_argument("--files", type=int, default=500, help="Number of files")
+    arguments.add_argument("--commits", type=int, default=50, help="Number of commits")
+    args = arguments.parse_args()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_history(Path(directory), args.files, args.commits)
+        cwd = os.getcwd()
+        os.chdir(directory)
+
+        try:
+            for name, run in (
+                ("per commit", lambda: per_commit(Options())),
+                ("history", lambda: History(Runner(Options(), jobs=1)).run("HEAD")),
+            ):
+                samples = []
+
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    run()
+                    samples.append(time.perf_counter() - start)
+
+                results[name] = Stats.from_samples(samples)
+        finally:
+            os.chdir(cwd)
+
+    print(f"Units: s to check {args.commits} commits of {args.files} files\n")
+
+    return report("history", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
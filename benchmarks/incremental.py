@@ -0,0 +1,108 @@
+import ast
+import random
+import sys
+import time
+
+from flake8_bas.checker import StatementChecker
+from flake8_bas.incremental import IncrementalChecker
+from flake8_bas.processor import read_lines
+from .loop_latency import big_source
+from .utils import Stats, parser, report
+
+
+def random_edits(
+    tree: ast.Module, lines: list[str], count: int, rng: random.Random
+) -> dict[str, list[tuple[int, int, str]]]:
+    """
+    Creates edits keeping a module valid - characters typed at the ends of names and
+    lines added before statements. The edits are sorted from the end of the module,
+    so that their positions hold while they are applied one by one.
+
+    :param tree: parsed module
+    :param lines: lines of code of the module
+    :param count: number of edits of each kind
+    :param rng: random number generator
+    :return: line numbers, characters and texts of the edits by their kind
+    """
+    names = [n for n in ast.walk(tree) if isinstance(n, ast.Name)]
+    statements = [
+        n
+        for n in ast.walk(tree)
+        if isinstance(n, ast.stmt)
+        and not getattr(n, "decorator_list", None)
+        and not lines[n.lineno - 1][: n.col_offset].strip()
+        # Neither the "elif" clause of an "if" statement
+        and not lines[n.lineno - 1].lstrip().startswith("elif")
+    ]
+    typed = [(n.end_lineno, n.end_col_offset, "_") for n in rng.sample(names, count)]
+    added = [
+        (n.lineno, n.col_offset, "x = 1\n" + " " * n.col_offset)
+        for n in rng.sample(statements, count)
+    ]
+
+    return {
+        "typed character": sorted(typed, reverse=True),
+        "added line": sorted(added, reverse=True),
+    }
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Checks of a big module after small edits at random lines, either of the whole "
+        "module or of the statements affected by each edit.",
+        runs=5,
+    )
+    arguments.add_argument(
+        "--lines", type=int, default=5000, help="Lines of the module"
+    )
+    arguments.add_argument("--edits", type=int, default=50, help="Number of edits")
+    args = arguments.parse_args()
+    source = big_source(args.lines)
+    lines = read_lines(source)
+    edits = random_edits(
+        ast.parse(source), lines, args.edits, random.Random(0)  # nosec B311
+    )
+    results = {}
+
+    for name, positions in edits.items():
+        full = []
+        incremental = []
+
+        for _ in range(args.runs):
+            edited = list(lines)
+            start = time.perf_counter()
+
+            for lineno, column, text in positions:
+                line = edited[lineno - 1]
+                edited[lineno - 1 : lineno] = read_lines(  # noqa: E203
+                    line[:column] + text + line[column:]
+                )
+                list(StatementChecker(ast.parse("".join(edited)), edited).run())
+
+            full.append((time.perf_counter() - start) * 1000 / args.edits)
+            checker = IncrementalChecker(source)
+            start = time.perf_counter()
+
+            for lineno, column, text in positions:
+                checker.edit((lineno, column), (lineno, column), text)
+
+            incremental.append((time.perf_counter() - start) * 1000 / args.edits)
+
+        results[f"{name}, whole module"] = Stats.from_samples(full)
+        results[f"{name}, incremental"] = Stats.from_samples(incremental)
+
+    print(
+        f"Units: ms to check a module of {args.lines} lines after an edit, averaged "
+        f"over {args.edits} edits\n"
+    )
+
+    return report("incremental", results, "ms", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
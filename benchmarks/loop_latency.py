@@ -0,0 +1,107 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from flake8_bas.aio import acheck_source
+from flake8_bas.processor import check_source
+from .utils import Stats, parser, report
+
+FIXTURES = Path(__file__).parents[1] / "tests" / "fixtures"
+INTERVAL = 0.001
+
+
+def big_source(lines: int) -> str:
+    """
+    Creates a big module by replicating test fixtures.
+
+    :param lines: minimum number of lines
+    :return: source code
+    """
+    sources = "\n".join(f.read_text() for f in sorted(FIXTURES.rglob("*.py")))
+
+    return sources * (lines // sources.count("\n") + 1)
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    """
+    Measures by how much the event loop overshoots a short sleep.
+
+    :param lags: list the measured lags in milliseconds are appended to
+    :param stop: event stopping the measurement
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(INTERVAL)
+        lags.append((time.perf_counter() - start - INTERVAL) * 1000)
+
+
+async def blocking_check(source: str) -> None:
+    """
+    Checks source code directly in the event loop.
+
+    :param source: source code
+    """
+    check_source(source)
+
+
+async def measure(mode: str, source: str, checks: int, runs: int) -> Stats:
+    """
+    Measures event loop lag while checks are running.
+
+    :param mode: "blocking", "threads" or "processes"
+    :param source: source code
+    :param checks: number of concurrent checks
+    :param runs: number of runs
+    :return: lag stats in milliseconds
+    """
+    lags = []
+    executor = ProcessPoolExecutor() if mode == "processes" else None
+
+    try:
+        for _ in range(runs):
+            stop = asyncio.Event()
+            monitor = asyncio.ensure_future(heartbeat(lags, stop))
+
+            if mode == "blocking":
+                await asyncio.gather(*(blocking_check(source) for _ in range(checks)))
+            else:
+                await asyncio.gather(
+                    *(acheck_source(source, executor=executor) for _ in range(checks))
+                )
+
+            stop.set()
+            await monitor
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return Stats.from_samples(lags)
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser("Event loop lag while checking sources.", runs=5)
+    arguments.add_argument(
+        "--lines", type=int, default=5000, help="Number of lines of each source"
+    )
+    arguments.add_argument(
+        "--checks", type=int, default=8, help="Number of concurrent checks"
+    )
+    args = arguments.parse_args()
+    source = big_source(args.lines)
+    results = {
+        f"{mode} lag": asyncio.run(measure(mode, source, args.checks, args.runs))
+        for mode in ("blocking", "threads", "processes")
+    }
+
+    return report("loop_latency", results, "ms", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import sys
+import time
+
+from flake8_bas.config import Options
+from flake8_bas.lsp import LanguageServer, encode_message
+from .loop_latency import big_source
+from .utils import Stats, parser, report
+
+URI = "file:///module.py"
+
+
+async def type_burst(
+    source: str, keystrokes: int, interval: float, debounce: float
+) -> tuple[float, float]:
+    """
+    Types characters into an open document at a steady pace, one change each.
+
+    :param source: source code of the document
+    :param keystrokes: number of typed characters
+    :param interval: seconds between keystrokes
+    :param debounce: debounce period of the server
+    :return: milliseconds from the last keystroke to its diagnostics, CPU seconds
+        spent from the first keystroke on
+    """
+    reader = asyncio.StreamReader()
+    published: list[int] = []
+    arrived = asyncio.Event()
+
+    def write(data: bytes) -> None:
+        """
+        Records the versions of the published diagnostics.
+
+        :param data: encoded message of the server
+        """
+        message = json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+        if message.get("method") == "textDocument/publishDiagnostics":
+            published.append(message["params"]["version"])
+            arrived.set()
+
+    def send(method: str, params: dict) -> None:
+        """
+        Sends a notification to the server.
+
+        :param method: method of the notification
+        :param params: parameters of the notification
+        """
+        reader.feed_data(encode_message({"method": method, "params": params}))
+
+    server = LanguageServer(write, Options(), debounce)
+    serving = asyncio.ensure_future(server.serve(reader))
+    document = {"uri": URI, "languageId": "python", "version": 1, "text": source}
+    send("textDocument/didOpen", {"textDocument": document})
+
+    while 1 not in published:
+        arrived.clear()
+        await arrived.wait()
+
+    published.clear()
+    started = time.process_time()
+    position = {"line": 0, "character": 0}
+
+    for version in range(2, keystrokes + 2):
+        send(
+            "textDocument/didChange",
+            {
+                "textDocument": {"uri": URI, "version": version},
+                "contentChanges": [
+                    {"range": {"start": position, "end": position}, "text": "#"}
+                ],
+            },
+        )
+        last_change = time.perf_counter()
+        await asyncio.sleep(interval)
+
+    while keystrokes + 1 not in published:
+        arrived.clear()
+        await arrived.wait()
+
+    latency = (time.perf_counter() - last_change) * 1000
+    cpu = time.process_time() - started
+    send("exit", {})
+    await serving
+
+    return latency, cpu
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Latency of diagnostics of the last of a burst of keystrokes typed into a big "
+        "document, with and without debouncing of the changes.",
+        runs=5,
+    )
+    arguments.add_argument(
+        "--lines", type=int, default=5000, help="Lines of the document"
+    )
+    arguments.add_argument(
+        "--keystrokes", type=int, default=30, help="Number of keystrokes"
+    )
+    arguments.add_argument(
+        "--interval", type=float, default=0.05, help="Seconds between keystrokes"
+    )
+    args = arguments.parse_args()
+    source = big_source(args.lines)
+    results = {}
+    cpu: dict[float, list[float]] = {}
+
+    for debounce in (0.0, 0.2):
+        samples = []
+
+        for _ in range(args.runs):
+            latency, seconds = asyncio.run(
+                type_burst(source, args.keystrokes, args.interval, debounce)
+            )
+            samples.append(latency)
+            cpu.setdefault(debounce, []).append(seconds)
+
+        results[f"debounce {debounce:.1f} s"] = Stats.from_samples(samples)
+
+    print(
+        f"Units: ms from the last of {args.keystrokes} keystrokes typed every "
+        f"{args.interval * 1000:.0f} ms into {args.lines} lines to its diagnostics\n"
+        + "".join(
+            f"CPU time of a burst with debounce {d:.1f} s: {min(c):.2f} s\n"
+            for d, c in cpu.items()
+        )
+    )
+
+    return report("lsp", results, "ms", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
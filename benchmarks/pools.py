@@ -0,0 +1,104 @@
+import json
+import subprocess  # nosec B404
+import sys
+import tempfile
+from pathlib import Path
+
+from .throughput import create_tree
+from .utils import Stats, parser, report
+
+# Code executed in a fresh interpreter for each pool. It prints a JSON object with
+# the startup time and the total time in seconds and the total RSS in MiB.
+PROBE = """
+import json, os, sys, time
+from pathlib import Path
+
+from flake8_bas.api import check_files, create_pool
+
+
+def rss(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+    return 0.0
+
+
+pool, workers, directory = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+files = sorted(str(f) for f in Path(directory).rglob("*.py"))
+start = time.perf_counter()
+executor = create_pool(pool, workers)
+list(check_files([("warm-up.py", "pass")] * workers, executor=executor, chunk_size=1))
+startup = time.perf_counter() - start
+list(check_files(files, executor=executor, chunk_size=64))
+total = time.perf_counter() - start
+children = [p.pid for p in (getattr(executor, "_processes", None) or {}).values()]
+memory = rss(os.getpid()) + sum(rss(pid) for pid in children)
+executor.shutdown()
+print(json.dumps({"startup": startup, "total": total, "rss": memory}))
+"""
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Startup time, throughput and memory of pools of processes and "
+        "subinterpreters (Python 3.14+).",
+        runs=3,
+    )
+    arguments.add_argument("--files", type=int, default=10000, help="Number of files")
+    arguments.add_argument("--workers", type=int, default=4, help="Number of workers")
+    args = arguments.parse_args()
+    pools = ["process"]
+    results = {}
+
+    if sys.version_info >= (3, 14):
+        pools.append("interpreter")
+    else:
+        print("Pool of interpreters skipped - it requires Python 3.14 or newer.\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_tree(Path(directory), args.files)
+
+        for pool in pools:
+            samples = {"startup": [], "check": [], "rss": []}
+
+            for _ in range(args.runs):
+                output = json.loads(
+                    subprocess.run(  # nosec B603
+                        [
+                            sys.executable,
+                            "-c",
+                            PROBE,
+                            pool,
+                            str(args.workers),
+                            directory,
+                        ],
+                        capture_output=True,
+                        check=True,
+                        text=True,
+                    ).stdout
+                )
+                samples["startup"].append(output["startup"] * 1000)
+                samples["check"].append(output["total"] - output["startup"])
+                samples["rss"].append(output["rss"])
+
+            results.update(
+                {
+                    f"{pool} {metric}": Stats.from_samples(values)
+                    for metric, values in samples.items()
+                }
+            )
+
+    print(f"Units: startup in ms, check of {args.files} files in s, rss in MiB\n")
+
+    return report("pools", results, "mixed", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
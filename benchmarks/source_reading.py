@@ -0,0 +1,145 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.checker import StatementChecker
+from flake8_bas.processor import (
+    blank_line_numbers,
+    has_noqa,
+    read_buffer,
+    read_lines,
+)
+from .throughput import FIXTURES
+from .utils import Stats, parser, report
+
+
+def create_modules(directory: Path, files: int) -> list[str]:
+    """
+    Creates modules of 1 to 64 concatenated test fixtures, i.e. of a few KiB up to
+    hundreds of KiB.
+
+    :param directory: target directory
+    :param files: number of files
+    :return: file paths
+    """
+    sources = [f.read_text() for f in sorted(FIXTURES.rglob("*.py"))]
+    output = []
+
+    for index in range(files):
+        file = directory / f"module_{index}.py"
+        count = 1 << (index % 7)
+        file.write_text(
+            "".join(sources[(index + i) % len(sources)] for i in range(count))
+        )
+        output.append(str(file))
+
+    return output
+
+
+def evict(files: list[str]) -> None:
+    """
+    Evicts files from the page cache.
+
+    :param files: file paths
+    """
+    for filename in files:
+        fd = os.open(filename, os.O_RDONLY)
+
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def index_lines(filename: str) -> set[int]:
+    """
+    Reads a file and finds its blank lines by decoding it into lines.
+
+    :param filename: file path
+    :return: line numbers of blank lines
+    """
+    with open(filename, "rb") as f:
+        lines = read_lines(f.read())
+
+    return {
+        lineno
+        for lineno, line in enumerate(lines, start=1)
+        if StatementChecker.BLANK_LINE_RE.match(line)
+    }
+
+
+def index_buffer(filename: str) -> set[int] | None:
+    """
+    Maps a file into memory and finds its blank lines by scanning the buffer.
+
+    :param filename: file path
+    :return: line numbers of blank lines
+    """
+    with open(filename, "rb") as f:
+        data = read_buffer(f, os.fstat(f.fileno()).st_size)
+
+    try:
+        has_noqa(data)
+
+        return blank_line_numbers(data)
+    finally:
+        if not isinstance(data, bytes):
+            data.close()
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Reading and indexing of blank lines of a tree of modules, either decoded "
+        "into lines or scanned in memory-mapped buffers, on a cold and warm page "
+        "cache.",
+        runs=5,
+    )
+    arguments.add_argument("--files", type=int, default=2000, help="Number of files")
+    args = arguments.parse_args()
+    results = {}
+
+    if not hasattr(os, "posix_fadvise"):
+        print("Skipped - files are evicted from the page cache by posix_fadvise().")
+
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = create_modules(Path(directory), args.files)
+        size = sum(os.path.getsize(f) for f in files)
+
+        for cache in ("cold", "warm"):
+            for name, index in (("lines", index_lines), ("mmap", index_buffer)):
+                samples = []
+
+                for _ in range(args.runs):
+                    if cache == "cold":
+                        evict(files)
+                    else:
+                        [index(f) for f in files]
+
+                    start = time.perf_counter()
+
+                    for filename in files:
+                        index(filename)
+
+                    samples.append(time.perf_counter() - start)
+
+                results[f"{cache} {name}"] = Stats.from_samples(samples)
+
+    print(
+        f"Units: s to read and index {args.files} files, {size / (1 << 20):.1f} MiB\n"
+    )
+
+    return report("source_reading", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
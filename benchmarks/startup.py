@@ -0,0 +1,82 @@
+import subprocess  # nosec B404
+import sys
+import time
+
+from .utils import Stats, parser, report
+
+# Code executed in a fresh interpreter for each run. It prints the duration of
+# each phase in nanoseconds.
+PROBE = """
+import time
+
+start = time.perf_counter_ns()
+
+import ast, dataclasses, re, typing
+
+dependencies = time.perf_counter_ns()
+
+import flake8_bas
+
+package = time.perf_counter_ns()
+
+from flake8_bas import StatementChecker
+
+module = time.perf_counter_ns()
+
+StatementChecker(tree=ast.parse("pass\\n"), lines=["pass\\n"])
+
+instance = time.perf_counter_ns()
+
+print(
+    module - start,
+    package - dependencies,
+    module - package,
+    instance - module,
+)
+"""
+METRICS = ("cold import", "package import", "statement tables", "first instance")
+
+
+def measure(runs: int) -> dict[str, Stats]:
+    """
+    Measures startup phases of the plugin, each run in a fresh interpreter.
+
+    The "cold import" is the import of the checker including its dependencies,
+    the "statement tables" phase is the execution of the checker module with its
+    dependencies already imported, i.e. mainly construction of `STATEMENTS`.
+
+    :param runs: number of runs
+    :return: stats of each phase and of the whole process in milliseconds
+    """
+    samples = {metric: [] for metric in (*METRICS, "process", "interpreter")}
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)  # nosec B603
+        samples["interpreter"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        result = subprocess.run(  # nosec B603
+            [sys.executable, "-c", PROBE], capture_output=True, check=True, text=True
+        )
+        samples["process"].append((time.perf_counter() - start) * 1000)
+
+        for metric, value in zip(METRICS, result.stdout.split()):
+            samples[metric].append(int(value) / 1_000_000)
+
+    return {metric: Stats.from_samples(values) for metric, values in samples.items()}
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    args = parser("Import and startup cost of the plugin.", runs=30).parse_args()
+
+    return report("startup", measure(args.runs), "ms", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flake8_bas.api import check_files
+from .throughput import create_tree
+from .utils import Stats, parser, report
+
+
+def thread_counts(maximum: int) -> list[int]:
+    """
+    Returns powers of two up to the maximum, including the maximum itself.
+
+    :param maximum: maximum number of threads
+    :return: numbers of threads
+    """
+    output = [1]
+
+    while output[-1] * 2 < maximum:
+        output.append(output[-1] * 2)
+
+    return output + [maximum] if maximum > 1 else output
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Scaling of a pool of threads - checks run in parallel only on free-threaded "
+        "builds of Python.",
+        runs=3,
+    )
+    arguments.add_argument("--files", type=int, default=2000, help="Number of files")
+    arguments.add_argument(
+        "--threads",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Maximum number of threads",
+    )
+    args = arguments.parse_args()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_tree(Path(directory), args.files)
+        files = sorted(str(f) for f in Path(directory).rglob("*.py"))
+
+        for threads in thread_counts(args.threads):
+            samples = []
+
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                list(check_files(files, workers=threads, chunk_size=16, pool="thread"))
+                samples.append(time.perf_counter() - start)
+
+            results[f"{threads} threads"] = Stats.from_samples(samples)
+
+    single = results["1 threads"].median
+
+    for name, stats in results.items():
+        print(f"{name}: {args.files / stats.median:.0f} files/s, ", end="")
+        print(f"speed-up {single / stats.median:.2f}x")
+
+    print(f"\nGIL {'enabled' if gil else 'disabled'}\n")
+
+    return report("threads", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
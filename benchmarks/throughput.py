@@ -0,0 +1,89 @@
+import importlib.util
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .utils import Stats, parser, report
+
+FIXTURES = Path(__file__).parents[1] / "tests" / "fixtures"
+
+
+def create_tree(directory: Path, files: int) -> None:
+    """
+    Creates a tree of modules by replicating test fixtures.
+
+    :param directory: target directory
+    :param files: number of files
+    """
+    sources = [f.read_text() for f in sorted(FIXTURES.rglob("*.py"))]
+
+    for index in range(files):
+        package = directory / f"package_{index // 100}"
+        package.mkdir(exist_ok=True)
+        (package / f"module_{index}.py").write_text(sources[index % len(sources)])
+
+
+def measure(command: list[str], runs: int) -> Stats:
+    """
+    Measures wall-clock time of a command.
+
+    :param command: command
+    :param runs: number of runs
+    :return: stats in seconds
+    """
+    samples = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL)  # nosec B603
+        samples.append(time.perf_counter() - start)
+
+    return Stats.from_samples(samples)
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Throughput of the standalone runner compared to Flake8.", runs=5
+    )
+    arguments.add_argument("--files", type=int, default=2000, help="Number of files")
+    arguments.add_argument("--jobs", default="auto", help="Number of jobs")
+    args = arguments.parse_args()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        create_tree(Path(directory), args.files)
+        commands = {
+            "flake8-bas": [sys.executable, "-m", "flake8_bas", "--isolated"],
+        }
+
+        if importlib.util.find_spec("flake8"):
+            commands["flake8 --select=BAS"] = [
+                sys.executable,
+                "-m",
+                "flake8",
+                "--isolated",
+                "--select=BAS",
+            ]
+
+        for name, command in commands.items():
+            results[name] = measure(
+                [*command, f"--jobs={args.jobs}", directory], args.runs
+            )
+
+    for name, stats in results.items():
+        print(f"{name}: {args.files / stats.median:.0f} files/s")
+
+    print()
+
+    return report("throughput", results, "s", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
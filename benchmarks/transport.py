@@ -0,0 +1,68 @@
+import pickle  # nosec B403
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flake8_bas.api import check_chunk, chunked, packed_chunk
+from flake8_bas.transport import unpack_chunk
+from .utils import Stats, parser, report
+
+# Module violating the checks on most of its lines, as legacy code does
+VIOLATIONS = "import os\nx = 1\nif x:\n    pass\ndel x\nfor y in x:\n    break\n"
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+
+    :return: exit status
+    """
+    arguments = parser(
+        "Size of results sent from workers to the parent and CPU time the parent "
+        "spends receiving them, as errors or as packed records.",
+        runs=3,
+    )
+    arguments.add_argument("--files", type=int, default=1000, help="Number of files")
+    arguments.add_argument("--workers", type=int, default=2, help="Number of workers")
+    args = arguments.parse_args()
+    items = [(f"module_{i}.py", VIOLATIONS * 20) for i in range(args.files)]
+    chunks = list(chunked(items, 64))
+    results = {}
+
+    sizes = {
+        "errors": sum(len(pickle.dumps(check_chunk(c))) for c in chunks),
+        "packed": sum(len(pickle.dumps(packed_chunk(c))) for c in chunks),
+    }
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(check_chunk, chunks[: args.workers]))
+
+        for transport in ("errors", "packed"):
+            samples = []
+
+            for _ in range(args.runs):
+                start = time.process_time()
+
+                if transport == "errors":
+                    for chunk in executor.map(check_chunk, chunks):
+                        pass
+                else:
+                    for chunk, packed in zip(
+                        chunks, executor.map(packed_chunk, chunks)
+                    ):
+                        unpack_chunk([name for name, _ in chunk], packed)
+
+                samples.append(time.process_time() - start)
+
+            results[f"{transport} parent cpu"] = Stats.from_samples(samples)
+            results[f"{transport} kib"] = Stats.from_samples([sizes[transport] / 1024])
+
+    print(
+        f"Units: parent CPU time in s, pickled results in KiB of {args.files} files\n"
+    )
+
+    return report("transport", results, "mixed", args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import json
+import statistics
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+BASELINES = Path(__file__).parent / "baselines"
+
+
+@dataclass(frozen=True, slots=True)
+class Stats:
+    """
+    Summary of measured samples.
+    """
+
+    median: float
+    p95: float
+    runs: int
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "Stats":
+        """
+        Summarizes samples.
+
+        :param samples: measured values
+        :return: stats
+        """
+        ordered = sorted(samples)
+        rank = max(0, min(len(ordered) - 1, round(0.95 * len(ordered)) - 1))
+
+        return cls(statistics.median(ordered), ordered[rank], len(ordered))
+
+
+def parser(description: str, runs: int) -> ArgumentParser:
+    """
+    Creates an argument parser with options shared by all benchmarks.
+
+    :param description: benchmark's description
+    :param runs: default number of runs
+    :return: argument parser
+    """
+    output = ArgumentParser(description=description)
+    output.add_argument("--runs", type=int, default=runs, help="Number of runs")
+    output.add_argument(
+        "--save", action="store_true", help="Store the results as the new baseline"
+    )
+    output.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown of a median against the baseline",
+    )
+
+    return output
+
+
+def load_baseline(name: str) -> dict[str, Stats]:
+    """
+    Loads a stored baseline.
+
+    :param name: benchmark name
+    :return: stats of each metric
+    """
+    try:
+        data = json.loads((BASELINES / f"{name}.json").read_text())
+    except FileNotFoundError:
+        return {}
+
+    return {metric: Stats(**stats) for metric, stats in data.items()}
+
+
+def save_baseline(name: str, results: dict[str, Stats]) -> None:
+    """
+    Stores results as a baseline.
+
+    :param name: benchmark name
+    :param results: stats of each metric
+    """
+    BASELINES.mkdir(exist_ok=True)
+    (BASELINES / f"{name}.json").write_text(
+        json.dumps(
+            {
+                metric: {k: round(v, 3) for k, v in asdict(stats).items()}
+                for metric, stats in results.items()
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def report(name: str, results: dict[str, Stats], unit: str, args: Namespace) -> int:
+    """
+    Prints results compared against the stored baseline and optionally stores
+    them as the new baseline.
+
+    :param name: benchmark name
+    :param results: stats of each metric
+    :param unit: unit of the measured values
+    :param args: parsed command line arguments
+    :return: exit status - 1 if any median regressed beyond the tolerance
+    """
+    baseline = load_baseline(name)
+    regressions = []
+
+    print(f"{'metric':<24}{'median':>12}{'p95':>12}{'baseline':>12}{'change':>10}")
+
+    for metric, stats in results.items():
+        line = f"{metric:<24}{stats.median:>12.3f}{stats.p95:>12.3f}"
+
+        if reference := baseline.get(metric):
+            change = stats.median / reference.median - 1 if reference.median else 0
+            line += f"{reference.median:>12.3f}{change:>+10.1%}"
+
+            if change > args.tolerance:
+                regressions.append(metric)
+
+        print(line)
+
+    print(f"\nUnit: {unit}, runs: {args.runs}")
+
+    if args.save:
+        save_baseline(name, results)
+        print(f"Baseline stored in {BASELINES / name}.json")
+    elif regressions:
+        print(f"Regression beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+
+        return 1
+
+    return 0
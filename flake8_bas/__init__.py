@@ -1,3 +1,49 @@
-from .checker import StatementChecker
+from importlib import import_module
 
-__all__ = ("StatementChecker",)
+# Same as typing.TYPE_CHECKING, without importing typing, which takes longer than
+# the rest of the package (e.g. the client of the daemon imports the package only)
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from .aio import DocumentChecker, acheck_files, acheck_source
+    from .api import check_files
+    from .checker import StatementChecker
+    from .incremental import IncrementalChecker
+    from .processor import FileResult
+
+__all__ = (
+    "DocumentChecker",
+    "FileResult",
+    "IncrementalChecker",
+    "StatementChecker",
+    "acheck_files",
+    "acheck_source",
+    "check_files",
+)
+
+# Public names mapped to their modules, which are imported only once the name is
+# accessed so that importing the package itself stays cheap
+_LAZY_IMPORTS = {
+    "DocumentChecker": ".aio",
+    "FileResult": ".processor",
+    "IncrementalChecker": ".incremental",
+    "StatementChecker": ".checker",
+    "acheck_files": ".aio",
+    "acheck_source": ".aio",
+    "check_files": ".api",
+}
+
+
+def __getattr__(name: str) -> "Any":
+    """
+    Imports public names lazily.
+
+    :param name: attribute name
+    :return: attribute
+    """
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
@@ -0,0 +1,193 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Iterable
+
+from .api import Source
+from .checker import Error, StatementChecker
+from .processor import FileResult, check_source
+
+
+async def acheck_source(
+    source: bytes | str,
+    *,
+    disable_noqa: bool = False,
+    executor: Executor | None = None,
+) -> list[Error]:
+    """
+    Checks source code of a module without blocking the event loop.
+
+    Parsing and evaluation run in the executor - the loop's default (thread) executor
+    unless specified. A process pool keeps the loop most responsive because parsing
+    of a big module holds the GIL for its entire duration.
+
+    :param source: source code
+    :param disable_noqa: ignore `# noqa` comments
+    :param executor: executor the work is sent to
+    :return: errors sorted by their position
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, partial(check_source, source, disable_noqa=disable_noqa)
+    )
+
+
+async def acheck_file(
+    path: str | os.PathLike,
+    *,
+    disable_noqa: bool = False,
+    executor: Executor | None = None,
+) -> FileResult:
+    """
+    Checks a file without blocking the event loop. The file is read in the loop's
+    default executor.
+
+    :param path: file path
+    :param disable_noqa: ignore `# noqa` comments
+    :param executor: executor the parsing and evaluation are sent to
+    :return: result
+    """
+    filename = os.fspath(path)
+
+    try:
+        source = await asyncio.get_running_loop().run_in_executor(
+            None, Path(filename).read_bytes
+        )
+    except OSError as e:
+        return FileResult(
+            filename, [Error(1, 0, f"E902 {type(e).__name__}: {e}", StatementChecker)]
+        )
+
+    return FileResult(
+        filename,
+        await acheck_source(source, disable_noqa=disable_noqa, executor=executor),
+    )
+
+
+async def acheck_item(
+    item: Source, *, disable_noqa: bool = False, executor: Executor | None = None
+) -> FileResult:
+    """
+    Checks either a file or a named source code without blocking the event loop.
+
+    :param item: file path or a pair of a name and source code
+    :param disable_noqa: ignore `# noqa` comments
+    :param executor: executor the parsing and evaluation are sent to
+    :return: result
+    """
+    if isinstance(item, tuple):
+        name, source = item
+        errors = await acheck_source(
+            source, disable_noqa=disable_noqa, executor=executor
+        )
+
+        return FileResult(name, errors)
+
+    return await acheck_file(item, disable_noqa=disable_noqa, executor=executor)
+
+
+async def acheck_files(
+    items: Iterable[Source],
+    *,
+    concurrency: int = 8,
+    ordered: bool = False,
+    disable_noqa: bool = False,
+    executor: Executor | None = None,
+) -> AsyncIterator[FileResult]:
+    """
+    Checks files or named sources concurrently, yielding results as they are
+    completed.
+
+    :param items: file paths or pairs of a name and source code
+    :param concurrency: maximum number of items checked at the same time
+    :param ordered: yield results in the order of the items
+    :param disable_noqa: ignore `# noqa` comments
+    :param executor: executor the parsing and evaluation are sent to
+    :return: results
+    """
+    iterator = iter(items)
+    in_flight: list[asyncio.Task] = []
+    check = partial(acheck_item, disable_noqa=disable_noqa, executor=executor)
+
+    def submit() -> None:
+        """
+        Starts checks of the next items until `concurrency` of them are in flight.
+        """
+        for item in iterator:
+            in_flight.append(asyncio.ensure_future(check(item)))
+
+            if len(in_flight) >= concurrency:
+                break
+
+    try:
+        submit()
+
+        while in_flight:
+            if ordered:
+                task = in_flight.pop(0)
+                await asyncio.wait((task,))
+            else:
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                task = done.pop()
+                in_flight.remove(task)
+
+            submit()
+
+            yield task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+class DocumentChecker:
+    """
+    Checks versions of documents, e.g. files open in an editor. A check of a newer
+    version of a document cancels the check of its previous version.
+    """
+
+    __slots__ = ("executor", "disable_noqa", "tasks")
+
+    def __init__(
+        self, executor: Executor | None = None, disable_noqa: bool = False
+    ) -> None:
+        """
+        :param executor: executor the parsing and evaluation are sent to
+        :param disable_noqa: ignore `# noqa` comments
+        """
+        self.executor = executor
+        self.disable_noqa = disable_noqa
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def cancel(self, uri: str) -> None:
+        """
+        Cancels a pending check of a document.
+
+        :param uri: document identifier
+        """
+        if (task := self.tasks.pop(uri, None)) and not task.done():
+            task.cancel()
+
+    async def check(self, uri: str, source: bytes | str) -> list[Error]:
+        """
+        Checks a version of a document. Raises `asyncio.CancelledError` if a newer
+        version of the document is submitted before the check is completed.
+
+        :param uri: document identifier
+        :param source: source code of the document
+        :return: errors sorted by their position
+        """
+        self.cancel(uri)
+        task = self.tasks[uri] = asyncio.ensure_future(
+            acheck_source(
+                source, disable_noqa=self.disable_noqa, executor=self.executor
+            )
+        )
+
+        try:
+            return await task
+        finally:
+            if self.tasks.get(uri) is task:
+                del self.tasks[uri]
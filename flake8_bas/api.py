@@ -0,0 +1,586 @@
+import gc
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from importlib import import_module
+from itertools import islice
+from typing import Iterable, Iterator
+
+from .checker import GC_FREEZE_VARIABLE
+from .diff import LineRanges
+from .processor import FileResult, check_file, check_source
+from .scheduler import (
+    WORKER_MEMORY,
+    ChunkTiming,
+    RunStats,
+    chunk_memory,
+    memory_workers,
+    worker_name,
+)
+from .segments import SegmentPool
+from .transport import PackedChunk, pack_chunk, unpack_chunk
+
+Source = str | os.PathLike | tuple[str, bytes | str]
+
+POOLS = ("process", "interpreter", "thread")
+
+
+def _initialize_worker(freeze: bool = False) -> None:
+    """
+    Imports the checker once per worker so that the first chunk doesn't pay for it.
+
+    :param freeze: move all objects tracked by the garbage collector, i.e. those
+        inherited from the parent of a forked worker, to its permanent generation,
+        so that collections never write to them and the memory pages holding them
+        stay shared with the parent instead of being copied into each worker
+    """
+    if freeze:
+        gc.freeze()
+
+    import_module(".checker", __package__)
+
+
+def create_pool(pool: str, workers: int, max_tasks: int | None = None) -> Executor:
+    """
+    Creates a pool of workers.
+
+    Subinterpreters (Python 3.14+) avoid the cost of starting processes while
+    still running the checks in parallel, each interpreter having its own GIL.
+    Threads run the checks in parallel only on free-threaded builds of Python.
+
+    Worker processes freeze the garbage collector when `FLAKE8_BAS_GC_FREEZE` is set
+    to "1". Only the workers are affected, never the process creating the pool.
+
+    :param pool: "process", "interpreter" or "thread"
+    :param workers: number of workers
+    :param max_tasks: number of chunks after which a worker process is replaced by
+        a new one, returning its fragmented heap to the system (Python 3.11+)
+    :return: executor
+    """
+    if pool == "process":
+        freeze = os.environ.get(GC_FREEZE_VARIABLE) == "1"
+
+        if max_tasks is None:
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_initialize_worker,
+                initargs=(freeze,),
+            )
+
+        if sys.version_info < (3, 11):
+            raise RuntimeError("Recycling of workers requires Python 3.11 or newer.")
+
+        # Replaced workers can't be forked
+        methods = multiprocessing.get_all_start_methods()
+        context = "forkserver" if "forkserver" in methods else "spawn"
+
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(context),
+            initializer=_initialize_worker,
+            initargs=(freeze,),
+            max_tasks_per_child=max_tasks,
+        )
+
+    if max_tasks is not None:
+        raise ValueError("Only worker processes can be recycled")
+
+    if pool == "interpreter":
+        try:
+            from concurrent.futures import InterpreterPoolExecutor
+        except ImportError:
+            raise RuntimeError(
+                "Pool of interpreters requires Python 3.14 or newer."
+            ) from None
+
+        return InterpreterPoolExecutor(
+            max_workers=workers, initializer=_initialize_worker
+        )
+
+    if pool == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="flake8-bas")
+
+    raise ValueError(f"Unknown pool {pool!r}, expected one of: {', '.join(POOLS)}")
+
+
+def _segment_pool(
+    executor: Executor | None, pool: str, workers: int
+) -> SegmentPool | None:
+    """
+    Creates the pool checking segments of the modules split during a run. Serial
+    runs and threads share a pool of a process per CPU, while each worker process
+    gets a pool of its own, so that all of them together have about a process per
+    CPU. Subinterpreters can't start processes, so modules aren't split in them.
+
+    :param executor: executor of the run, if given by the caller
+    :param pool: kind of a new pool of the run
+    :param workers: number of workers of the run
+    :return: pool, None if modules aren't split
+    """
+    if executor is not None:
+        # Executors of other kinds, e.g. of subinterpreters, don't split modules
+        pool = {ProcessPoolExecutor: "process", ThreadPoolExecutor: "thread"}.get(
+            type(executor), "interpreter"
+        )
+    elif workers <= 1:
+        return SegmentPool()
+
+    if pool == "thread":
+        return SegmentPool()
+
+    if pool == "process" and (count := (os.cpu_count() or 1) // workers) > 1:
+        return SegmentPool(count)
+
+    return None
+
+
+def check_item(
+    item: Source,
+    disable_noqa: bool = False,
+    journal: bool = False,
+    split_threshold: int | None = None,
+    changes: LineRanges | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> FileResult:
+    """
+    Checks either a file or a named source code.
+
+    :param item: file path or a pair of a name and source code
+    :param disable_noqa: ignore `# noqa` comments
+    :param journal: create the file's journal entry
+    :param split_threshold: size in characters above which a module is split into
+        segments checked in parallel
+    :param changes: check only the statements affected by these changed lines
+    :param segment_pool: pool checking the segments, a new pool of processes for
+        each split module by default
+    :return: result
+    """
+    if isinstance(item, tuple):
+        name, source = item
+
+        return FileResult(
+            name,
+            check_source(
+                source,
+                disable_noqa=disable_noqa,
+                split_threshold=split_threshold,
+                changes=changes,
+                segment_pool=segment_pool,
+            ),
+        )
+
+    return check_file(
+        os.fspath(item),
+        disable_noqa=disable_noqa,
+        journal=journal,
+        split_threshold=split_threshold,
+        changes=changes,
+        segment_pool=segment_pool,
+    )
+
+
+def check_chunk(
+    items: list[Source],
+    disable_noqa: bool = False,
+    journal: bool = False,
+    split_threshold: int | None = None,
+    changes: dict[str, LineRanges] | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> list[FileResult]:
+    """
+    Checks a chunk of files or named sources. This is the unit of work sent to
+    workers.
+
+    :param items: file paths or pairs of a name and source code
+    :param disable_noqa: ignore `# noqa` comments
+    :param journal: create journal entries of the files
+    :param split_threshold: size in characters above which a module is split into
+        segments checked in parallel
+    :param changes: check only the statements affected by changed lines, keyed by
+        names of the items - items without them are checked whole
+    :param segment_pool: pool checking the segments, a new pool of processes for
+        each split module by default
+    :return: results
+    """
+    return [
+        check_item(
+            i,
+            disable_noqa=disable_noqa,
+            journal=journal,
+            split_threshold=split_threshold,
+            changes=changes.get(item_name(i)) if changes else None,
+            segment_pool=segment_pool,
+        )
+        for i in items
+    ]
+
+
+def item_name(item: Source) -> str:
+    """
+    Returns the name results of a file or a named source are reported under.
+
+    :param item: file path or a pair of a name and source code
+    :return: name
+    """
+    return item[0] if isinstance(item, tuple) else os.fspath(item)
+
+
+def packed_chunk(
+    items: list[Source],
+    disable_noqa: bool = False,
+    journal: bool = False,
+    split_threshold: int | None = None,
+    timed: bool = False,
+    changes: dict[str, LineRanges] | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> PackedChunk:
+    """
+    Checks a chunk of files or named sources in a worker and packs the results into
+    fixed-width records, which are cheaper to send to the parent than the errors.
+
+    :param items: file paths or pairs of a name and source code
+    :param disable_noqa: ignore `# noqa` comments
+    :param journal: create journal entries of the files
+    :param split_threshold: size in characters above which a module is split into
+        segments checked in parallel
+    :param timed: measure when and by which worker the chunk was checked
+    :param changes: check only the statements affected by changed lines, keyed by
+        names of the items
+    :param segment_pool: pool checking the segments - a pool sent to a worker
+        process is replaced by a pool of that process
+    :return: packed results
+    """
+    started = time.monotonic()
+    results = check_chunk(
+        items,
+        disable_noqa=disable_noqa,
+        journal=journal,
+        split_threshold=split_threshold,
+        changes=changes,
+        segment_pool=segment_pool,
+    )
+    timing = None
+
+    if timed:
+        timing = ChunkTiming(worker_name(), started, time.monotonic(), len(items))
+
+    return pack_chunk(results, timing)
+
+
+def _unpack(
+    chunk: list[Source], packed: PackedChunk, stats: RunStats | None
+) -> list[FileResult]:
+    """
+    Restores results of a chunk checked by `packed_chunk()` and records its timing.
+
+    :param chunk: items of the chunk
+    :param packed: packed results
+    :param stats: stats of the run
+    :return: results
+    """
+    if stats is not None and packed.timing:
+        stats.record(packed.timing)
+
+    return unpack_chunk([item_name(i) for i in chunk], packed)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Splits items into chunks lazily.
+
+    :param items: items
+    :param size: chunk size
+    :return: chunks
+    """
+    iterator = iter(items)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _results(
+    executor: Executor,
+    chunks: Iterator[list],
+    window: int,
+    ordered: bool,
+    disable_noqa: bool,
+    journal: bool,
+    split_threshold: int | None,
+    stats: RunStats | None,
+    memory_budget: int | None = None,
+    changes: dict[str, LineRanges] | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> Iterator[FileResult]:
+    """
+    Submits chunks to an executor keeping at most `window` of them in flight and
+    yields results as they are completed.
+
+    With a memory budget, a chunk is only submitted while the estimated memory of
+    all chunks in flight stays within the budget, except that at least one chunk
+    is always in flight.
+
+    :param executor: executor
+    :param chunks: chunks of items
+    :param window: maximum number of chunks in flight
+    :param ordered: yield results in the order of the chunks
+    :param disable_noqa: ignore `# noqa` comments
+    :param journal: create journal entries of the files
+    :param split_threshold: size in characters above which a module is split into
+        segments checked in parallel
+    :param stats: stats the timings of the chunks are recorded to
+    :param memory_budget: memory in bytes available to the chunks in flight
+    :param changes: check only the statements affected by changed lines, keyed by
+        names of the items
+    :param segment_pool: pool checking the segments of split modules
+    :return: results
+    """
+    in_flight: deque[Future] = deque()
+    submitted: dict[Future, tuple[list[Source], int]] = {}
+    held: list[list[Source]] = []
+    reserved = 0
+
+    def submit() -> bool:
+        nonlocal reserved
+
+        if (chunk := held.pop() if held else next(chunks, None)) is None:
+            return False
+
+        memory = 0 if memory_budget is None else chunk_memory(chunk)
+
+        if (
+            memory_budget is not None
+            and in_flight
+            and reserved + memory > memory_budget
+        ):
+            held.append(chunk)
+
+            return False
+
+        future = executor.submit(
+            packed_chunk,
+            chunk,
+            disable_noqa=disable_noqa,
+            journal=journal,
+            split_threshold=split_threshold,
+            timed=stats is not None,
+            # Only the changes of the chunk's items are sent to the worker
+            changes=(
+                None
+                if changes is None
+                else {
+                    name: changes[name]
+                    for name in map(item_name, chunk)
+                    if name in changes
+                }
+            ),
+            segment_pool=segment_pool,
+        )
+        in_flight.append(future)
+        submitted[future] = (chunk, memory)
+        reserved += memory
+
+        return True
+
+    while len(in_flight) < window and submit():
+        pass
+
+    while in_flight:
+        if ordered:
+            done = [in_flight.popleft()]
+        else:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                in_flight.remove(future)
+
+        for future in done:
+            chunk, memory = submitted.pop(future)
+            reserved -= memory
+
+            while len(in_flight) < window and submit():
+                pass
+
+            yield from _unpack(chunk, future.result(), stats)
+
+
+def check_files(
+    items: Iterable[Source],
+    workers: int = 1,
+    *,
+    window: int | None = None,
+    ordered: bool = False,
+    chunk_size: int = 16,
+    disable_noqa: bool = False,
+    executor: Executor | None = None,
+    pool: str = "process",
+    journal: bool = False,
+    split_threshold: int | None = None,
+    stats: RunStats | None = None,
+) -> Iterator[FileResult]:
+    """
+    Checks files or named sources, streaming results as they are completed.
+
+    Items are consumed lazily and at most `window` chunks are in flight at any time,
+    so memory stays flat regardless of the number of items.
+
+    :param items: file paths or pairs of a name and source code
+    :param workers: number of workers - 1 checks items in this process
+    :param window: maximum number of chunks in flight, 4 per worker by default
+    :param ordered: yield results in the order of the items
+    :param chunk_size: number of items sent to a worker at once
+    :param disable_noqa: ignore `# noqa` comments
+    :param executor: executor to be used instead of a new pool
+    :param pool: kind of a new pool - "process", "interpreter" (Python 3.14+)
+        or "thread"
+    :param journal: create journal entries of the files
+    :param split_threshold: size in characters above which a module is split into
+        segments checked in parallel by a pool of processes shared by the run,
+        or by each worker process - modules aren't split if the workers already
+        take all CPUs or run in subinterpreters
+    :param stats: stats the timings of the chunks are recorded to
+    :return: results
+    """
+    yield from check_chunks(
+        chunked(items, max(chunk_size, 1)),
+        workers,
+        window=window,
+        ordered=ordered,
+        disable_noqa=disable_noqa,
+        executor=executor,
+        pool=pool,
+        journal=journal,
+        split_threshold=split_threshold,
+        stats=stats,
+    )
+
+
+def check_chunks(
+    chunks: Iterable[list[Source]],
+    workers: int = 1,
+    *,
+    window: int | None = None,
+    ordered: bool = False,
+    disable_noqa: bool = False,
+    executor: Executor | None = None,
+    pool: str = "process",
+    journal: bool = False,
+    split_threshold: int | None = None,
+    stats: RunStats | None = None,
+    memory_limit: int | None = None,
+    max_tasks: int | None = None,
+    changes: dict[str, LineRanges] | None = None,
+) -> Iterator[FileResult]:
+    """
+    Checks chunks of files or named sources prepared by the caller, e.g. by
+    a scheduler, sending them to workers in the given order.
+
+    With a memory limit, the number of workers is reduced so that idle workers take
+    at most half of the limit and chunks are admitted only while the estimated memory
+    of the workers and the chunks in flight stays under the limit.
+
+    :param chunks: chunks of file paths or pairs of a name and source code
+    :param workers: number of workers - 1 checks chunks in this process
+    :param window: maximum number of chunks in flight, 4 per worker by default
+    :param ordered: yield results in the order of the chunks
+    :param disable_noqa: ignore `# noqa` comments
+    :param executor: executor to be used instead of a new pool
+    :param pool: kind of a new pool - "process", "interpreter" (Python 3.14+)
+        or "thread"
+    :param journal: create journal entries of the files
+    :param split_threshold: size in characters above which a module is split into
+        segments checked in parallel by a pool of processes shared by the run,
+        or by each worker process - modules aren't split if the workers already
+        take all CPUs or run in subinterpreters
+    :param stats: stats the timings of the chunks are recorded to
+    :param memory_limit: memory limit of all workers in bytes
+    :param max_tasks: number of chunks after which a worker process of a new pool
+        is replaced by a new one (Python 3.11+)
+    :param changes: check only the statements affected by changed lines, keyed by
+        names of the items - items without them are checked whole
+    :return: results
+    """
+    chunks = iter(chunks)
+    memory_budget = None
+
+    if memory_limit:
+        workers = memory_workers(memory_limit, workers)
+        memory_budget = max(memory_limit - workers * WORKER_MEMORY, 0)
+
+    segment_pool = None
+
+    if (
+        split_threshold
+        and (segment_pool := _segment_pool(executor, pool, workers)) is None
+    ):
+        split_threshold = None
+
+    if executor is None and workers <= 1:
+        try:
+            for chunk in chunks:
+                started = time.monotonic()
+                results = check_chunk(
+                    chunk,
+                    disable_noqa=disable_noqa,
+                    journal=journal,
+                    split_threshold=split_threshold,
+                    changes=changes,
+                    segment_pool=segment_pool,
+                )
+
+                if stats is not None:
+                    stats.record(
+                        ChunkTiming(
+                            worker_name(), started, time.monotonic(), len(chunk)
+                        )
+                    )
+
+                yield from results
+        finally:
+            if segment_pool is not None:
+                segment_pool.shutdown()
+
+        return
+
+    window = max(window or workers * 4, 1)
+    arguments = (
+        window,
+        ordered,
+        disable_noqa,
+        journal,
+        split_threshold,
+        stats,
+        memory_budget,
+        changes,
+        segment_pool,
+    )
+
+    if executor is not None:
+        try:
+            yield from _results(executor, chunks, *arguments)
+        finally:
+            if segment_pool is not None:
+                segment_pool.shutdown()
+
+        return
+
+    executor = create_pool(pool, workers, max_tasks)
+
+    try:
+        yield from _results(executor, chunks, *arguments)
+    finally:
+        # Chunks that haven't been started yet are not needed if the consumer stops
+        # iterating early
+        executor.shutdown(cancel_futures=True)
+
+        if segment_pool is not None:
+            segment_pool.shutdown()
@@ -0,0 +1,112 @@
+import functools
+import lzma
+import os
+import posixpath
+import tarfile
+import zipfile
+import zlib
+from typing import Callable, Iterable, Iterator
+
+# Wheels and other ZIP archives, and tarballs, e.g. source distributions
+ZIP_SUFFIXES = (".whl", ".zip")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Errors of reading corrupted archives
+ARCHIVE_ERRORS = (
+    OSError,
+    EOFError,
+    zipfile.BadZipFile,
+    tarfile.TarError,
+    zlib.error,
+    lzma.LZMAError,
+)
+
+
+def is_archive(path: str) -> bool:
+    """
+    Checks whether a file is an archive by its name.
+
+    :param path: file path
+    :return: True if it is, otherwise False
+    """
+    return path.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+
+def member_path(archive: str, name: str) -> str:
+    """
+    Returns the path results of a member of an archive are reported under -
+    the member's path within the archive appended to the archive's path, the same
+    way `zipimport` names modules of ZIP archives.
+
+    :param archive: path of the archive
+    :param name: name of the member
+    :return: path
+    """
+    name = posixpath.normpath(name).lstrip("/")
+
+    return os.path.join(archive, *name.split("/"))
+
+
+def _zip_members(archive: str) -> Iterator[tuple[str, Callable[[], bytes]]]:
+    """
+    Lists files of a ZIP archive in the order they're stored.
+
+    :param archive: path of the archive
+    :return: paths of the files with functions reading them
+    """
+    with zipfile.ZipFile(archive) as zip_file:
+        for info in zip_file.infolist():
+            if not info.is_dir():
+                yield member_path(archive, info.filename), functools.partial(
+                    zip_file.read, info
+                )
+
+
+def _tar_members(archive: str) -> Iterator[tuple[str, Callable[[], bytes]]]:
+    """
+    Lists files of a tarball in the order they're stored, decompressing it as
+    a stream.
+
+    :param archive: path of the archive
+    :return: paths of the files with functions reading them
+    """
+
+    def read(member: tarfile.TarInfo) -> bytes:
+        # Members of a stream have to be read before the next one is listed
+        return tar_file.extractfile(member).read()  # type: ignore[union-attr]
+
+    with tarfile.open(archive, "r|*") as tar_file:
+        for member in tar_file:
+            if member.isfile():
+                yield member_path(archive, member.name), functools.partial(read, member)
+
+
+def archive_sources(
+    archive: str, select: Callable[[Iterable[str]], Iterable[str]]
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Streams selected files of an archive without extracting it. Only the selected
+    files are read, each one before the next one is listed.
+
+    :param archive: path of the archive
+    :param select: selects files out of their paths as they're listed, yielding each
+        selected one before taking the next one, e.g. `Discovery.select()`
+    :return: paths of the files, see `member_path()`, and their contents
+    """
+    members = (
+        _zip_members(archive)
+        if archive.lower().endswith(ZIP_SUFFIXES)
+        else _tar_members(archive)
+    )
+    # Reader of the file last listed, until the next one is listed
+    readers: dict[str, Callable[[], bytes]] = {}
+
+    def paths() -> Iterator[str]:
+        for path, read in members:
+            readers[path] = read
+
+            yield path
+
+            readers.pop(path, None)
+
+    for path in select(paths()):
+        yield path, readers.pop(path)()
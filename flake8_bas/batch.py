@@ -0,0 +1,35 @@
+from typing import Iterable, Iterator
+
+from .api import check_chunks
+from .processor import FileResult
+from .scheduler import FILE_COST, batched
+
+# Upper limit of the sources sent to a worker at once
+MAX_CHUNK_SIZE = 64
+
+
+def check_records(
+    records: Iterable[tuple[str, bytes]],
+    workers: int = 1,
+    disable_noqa: bool = False,
+) -> Iterator[FileResult]:
+    """
+    Checks named sources in the order they arrive, yielding results in the same
+    order. A single worker checks each source as soon as it's read. Multiple
+    workers read sources ahead and receive them in chunks, so results of the last
+    sources are only yielded once the input ends or fills a chunk.
+
+    :param records: names and source codes
+    :param workers: number of worker processes
+    :param disable_noqa: ignore `# noqa` comments
+    :return: results
+    """
+    chunks = batched(
+        records,
+        MAX_CHUNK_SIZE if workers > 1 else 1,
+        lambda record: len(record[1]) + FILE_COST,
+    )
+
+    yield from check_chunks(
+        chunks, workers=workers, ordered=True, disable_noqa=disable_noqa
+    )
@@ -1,11 +1,16 @@
 import ast
+import functools
+import gc
+import os
 import re
-from contextlib import suppress
 from dataclasses import astuple, dataclass
-from typing import Generator, NamedTuple
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Generator, NamedTuple
 
-with suppress(Exception):
-    import pkg_resources
+from .diff import LineRanges
+
+if TYPE_CHECKING:
+    from argparse import Namespace
 
 
 @dataclass(init=False, frozen=True)
@@ -244,6 +249,183 @@ COMPOUND_STATEMENTS = (
     ),
 )
 STATEMENTS = SIMPLE_STATEMENTS + COMPOUND_STATEMENTS
+# Read-only lookup tables built once at import, i.e. before Flake8 forks its workers,
+# and shared by all checkers instead of being rebuilt by each of them
+STATEMENT_MAP = MappingProxyType({s.cls: s for s in STATEMENTS if s.cls})
+STATEMENT_TYPES = tuple(STATEMENT_MAP)
+
+# Set to "1" to freeze the garbage collector in worker processes - forked by Flake8's
+# `--jobs`, or started by the standalone runner
+GC_FREEZE_VARIABLE = "FLAKE8_BAS_GC_FREEZE"
+
+
+@functools.cache
+def freeze_on_fork() -> bool:
+    """
+    Registers a hook moving all objects tracked by the garbage collector of a forked
+    child, i.e. those inherited from its parent, to its permanent generation, once
+    and only if `FLAKE8_BAS_GC_FREEZE` is set to "1". Collections in the child then
+    never write to the inherited objects, so the memory pages holding them stay
+    shared instead of being copied into each child. The parent is left untouched.
+
+    :return: True if the hook is registered, otherwise False
+    """
+    if os.environ.get(GC_FREEZE_VARIABLE) != "1" or not hasattr(os, "register_at_fork"):
+        return False
+
+    os.register_at_fork(after_in_child=gc.freeze)
+
+    return True
+
+
+class LazyVersion:
+    """
+    Version of a distribution resolved on first access. Reading the distribution's
+    metadata is comparatively slow, so it is avoided unless the version is needed.
+    """
+
+    __slots__ = ("distribution", "value")
+
+    def __init__(self, distribution: str) -> None:
+        """
+        :param distribution: name of the distribution
+        """
+        self.distribution = distribution
+        self.value: str | None = None
+
+    def __get__(self, instance: object, owner: type | None = None) -> str:
+        """
+        Returns the version of the distribution.
+
+        :param instance: instance the attribute is accessed through
+        :param owner: class the attribute is accessed through
+        :return: version
+        """
+        if self.value is None:
+            try:
+                from importlib.metadata import version
+
+                self.value = version(self.distribution)
+            except Exception:
+                self.value = "?.?.?"
+
+        return self.value
+
+
+class PartialIndex:
+    """
+    Parents, children and positions among siblings of nodes of a tree, indexed only
+    for the parts of the tree being walked.
+    """
+
+    __slots__ = ("parents", "children", "positions", "paths")
+
+    def __init__(self) -> None:
+        self.parents: dict[ast.AST, ast.AST] = {}
+        self.children: dict[ast.AST, list[ast.AST]] = {}
+        self.positions: dict[ast.AST, int] = {}
+        self.paths: dict[ast.AST, tuple[int, ...]] = {}
+
+    def children_of(self, node: ast.AST) -> list[ast.AST]:
+        """
+        Returns children of a node, indexing them on the first call.
+
+        :param node: AST node
+        :return: children
+        """
+        if (children := self.children.get(node)) is None:
+            children = self.children[node] = list(ast.iter_child_nodes(node))
+
+            for index, child in enumerate(children):
+                self.parents[child] = node
+                self.positions[child] = index
+
+        return children
+
+    def outermost(
+        self, node: ast.AST, depth: int, step: int
+    ) -> tuple[ast.AST | None, bool]:
+        """
+        Finds the first or the last node with a line number at a depth of a subtree.
+
+        :param node: root of the subtree
+        :param depth: depth relative to the root
+        :param step: 1 for the first node, -1 for the last one
+        :return: the node if found, whether there's any node at the depth
+        """
+        pending = [(node, 0)]
+        found = False
+
+        while pending:
+            node, level = pending.pop()
+
+            if level == depth:
+                if getattr(node, "lineno", None):
+                    return node, True
+
+                found = True
+
+                continue
+
+            # Popped from the end, so that the outermost child comes first
+            pending.extend((c, level + 1) for c in self.children_of(node)[::-step])
+
+        return None, found
+
+    def neighbour(self, node: ast.AST, step: int) -> ast.AST | None:
+        """
+        Finds the node before or after a node in the order of the whole index -
+        breadth first, i.e. by depth and then from left to right - among the nodes
+        with a line number.
+
+        :param node: indexed AST node
+        :param step: -1 for the node before, 1 for the node after
+        :return: the node if any
+        """
+        child = node
+        depth = 0
+
+        # Nodes at the same depth on the side of the node, nearest first
+        while (parent := self.parents.get(child)) is not None:
+            children = self.children_of(parent)
+            index = self.positions[child]
+            after = children[index + 1 :]  # noqa: E203
+            siblings = after if step > 0 else children[:index][::-1]
+
+            for sibling in siblings:
+                if neighbour := self.outermost(sibling, depth, step)[0]:
+                    return neighbour
+
+            child = parent
+            depth += 1
+
+        # Otherwise the last node of the previous depth, or the first one of
+        # the next depths
+        while 0 < (depth := depth + step):
+            neighbour, found = self.outermost(child, depth, step)
+
+            if neighbour or not found:
+                return neighbour
+
+        return None
+
+    def walk_key(self, node: ast.AST) -> tuple[int, tuple[int, ...]]:
+        """
+        Returns a key sorting nodes in the order of the whole index.
+
+        :param node: indexed AST node
+        :return: depth and positions of the node and its ancestors among their
+            siblings
+        """
+        if (path := self.paths.get(node)) is None:
+            if (parent := self.parents.get(node)) is None:
+                path = ()
+            else:
+                path = self.walk_key(parent)[1] + (self.positions[node],)
+
+            self.paths[node] = path
+
+        return len(path), path
 
 
 class StatementChecker:
@@ -251,53 +433,241 @@ class StatementChecker:
     Checks for blank lines before statements.
     """
 
-    __slots__ = ("statement_map", "nodes", "blank_lines")
+    __slots__ = ("nodes", "indices", "parents", "blank_lines", "candidates")
 
     BLANK_LINE_RE = re.compile(r"^\s*\n")
 
-    try:
-        name = "flake8-bas"
-        version = pkg_resources.get_distribution(name).version
-    except Exception:
-        version = "?.?.?"
+    name = "flake8-bas"
+    version = LazyVersion(name)
+
+    statement_map = STATEMENT_MAP
 
     def __init__(self, tree: ast.Module, lines: list[str]) -> None:
         """
         :param tree: parsed abstract syntax tree of a module
         :param lines: module's lines of code
         """
-        self.statement_map = {s.cls: s for s in STATEMENTS if s.cls}
-        self.nodes = self._indexed_nodes(tree)
-        self.blank_lines = [
+        self.nodes, self.indices, self.parents = self._indexed_nodes(tree)
+        self.blank_lines = {
             lineno
             for lineno, line in enumerate(lines, start=1)
             if self.BLANK_LINE_RE.match(line)
-        ]
+        }
+        # Nodes to evaluate, all of them if not set
+        self.candidates: list[ast.AST] | None = None
+
+    @classmethod
+    def parse_options(cls, options: "Namespace") -> None:
+        """
+        Called by Flake8 once its options are parsed, before it forks its `--jobs`
+        workers, so that the opt-in freeze of the garbage collector applies to them.
+
+        :param options: Flake8's options
+        """
+        freeze_on_fork()
 
     @classmethod
-    def _indexed_nodes(cls, module_tree: ast.Module) -> list[ast.AST]:
+    def for_changes(
+        cls, tree: ast.Module, lines: list[str], changes: LineRanges
+    ) -> "StatementChecker":
         """
-        Takes an AST tree and turns it into a list of nodes each having
-        an index number.
+        Creates a checker evaluating only the statements affected by changed lines.
+        Only the parts of the tree whose lines, or lines between them and their
+        siblings, have changed are walked. Instead of indexing the whole tree,
+        the nodes next to each of those statements are looked up in it, and blank
+        lines are matched only between them.
+
+        :param tree: parsed abstract syntax tree of a module
+        :param lines: module's lines of code
+        :param changes: changed lines
+        :return: checker
+        """
+        checker = cls.__new__(cls)
+        index = PartialIndex()
+        checker.parents = index.parents
+        statements = cls._changed_statements(tree, changes, index)
+        nodes = set(statements)
+
+        for node in statements:
+            previous_node = node
+
+            # Constant expressions above the statement are looked behind
+            while previous_node := index.neighbour(previous_node, -1):
+                nodes.add(previous_node)
+
+                if not cls._is_constant(previous_node):
+                    break
+
+            if next_node := index.neighbour(node, 1):
+                nodes.add(next_node)
+
+        # The nodes are in the order of the whole index, so that the neighbours of
+        # the statements are next to them
+        checker.nodes = sorted(nodes, key=index.walk_key)
+        checker.indices = {node: index for index, node in enumerate(checker.nodes)}
+        checker.candidates = []
+        windows = []
+
+        for position, node in enumerate(checker.nodes):
+            if node in statements and changes.overlaps(
+                *(reach := checker._reach(position))
+            ):
+                checker.candidates.append(cls._real_node(node))
+                windows.append(reach)
+
+        checker.blank_lines = {
+            lineno
+            for first, last in LineRanges(windows)
+            for lineno in range(first, min(last, len(lines)) + 1)
+            if cls.BLANK_LINE_RE.match(lines[lineno - 1])
+        }
+
+        return checker
+
+    @classmethod
+    def _indexed_nodes(
+        cls, module_tree: ast.Module
+    ) -> tuple[list[ast.AST], dict[ast.AST, int], dict[ast.AST, ast.AST]]:
+        """
+        Takes an AST tree and turns it into a list of nodes, their index numbers and
+        their parents. The tree itself is left untouched so that it can be shared,
+        e.g. by checkers running in different threads.
 
         :param module_tree: AST tree
-        :return: nodes with index numbers
+        :return: nodes, index numbers of the nodes, parents of all nodes
         """
         nodes = []
-        index = 0
+        indices = {}
+        parents = {}
 
         for node in ast.walk(module_tree):
             for child in ast.iter_child_nodes(node):
-                child.parent_node = node
+                parents[child] = node
 
             if not getattr(node, "lineno", None):
                 continue
 
-            node.index = index
+            indices[node] = len(nodes)
             nodes.append(node)
-            index += 1
 
-        return nodes
+        return nodes, indices, parents
+
+    @classmethod
+    def _span(cls, node: ast.AST) -> tuple[int, int]:
+        """
+        Returns the lines of a node including its decorators, i.e. all the lines of
+        its children.
+
+        :param node: AST node with a line number
+        :return: first and last line number
+        """
+        first = min(
+            [node.lineno] + [d.lineno for d in getattr(node, "decorator_list", ())]
+        )
+
+        return first, node.end_lineno or node.lineno
+
+    @classmethod
+    def _is_constant(cls, node: ast.AST) -> bool:
+        """
+        Checks if the node is a constant expression, e.g. a docstring.
+
+        :param node: AST node
+        :return: True if it is, otherwise False
+        """
+        return isinstance(node, ast.Expr) and isinstance(
+            getattr(node, "value", None), ast.Constant
+        )
+
+    @classmethod
+    def _changed_statements(
+        cls, module_tree: ast.Module, changes: LineRanges, index: PartialIndex
+    ) -> set[ast.AST]:
+        """
+        Walks the parts of a tree whose lines, or lines between them and their
+        sibling nodes, have changed.
+
+        :param module_tree: AST tree
+        :param changes: changed lines
+        :param index: index of the walked nodes to update
+        :return: walked statements, `yield (from)` by their wrapping expressions
+        """
+        statements = set()
+        pending = [module_tree]
+
+        while pending:
+            node = pending.pop()
+            children = index.children_of(node)
+            spans = [
+                cls._span(c) if getattr(c, "lineno", None) else None for c in children
+            ]
+            previous_index = None
+
+            for position, child in enumerate(children):
+                if not (span := spans[position]):
+                    pending.append(child)
+
+                    continue
+
+                next_index = next(
+                    (i for i in range(position + 1, len(spans)) if spans[i]), None
+                )
+                # Lines of the child with the line after it, and the lines up to
+                # its siblings
+                first, last = span[0], span[1] + 1
+
+                if previous_index is not None:
+                    first = min(first, spans[previous_index][0])
+
+                if next_index is not None:
+                    last = max(last, spans[next_index][1] + 1)
+
+                if changed := changes.overlaps(first, last):
+                    pending.append(child)
+
+                # The nodes next to a statement between siblings are the siblings,
+                # otherwise it's up to the nodes found next to it
+                if isinstance(real_node := cls._real_node(child), STATEMENT_TYPES) and (
+                    changed
+                    or previous_index is None
+                    or next_index is None
+                    or cls._is_constant(children[previous_index])
+                ):
+                    if cls._real_node(node) is not child:
+                        statements.add(child)
+
+                    if real_node is not child:
+                        index.children_of(child)
+
+                previous_index = position
+
+        return statements
+
+    def _reach(self, index: int) -> tuple[int, int]:
+        """
+        Returns the lines an evaluation of a node depends on - from the previous
+        node, or the first of the constant expressions above it, to the next node or
+        the line after the node.
+
+        :param index: index number of the node
+        :return: first and last line number
+        """
+        node = self.nodes[index]
+        first = node.lineno
+        last = (node.end_lineno or node.lineno) + 1
+
+        if index + 1 < len(self.nodes):
+            last = max(last, self.nodes[index + 1].lineno)
+
+        while index >= 1:
+            index -= 1
+            previous_node = self.nodes[index]
+            first = min(first, previous_node.lineno)
+
+            if not self._is_constant(previous_node):
+                break
+
+        return first, last
 
     @classmethod
     def _real_node(cls, node: ast.AST) -> ast.AST:
@@ -315,8 +685,7 @@ class StatementChecker:
         else:
             return node
 
-    @classmethod
-    def _is_nth_child(cls, node: ast.AST, n: int) -> bool:
+    def _is_nth_child(self, node: ast.AST, n: int) -> bool:
         """
         Checks if the node is the Nth child within its parent.
 
@@ -324,7 +693,7 @@ class StatementChecker:
         :param n: index within a list
         :return: True if it is, otherwise False
         """
-        if not (parent_node := getattr(node, "parent_node", None)):
+        if not (parent_node := self.parents.get(node)):
             return False
 
         if len(getattr(parent_node, "body", [])) and parent_node.body[n] is node:
@@ -349,9 +718,8 @@ class StatementChecker:
         :param on_behalf_of: original node to be evaluated
         :return: error code
         """
-        previous_node: ast.AST | None = (
-            self.nodes[node.index - 1] if node.index - 1 >= 0 else None
-        )
+        index = self.indices[node]
+        previous_node: ast.AST | None = self.nodes[index - 1] if index >= 1 else None
 
         # Blank line found above the statement
         if (
@@ -402,8 +770,9 @@ class StatementChecker:
         :param on_behalf_of: original node to be evaluated
         :return: error code
         """
+        index = self.indices[node]
         next_node: ast.AST | None = (
-            self.nodes[node.index + 1] if node.index + 1 < len(self.nodes) else None
+            self.nodes[index + 1] if index + 1 < len(self.nodes) else None
         )
 
         # If there is no node after, dismiss it
@@ -436,21 +805,27 @@ class StatementChecker:
         )
 
     def _node_errors(
-        self, node: ast.AST, on_behalf_of: ast.AST | None = None
+        self,
+        node: ast.AST,
+        on_behalf_of: ast.AST | None = None,
+        before: bool = True,
+        after: bool = True,
     ) -> list[Error]:
         """
         Checks whether the node is valid or not.
 
         :param node: AST node
         :param on_behalf_of: original node to be evaluated
+        :param before: check for an error before the statement
+        :param after: check for an error after the statement
         :return: list of errors
         """
         output = []
         on_behalf_of = on_behalf_of or node
-        parent_node: ast.AST | None = getattr(node, "parent_node", None)
+        parent_node: ast.AST | None = self.parents.get(node)
 
         # Non-statement objects should be dismissed
-        if not isinstance(on_behalf_of, tuple(self.statement_map.keys())):
+        if not isinstance(on_behalf_of, STATEMENT_TYPES):
             return output
 
         # First line of code could be dismissed
@@ -465,12 +840,16 @@ class StatementChecker:
             and isinstance(parent_node, ast.Expr)
             and getattr(parent_node, "value", None) is node
         ):
-            return self._node_errors(node=parent_node, on_behalf_of=on_behalf_of)
+            return self._node_errors(
+                node=parent_node, on_behalf_of=on_behalf_of, before=before, after=after
+            )
 
-        if error := self._error_before(node=node, on_behalf_of=on_behalf_of):
+        if before and (
+            error := self._error_before(node=node, on_behalf_of=on_behalf_of)
+        ):
             output.append(error)
 
-        if error := self._error_after(node=node, on_behalf_of=on_behalf_of):
+        if after and (error := self._error_after(node=node, on_behalf_of=on_behalf_of)):
             output.append(error)
 
         return output
@@ -482,6 +861,6 @@ class StatementChecker:
 
         :return: error generator
         """
-        for node in self.nodes:
+        for node in self.nodes if self.candidates is None else self.candidates:
             for error in self._node_errors(node=node):
                 yield error
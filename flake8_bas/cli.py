@@ -0,0 +1,845 @@
+import json
+import os
+import re
+import sys
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from pathlib import Path
+
+from .api import POOLS
+from .archives import is_archive
+from .batch import check_records
+from .checker import Error, StatementChecker
+from .client import DEFAULT_SOCKET
+from .config import Options, StyleGuides, load_options
+from .daemon import Daemon
+from .diff import LineRanges, parse_diff, resolve_paths
+from .discovery import DISCOVERY_THREADS, STDIN, Discovery
+from .distributed import (
+    TOKEN_VARIABLE,
+    parse_address,
+    read_token,
+    require_token,
+    work,
+)
+from .git import diff_text, toplevel
+from .history import BlobCache, History
+from .journal import Journal
+from .records import encode_record, read_records
+from .runner import (
+    Runner,
+    format_error,
+    jobs_count,
+    journal_version,
+    reported_errors,
+)
+from .scheduler import RunStats
+from .shards import Shard, merge_results, save_results
+
+DEFAULT_JOURNAL = ".flake8-bas-cache/journal.json"
+DEFAULT_BLOB_CACHE = ".flake8-bas-cache/blobs.json"
+DEFAULT_SPLIT_THRESHOLD = 1 << 20
+
+SIZE_RE = re.compile(r"^(?P<number>\d+)(?P<suffix>[kKmMgG]?)$")
+SIZE_SUFFIXES = {"": 0, "K": 10, "M": 20, "G": 30}
+
+# Options shared with Flake8, passed as raw values on top of its configuration
+FLAKE8_OPTIONS = (
+    ("--select", "Comma-separated list of error codes to enable"),
+    ("--extend-select", "Comma-separated list of error codes to add to selected"),
+    ("--ignore", "Comma-separated list of error codes to ignore"),
+    ("--extend-ignore", "Comma-separated list of error codes to add to ignored"),
+    ("--exclude", "Comma-separated list of files or directories to exclude"),
+    ("--extend-exclude", "Comma-separated list of patterns to add to excluded"),
+    ("--filename", "Comma-separated list of file patterns to check"),
+    ("--per-file-ignores", 'Error codes ignored per file, e.g. "tests/*: BAS1"'),
+)
+
+
+def size_argument(value: str) -> int:
+    """
+    Parses a size in bytes with an optional binary suffix, e.g. "512M" or "2G".
+
+    :param value: raw value
+    :return: size in bytes
+    """
+    if not (match := SIZE_RE.match(value.strip())):
+        raise ArgumentTypeError(f"Expected a size such as 512M or 2G, got {value!r}")
+
+    return int(match.group("number")) << SIZE_SUFFIXES[match.group("suffix").upper()]
+
+
+def shard_argument(value: str) -> Shard:
+    """
+    Parses the value of the `--shard` option.
+
+    :param value: raw value
+    :return: shard
+    """
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise ArgumentTypeError(str(e)) from None
+
+
+def address_argument(value: str) -> str:
+    """
+    Validates an address of a coordinator.
+
+    :param value: raw value
+    :return: address
+    """
+    try:
+        parse_address(value)
+    except ValueError as e:
+        raise ArgumentTypeError(str(e)) from None
+
+    return value
+
+
+def build_parser() -> ArgumentParser:
+    """
+    Creates the command line parser.
+
+    :return: argument parser
+    """
+    parser = ArgumentParser(
+        prog="flake8-bas",
+        description="Checks for blank lines around statements without Flake8's "
+        "overhead, honouring Flake8's configuration.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["."],
+        help="Files, directories and archives (wheels, ZIP files and tarballs) to "
+        "check",
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {StatementChecker.version}",
+    )
+    add_config_arguments(parser)
+    add_jobs_argument(parser)
+    parser.add_argument(
+        "--pool",
+        choices=POOLS,
+        default="process",
+        help="Run workers in processes (default), subinterpreters (Python 3.14+) or "
+        "threads (parallel on free-threaded builds only)",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_JOURNAL,
+        type=Path,
+        help="Reuse results of unchanged files stored in the given journal file "
+        f"({DEFAULT_JOURNAL} if no path is given)",
+    )
+    parser.add_argument(
+        "--split-threshold",
+        type=int,
+        default=DEFAULT_SPLIT_THRESHOLD,
+        metavar="SIZE",
+        help="Split modules bigger than SIZE characters into segments checked in "
+        f"parallel (default: {DEFAULT_SPLIT_THRESHOLD}, 0 to disable)",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=size_argument,
+        metavar="SIZE",
+        help="Memory limit of all workers, e.g. 2G - fewer workers are started and "
+        "big files are checked by fewer workers at once to stay under the limit",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        type=int,
+        metavar="FILES",
+        help="Replace a worker process by a new one after it checked FILES files, "
+        "returning its fragmented memory - files are sent to workers one at a time "
+        "(Python 3.11+)",
+    )
+    parser.add_argument(
+        "--discovery-threads",
+        type=int,
+        default=DISCOVERY_THREADS,
+        metavar="THREADS",
+        help="Number of threads listing directories to discover files "
+        f"(default: {DISCOVERY_THREADS})",
+    )
+    parser.add_argument(
+        "--gitignore",
+        action="store_true",
+        help="Skip files and directories ignored by .gitignore files",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--rev",
+        metavar="REV",
+        help="Check files of a Git revision (e.g. HEAD or a branch) read from Git "
+        "instead of the working tree",
+    )
+    source.add_argument(
+        "--staged",
+        action="store_true",
+        help="Check files of the Git staging index instead of the working tree",
+    )
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument(
+        "--diff",
+        metavar="PATH",
+        help="Check only the statements affected by the changes of a unified diff "
+        '(e.g. of `git diff`) read from a file, or "-" for the standard input',
+    )
+    changes.add_argument(
+        "--diff-base",
+        metavar="REV",
+        help="Check only the statements affected by the changes of the working tree "
+        "since a Git revision (e.g. main)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=shard_argument,
+        metavar="INDEX/COUNT",
+        help="Check only the INDEX-th of COUNT parts of the files, balanced by size",
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        metavar="PATH",
+        help="Store reported errors in a file to be combined by `flake8-bas merge`",
+    )
+    parser.add_argument(
+        "--serve",
+        type=address_argument,
+        metavar="ADDRESS",
+        help="Serve the files to workers (`flake8-bas worker ADDRESS`) listening on "
+        f"HOST:PORT (127.0.0.1 by default, {TOKEN_VARIABLE} must be set) or "
+        "unix:PATH instead of checking them locally",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Print the time of the discovery of files, the elapsed time and the busy "
+        "and idle time of each local worker",
+    )
+    parser.add_argument(
+        "--stdin-display-name",
+        default="stdin",
+        help="Name of the file read from the standard input",
+    )
+    add_output_arguments(parser)
+
+    return parser
+
+
+def add_config_arguments(parser: ArgumentParser) -> None:
+    """
+    Adds options shared with Flake8 and options locating its configuration.
+
+    :param parser: argument parser
+    """
+    parser.add_argument("--config", type=Path, help="Path to a Flake8 config file")
+    parser.add_argument(
+        "--isolated", action="store_true", help="Ignore all configuration files"
+    )
+
+    for name, description in FLAKE8_OPTIONS:
+        parser.add_argument(name, help=description)
+
+    parser.add_argument(
+        "--disable-noqa",
+        action="store_true",
+        default=None,
+        help="Disregard all `# noqa` comments",
+    )
+
+
+def add_jobs_argument(parser: ArgumentParser) -> None:
+    """
+    Adds the option setting the number of workers.
+
+    :param parser: argument parser
+    """
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="auto",
+        help='Number of workers or "auto" (default) for the number of CPUs',
+    )
+
+
+def load_arguments_options(args: Namespace) -> Options:
+    """
+    Loads options from the configuration with the command line options on top.
+
+    :param args: parsed arguments
+    :return: options
+    """
+    overrides = {
+        name.lstrip("-").replace("-", "_"): getattr(
+            args, name.lstrip("-").replace("-", "_")
+        )
+        for name, _ in FLAKE8_OPTIONS
+    }
+    overrides["disable_noqa"] = args.disable_noqa
+
+    return load_options(args.config, args.isolated, overrides)
+
+
+def add_output_arguments(parser: ArgumentParser) -> None:
+    """
+    Adds options controlling the output and the exit status.
+
+    :param parser: argument parser
+    """
+    parser.add_argument(
+        "--count", action="store_true", help="Print the total number of errors"
+    )
+    parser.add_argument(
+        "--exit-zero",
+        action="store_true",
+        help="Exit with status code 0 even if there are errors",
+    )
+
+
+def build_merge_parser() -> ArgumentParser:
+    """
+    Creates the command line parser of the `merge` command.
+
+    :return: argument parser
+    """
+    parser = ArgumentParser(
+        prog="flake8-bas merge",
+        description="Combines results of all shards (--shard with --results) into "
+        "a single report.",
+    )
+    parser.add_argument("results", nargs="+", type=Path, help="Results files")
+    add_output_arguments(parser)
+
+    return parser
+
+
+def build_batch_parser() -> ArgumentParser:
+    """
+    Creates the command line parser of the `batch` command.
+
+    :return: argument parser
+    """
+    parser = ArgumentParser(
+        prog="flake8-bas batch",
+        description="Checks sources read from the standard input as records of "
+        "a name, a length in bytes and the source separated by NUL bytes "
+        "(NAME\\0LENGTH\\0SOURCE), writing a record of the same form with "
+        "the errors of each source to the standard output in the same order.",
+    )
+    add_config_arguments(parser)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="1",
+        help='Number of workers or "auto" for the number of CPUs. With more than '
+        "1, sources are read ahead and checked in chunks, so results arrive once "
+        "the input ends or fills a chunk (default: 1 - each result is written as "
+        "soon as its source is read)",
+    )
+    parser.add_argument(
+        "--exit-zero",
+        action="store_true",
+        help="Exit with status code 0 even if there are errors",
+    )
+
+    return parser
+
+
+def build_daemon_parser() -> ArgumentParser:
+    """
+    Creates the command line parser of the `daemon` command.
+
+    :return: argument parser
+    """
+    parser = ArgumentParser(
+        prog="flake8-bas daemon",
+        description="Keeps checking files and sources sent by clients "
+        "(flake8-bas-client) over a Unix socket, with the configuration and results "
+        "of checked contents kept in memory, until a client stops it.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET,
+        help=f"Path of the socket (default: {DEFAULT_SOCKET})",
+    )
+    add_config_arguments(parser)
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_JOURNAL,
+        type=Path,
+        help="Load results of previously checked files from the given journal file "
+        f"({DEFAULT_JOURNAL} if no path is given) and save them on exit",
+    )
+
+    return parser
+
+
+def build_lsp_parser() -> ArgumentParser:
+    """
+    Creates the command line parser of the `lsp` command.
+
+    :return: argument parser
+    """
+    # The language server runs on asyncio, which takes longer to import than
+    # the rest of the command line interface
+    from .lsp import DEBOUNCE
+
+    parser = ArgumentParser(
+        prog="flake8-bas lsp",
+        description="Runs a language server on the standard input and output, "
+        "publishing errors of documents open in an editor as they're edited.",
+    )
+    add_config_arguments(parser)
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE,
+        help="Seconds a document has to stay unchanged before it's checked "
+        f"(default: {DEBOUNCE})",
+    )
+
+    return parser
+
+
+def build_history_parser() -> ArgumentParser:
+    """
+    Creates the command line parser of the `history` command.
+
+    :return: argument parser
+    """
+    parser = ArgumentParser(
+        prog="flake8-bas history",
+        description="Counts errors of each commit of a range of a Git repository, "
+        "checking each distinct file content once.",
+    )
+    parser.add_argument(
+        "revisions", help='Range of commits, e.g. "v1.0..main", or a single revision'
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Files and directories relative to the root of the repository to "
+        "limit the check to",
+    )
+    add_config_arguments(parser)
+    add_jobs_argument(parser)
+    parser.add_argument(
+        "--first-parent",
+        action="store_true",
+        help="Follow only the first parent of merge commits",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_BLOB_CACHE,
+        type=Path,
+        help="Reuse results of file contents checked before, stored in the given "
+        f"file ({DEFAULT_BLOB_CACHE} if no path is given)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print a JSON object per commit instead of a line",
+    )
+
+    return parser
+
+
+def build_worker_parser() -> ArgumentParser:
+    """
+    Creates the command line parser of the `worker` command.
+
+    :return: argument parser
+    """
+    parser = ArgumentParser(
+        prog="flake8-bas worker",
+        description="Checks files served by a coordinator (--serve) until there are "
+        f"none left. {TOKEN_VARIABLE} must be set to the coordinator's token.",
+    )
+    parser.add_argument(
+        "address", type=address_argument, help="HOST:PORT or unix:PATH to connect to"
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=10.0,
+        help="Seconds to keep trying to connect to the coordinator (default: 10)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=600.0,
+        help="Seconds to wait for the next batch of the coordinator (default: 600)",
+    )
+
+    return parser
+
+
+def worker(argv: list[str]) -> int:
+    """
+    Entry point of the `worker` command.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    parser = build_worker_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        work(args.address, args.connect_timeout, read_token(), args.idle_timeout)
+    except (OSError, ValueError) as e:
+        parser.error(f"Connection to {args.address} failed: {e}")
+
+    return 0
+
+
+def batch(argv: list[str]) -> int:
+    """
+    Entry point of the `batch` command.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    parser = build_batch_parser()
+    args = parser.parse_args(argv)
+    options = load_arguments_options(args)
+    style_guides = StyleGuides(options)
+    records = read_records(sys.stdin.buffer.read1)
+    output = sys.stdout.buffer
+    reported = 0
+
+    try:
+        for result in check_records(
+            records, jobs_count(args.jobs), options.disable_noqa
+        ):
+            style_guide = style_guides.for_file(result.filename)
+            lines = [
+                f"{format_error(result.filename, e)}\n"
+                for e in result.errors
+                if style_guide.is_reported(e.message.split(" ", 1)[0])
+            ]
+            reported += len(lines)
+            output.write(
+                encode_record(
+                    result.filename, "".join(lines).encode(errors="surrogateescape")
+                )
+            )
+            output.flush()
+    except ValueError as e:
+        parser.error(str(e))
+
+    return 1 if reported and not args.exit_zero else 0
+
+
+def daemon(argv: list[str]) -> int:
+    """
+    Entry point of the `daemon` command.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    parser = build_daemon_parser()
+    args = parser.parse_args(argv)
+    options = load_arguments_options(args)
+    journal = Journal(args.cache or DEFAULT_JOURNAL, journal_version(options))
+
+    if args.cache:
+        journal.load()
+
+    try:
+        server = Daemon(args.socket, options, journal)
+    except OSError as e:
+        parser.error(str(e))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    if args.cache:
+        journal.save()
+
+    return 0
+
+
+def lsp(argv: list[str]) -> int:
+    """
+    Entry point of the `lsp` command.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    import asyncio
+
+    from .lsp import serve_stdio
+
+    args = build_lsp_parser().parse_args(argv)
+
+    return asyncio.run(serve_stdio(load_arguments_options(args), args.debounce))
+
+
+def history(argv: list[str]) -> int:
+    """
+    Entry point of the `history` command.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    parser = build_history_parser()
+    args = parser.parse_args(argv)
+    options = load_arguments_options(args)
+    cache = None
+
+    if args.cache:
+        cache = BlobCache(args.cache, journal_version(options)).load()
+
+    try:
+        commits = History(Runner(options, jobs=args.jobs), cache, args.paths).run(
+            args.revisions, args.first_parent
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if cache:
+        cache.save()
+
+    for commit in commits:
+        if args.json:
+            print(json.dumps(commit._asdict()))
+        else:
+            codes = " ".join(f"{code}={count}" for code, count in commit.errors.items())
+            print(f"{commit.commit} {commit.date} {commit.total} {codes}".rstrip())
+
+    return 0
+
+
+def merge(argv: list[str]) -> int:
+    """
+    Entry point of the `merge` command.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    parser = build_merge_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        _, errors = merge_results(args.results)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(str(e))
+
+    for filename, lineno, col_offset, message in errors:
+        print(
+            format_error(filename, Error(lineno, col_offset, message, StatementChecker))
+        )
+
+    if args.count:
+        print(len(errors))
+
+    return 1 if errors and not args.exit_zero else 0
+
+
+def print_stats(stats: RunStats | None, discovery: Discovery | None = None) -> None:
+    """
+    Prints stats of a run the way Flake8's `--benchmark` does.
+
+    :param stats: stats of the checks, None if no file was checked locally
+    :param discovery: discovery of the files
+    """
+    if discovery:
+        print(
+            f"{discovery.elapsed:<10.3f} seconds discovery of {discovery.files} files "
+            f"in {discovery.directories} directories"
+        )
+
+    if not stats:
+        return
+
+    print(f"{stats.elapsed:<10.3f} seconds elapsed")
+
+    for worker in stats.workers():
+        print(
+            f"{worker.idle:<10.3f} seconds idle of worker {worker.worker} "
+            f"({worker.busy:.3f} s busy, {worker.chunks} chunks, "
+            f"{worker.files} files)"
+        )
+
+
+def validate_pool_args(parser: ArgumentParser, args: Namespace) -> None:
+    """
+    Checks that the pool of workers supports the Python version and the options,
+    exiting with an error otherwise.
+
+    :param parser: parser of the arguments
+    :param args: parsed arguments
+    """
+    if args.pool == "interpreter" and sys.version_info < (3, 14):
+        parser.error("--pool=interpreter requires Python 3.14 or newer")
+
+    if args.recycle_after and args.pool != "process":
+        parser.error("--recycle-after requires --pool=process")
+
+    if args.recycle_after and sys.version_info < (3, 11):
+        parser.error("--recycle-after requires Python 3.11 or newer")
+
+
+def validate_args(parser: ArgumentParser, args: Namespace) -> None:
+    """
+    Checks the combinations of the arguments of a check, exiting with an error if
+    they can't be combined.
+
+    :param parser: parser of the arguments
+    :param args: parsed arguments
+    """
+    validate_pool_args(parser, args)
+    exclusive = args.cache or args.shard or args.serve or STDIN in args.paths
+
+    if (args.rev is not None or args.staged) and exclusive:
+        parser.error(
+            "--rev and --staged can't be combined with --cache, --shard, --serve "
+            "or the standard input"
+        )
+
+    if args.serve and any(is_archive(p) for p in args.paths):
+        parser.error("--serve can't be combined with archives")
+
+    if args.serve:
+        try:
+            require_token(args.serve, read_token())
+        except ValueError as e:
+            parser.error(str(e))
+
+    if (args.diff is not None or args.diff_base is not None) and (
+        args.rev is not None or args.staged or exclusive
+    ):
+        parser.error(
+            "--diff and --diff-base can't be combined with --rev, --staged, "
+            "--cache, --shard, --serve or the standard input"
+        )
+
+
+def read_changes(
+    parser: ArgumentParser, args: Namespace
+) -> dict[str, LineRanges] | None:
+    """
+    Reads the changed lines of `--diff` or `--diff-base`, exiting with an error if
+    the diff can't be read or its changed files aren't found.
+
+    :param parser: parser of the arguments
+    :param args: parsed arguments
+    :return: changed lines of each file, None if only changes aren't checked
+    """
+    if args.diff is None and args.diff_base is None:
+        return None
+
+    try:
+        if args.diff_base is not None:
+            text = diff_text(args.diff_base)
+        elif args.diff == STDIN:
+            text = sys.stdin.buffer.read().decode(errors="surrogateescape")
+        else:
+            text = Path(args.diff).read_text(errors="surrogateescape")
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    changes = parse_diff(text)
+
+    if args.diff is not None:
+        # Paths of `git diff` are relative to the root of the repository
+        try:
+            changes = resolve_paths(changes, toplevel())
+        except (OSError, ValueError):
+            pass
+
+    # A diff of another checkout would otherwise pass without checking anything
+    if missing := [f for f, r in changes.items() if r and not os.path.isfile(f)]:
+        parser.error(f"Changed files of the diff not found: {', '.join(missing)}")
+
+    return changes
+
+
+# Entry points of the commands, by their names
+COMMANDS = {
+    "merge": merge,
+    "worker": worker,
+    "history": history,
+    "batch": batch,
+    "daemon": daemon,
+    "lsp": lsp,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Entry point of the command line interface.
+
+    :param argv: command line arguments
+    :return: exit status
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    validate_args(parser, args)
+    changes = read_changes(parser, args)
+    options = load_arguments_options(args)
+    journal = None
+
+    if args.cache:
+        journal = Journal(args.cache, journal_version(options)).load()
+
+    runner = Runner(
+        options,
+        jobs=args.jobs,
+        pool=args.pool,
+        journal=journal,
+        shard=args.shard,
+        address=args.serve,
+        token=read_token(),
+        split_threshold=args.split_threshold or None,
+        memory_limit=args.memory_limit,
+        recycle_after=args.recycle_after,
+        discovery_threads=args.discovery_threads,
+        gitignore=args.gitignore,
+        rev=args.rev,
+        staged=args.staged,
+        changes=changes,
+        stdin_display_name=args.stdin_display_name,
+    )
+
+    try:
+        results = runner.run(args.paths)
+    except (OSError, ValueError, RuntimeError) as e:
+        # E.g. a revision which doesn't exist, an address in use or a batch served
+        # to workers failing too many times
+        parser.error(str(e))
+
+    reported = []
+
+    for filename, error in reported_errors(results, options):
+        print(format_error(filename, error))
+        reported.append((filename, *error[:3]))
+
+    if args.count:
+        print(len(reported))
+
+    if args.benchmark:
+        print_stats(runner.stats, runner.discovery)
+
+    if args.results:
+        save_results(args.results, args.shard, len(results), reported)
+
+    return 1 if reported and not args.exit_zero else 0
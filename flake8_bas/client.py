@@ -0,0 +1,137 @@
+# Client of the daemon (`flake8-bas daemon`). It starts in a few milliseconds
+# because it imports only modules loaded at interpreter startup anyway - `_socket`
+# instead of `socket`, which imports `enum`, no `argparse` and no `json`.
+import os
+import sys
+
+# Not known to the import order check as a module of the standard library
+import _socket  # isort: skip
+
+from .records import encode_record, read_records
+
+DEFAULT_SOCKET = ".flake8-bas-cache/daemon.sock"
+# Requests are a command record followed by records of the checked items, responses
+# a status record followed by a record of each checked file with its errors
+PATHS = "paths"
+SOURCES = "sources"
+STOP = "stop"
+OK = "ok"
+FAILED = "error"
+
+USAGE = """\
+usage: flake8-bas-client [-h] [--socket PATH] [--stdin-display-name NAME]
+                         [--exit-zero] [--stop] [paths ...]
+
+Checks files and directories, or the standard input ("-"), by a running daemon
+(flake8-bas daemon) with its configuration.
+"""
+
+
+def request(address: str, records: list[bytes]) -> list[tuple[str, bytes]]:
+    """
+    Sends a request to the daemon and waits for its response.
+
+    :param address: path of the daemon's socket
+    :param records: encoded records of the request
+    :return: records of the response
+    """
+    connection = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+
+    try:
+        connection.connect(address)
+        connection.sendall(b"".join(records))
+        connection.shutdown(_socket.SHUT_WR)
+
+        return list(read_records(connection.recv))
+    finally:
+        connection.close()
+
+
+def parse_arguments(argv: list[str]) -> dict:
+    """
+    Parses command line arguments.
+
+    :param argv: command line arguments
+    :return: values of the options and "paths"
+    """
+    args: dict = {
+        "socket": DEFAULT_SOCKET,
+        "stdin_display_name": "stdin",
+        "exit_zero": False,
+        "stop": False,
+        "paths": [],
+    }
+    arguments = iter(argv)
+
+    for argument in arguments:
+        name, separator, value = argument.partition("=")
+
+        if name in ("--socket", "--stdin-display-name"):
+            if not separator and (value := next(arguments, None)) is None:
+                raise ValueError(f"{name} requires a value")
+
+            args[name[2:].replace("-", "_")] = value
+        elif argument in ("--exit-zero", "--stop"):
+            args[argument[2:].replace("-", "_")] = True
+        elif argument.startswith("-") and argument != "-":
+            raise ValueError(f"Unknown option {argument}")
+        else:
+            args["paths"].append(argument)
+
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Entry point of the client.
+
+    :param argv: command line arguments
+    :return: exit status - 1 if there are errors, 2 if the daemon failed
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if "-h" in argv or "--help" in argv:
+        sys.stdout.write(USAGE)
+
+        return 0
+
+    try:
+        args = parse_arguments(argv)
+    except ValueError as e:
+        sys.stderr.write(f"{USAGE}flake8-bas-client: error: {e}\n")
+
+        return 2
+
+    paths = args["paths"] or ["."]
+
+    if args["stop"]:
+        records = [encode_record(STOP, b"")]
+    elif paths == ["-"]:
+        records = [
+            encode_record(SOURCES, b""),
+            encode_record(args["stdin_display_name"], sys.stdin.buffer.read()),
+        ]
+    else:
+        records = [encode_record(PATHS, os.getcwd().encode(errors="surrogateescape"))]
+        records.extend(encode_record(p, b"") for p in paths)
+
+    try:
+        (status, message), *results = request(args["socket"], records)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"flake8-bas-client: {args['socket']}: {e}\n")
+
+        return 2
+
+    if status != OK:
+        sys.stderr.write(f"flake8-bas-client: {message.decode(errors='replace')}\n")
+
+        return 2
+
+    output = b"".join(errors for _, errors in results)
+    sys.stdout.buffer.write(output)
+
+    return 1 if output and not args["exit_zero"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,384 @@
+import configparser
+import fnmatch
+import functools
+import os
+import re
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from .checker import StatementErrorCodes
+
+CONFIG_FILES = ("setup.cfg", "tox.ini", ".flake8")
+CONFIG_SECTION = "flake8"
+
+# Defaults mirror Flake8's own
+DEFAULT_EXCLUDE = (".svn", "CVS", ".bzr", ".hg", ".git", "__pycache__", ".tox")
+DEFAULT_EXCLUDE += (".nox", ".eggs", "*.egg")
+DEFAULT_FILENAME = ("*.py",)
+DEFAULT_SELECT = (StatementErrorCodes.NAMESPACE, "E9")
+
+LIST_SEPARATOR_RE = re.compile(r"[,\s]")
+MAPPING_TOKEN_RE = re.compile(
+    r"(?P<code>[A-Z]+[0-9]*(?=$|\s|,))|(?P<file>[^\s:,]+)|(?P<colon>\s*:\s*)"
+    r"|(?P<separator>\s*,\s*|\s+)"
+)
+
+
+def parse_list(value: str) -> tuple[str, ...]:
+    """
+    Parses a comma or whitespace separated list.
+
+    :param value: raw value
+    :return: list items
+    """
+    return tuple(item for item in LIST_SEPARATOR_RE.split(value) if item.strip())
+
+
+def parse_mapping(value: str) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """
+    Parses a mapping of file patterns to error codes, e.g. the value of
+    `per-file-ignores`.
+
+    :param value: raw value, e.g. "a.py b/*.py: BAS1, BAS2 c.py: BAS3"
+    :return: pairs of file patterns and error codes
+    """
+    output = []
+    files, codes, after_colon = [], [], False
+
+    for token in MAPPING_TOKEN_RE.finditer(value.strip()):
+        if token.lastgroup == "colon":
+            after_colon = True
+        elif token.lastgroup == "code" and after_colon:
+            codes.append(token.group())
+        elif token.lastgroup in ("code", "file"):
+            if after_colon:
+                output.extend((file, tuple(codes)) for file in files)
+                files, codes, after_colon = [], [], False
+
+            files.append(token.group())
+
+    if after_colon:
+        output.extend((file, tuple(codes)) for file in files)
+    elif files:
+        raise ValueError(f"Expected a colon after file pattern(s) in {value!r}")
+
+    return tuple(output)
+
+
+def normalize_pattern(pattern: str, directory: Path) -> str:
+    """
+    Turns a pattern containing a directory separator into an absolute one, the same
+    way Flake8 does.
+
+    :param pattern: file pattern
+    :param directory: directory the pattern is relative to
+    :return: normalized pattern
+    """
+    if "/" not in pattern:
+        return pattern
+
+    return os.path.abspath(directory / pattern)
+
+
+class PatternMatcher:
+    """
+    File patterns compiled into a single regular expression, matched the same way
+    `fnmatch.fnmatch()` matches each of them.
+    """
+
+    __slots__ = ("regex",)
+
+    def __init__(self, patterns: tuple[str, ...]) -> None:
+        """
+        :param patterns: file patterns
+        """
+        self.regex = (
+            re.compile(
+                "|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns)
+            )
+            if patterns
+            else None
+        )
+
+    def match(self, name: str) -> bool:
+        """
+        Checks whether a name matches any of the patterns.
+
+        :param name: file name or path
+        :return: True if it does, otherwise False
+        """
+        return self.regex is not None and bool(self.regex.match(os.path.normcase(name)))
+
+    def matches(self, path: str, absolute_path: str | None = None) -> bool:
+        """
+        Checks whether a path matches any of the patterns - either by its base name
+        or as an absolute path.
+
+        :param path: file path
+        :param absolute_path: absolute file path if it's already known
+        :return: True if it does, otherwise False
+        """
+        if self.regex is None:
+            return False
+
+        basename = os.path.basename(path)
+
+        if basename not in (".", "..") and self.match(basename):
+            return True
+
+        return self.match(absolute_path or os.path.abspath(path))
+
+
+@functools.lru_cache(maxsize=256)
+def compile_patterns(patterns: tuple[str, ...]) -> PatternMatcher:
+    """
+    Compiles file patterns, reusing matchers of recently compiled patterns.
+
+    :param patterns: file patterns
+    :return: matcher
+    """
+    return PatternMatcher(patterns)
+
+
+def matches_filename(path: str, patterns: tuple[str, ...]) -> bool:
+    """
+    Checks whether a path matches any of the patterns - either by its base name or
+    as an absolute path.
+
+    :param path: file path
+    :param patterns: file patterns
+    :return: True if it does, otherwise False
+    """
+    return compile_patterns(patterns).matches(path)
+
+
+def find_config(directory: Path) -> Path | None:
+    """
+    Finds the first configuration file with a Flake8 section in the directory or
+    any of its parents, up to the user's home directory.
+
+    :param directory: starting directory
+    :return: configuration file
+    """
+    home = Path.home().resolve()
+
+    for path in (directory, *directory.parents):
+        for name in CONFIG_FILES:
+            parser = configparser.RawConfigParser()
+
+            try:
+                parser.read(path / name, encoding="UTF-8")
+            except (UnicodeDecodeError, configparser.Error):
+                continue
+
+            if parser.has_section(CONFIG_SECTION):
+                return path / name
+
+        if path == home:
+            break
+
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class Options:
+    """
+    Subset of Flake8's options relevant to the plugin.
+    """
+
+    select: tuple[str, ...] | None = None
+    extend_select: tuple[str, ...] = ()
+    ignore: tuple[str, ...] | None = None
+    extend_ignore: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = DEFAULT_EXCLUDE
+    extend_exclude: tuple[str, ...] = ()
+    filename: tuple[str, ...] = DEFAULT_FILENAME
+    per_file_ignores: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    disable_noqa: bool = False
+
+    LIST_OPTIONS = ("select", "extend_select", "ignore", "extend_ignore")
+    PATTERN_OPTIONS = ("exclude", "extend_exclude", "filename")
+
+    @classmethod
+    def from_config(cls, file: Path) -> "Options":
+        """
+        Reads options from the Flake8 section of a configuration file.
+
+        :param file: configuration file
+        :return: options
+        """
+        parser = configparser.RawConfigParser()
+        parser.read(file, encoding="UTF-8")
+        section = {
+            key.replace("-", "_"): value for key, value in parser.items(CONFIG_SECTION)
+        }
+
+        return cls().updated(section, file.resolve().parent)
+
+    def updated(self, values: dict[str, str | bool], directory: Path) -> "Options":
+        """
+        Returns options updated with raw values from a configuration file or
+        the command line.
+
+        :param values: raw values keyed by option names
+        :param directory: directory relative patterns are resolved against
+        :return: options
+        """
+        changes = {}
+
+        for name, value in values.items():
+            if value is None:
+                continue
+            elif name in self.LIST_OPTIONS:
+                changes[name] = parse_list(value)
+            elif name in self.PATTERN_OPTIONS:
+                changes[name] = tuple(
+                    normalize_pattern(p, directory) for p in parse_list(value)
+                )
+            elif name == "per_file_ignores":
+                changes[name] = tuple(
+                    (normalize_pattern(p, directory), codes)
+                    for p, codes in parse_mapping(value)
+                )
+            elif name == "disable_noqa":
+                changes[name] = str(value).lower() in ("1", "yes", "true", "on")
+
+        return replace(self, **changes)
+
+    def is_excluded(self, path: str) -> bool:
+        """
+        Checks whether a path is excluded.
+
+        :param path: file or directory path
+        :return: True if it is, otherwise False
+        """
+        return matches_filename(path, self.exclude + self.extend_exclude)
+
+
+@dataclass(frozen=True)
+class StyleGuide:
+    """
+    Decides whether an error code is reported, following Flake8's rules: if a code
+    matches both a selected and an ignored prefix, the longer prefix wins.
+    """
+
+    options: Options
+    extra_ignore: tuple[str, ...] = ()
+    decisions: dict[str, bool] = field(default_factory=dict, compare=False)
+
+    @staticmethod
+    def _prefixes(
+        option: tuple[str, ...] | None, extend: tuple[str, ...], default: tuple
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """
+        Returns explicitly chosen prefixes and all prefixes in effect, each sorted
+        so that the longest matching prefix is found first.
+
+        :param option: explicitly set option value
+        :param extend: value of the option's "extend" counterpart
+        :param default: default value
+        :return: explicit prefixes, all prefixes
+        """
+        explicit = tuple(sorted((*(option or ()), *extend), reverse=True))
+        effective = (*option, *extend) if option is not None else (*default, *extend)
+
+        return explicit, tuple(sorted(effective, reverse=True))
+
+    def _decide(self, code: str) -> bool:
+        """
+        Decides whether an error code is reported.
+
+        :param code: error code
+        :return: True if it is, otherwise False
+        """
+        selected_explicitly, selected = self._prefixes(
+            self.options.select, self.options.extend_select, DEFAULT_SELECT
+        )
+        ignored_explicitly, ignored = self._prefixes(
+            self.options.ignore,
+            self.options.extend_ignore + self.extra_ignore,
+            (),
+        )
+
+        if not code.startswith(selected):
+            return False
+
+        if not code.startswith(ignored):
+            return True
+
+        if code.startswith(selected_explicitly) != code.startswith(ignored_explicitly):
+            return code.startswith(selected_explicitly)
+
+        select = next(s for s in selected if code.startswith(s))
+        ignore = next(i for i in ignored if code.startswith(i))
+
+        return len(select) > len(ignore)
+
+    def is_reported(self, code: str) -> bool:
+        """
+        Decides whether an error code is reported.
+
+        :param code: error code
+        :return: True if it is, otherwise False
+        """
+        if (decision := self.decisions.get(code)) is None:
+            decision = self.decisions[code] = self._decide(code)
+
+        return decision
+
+
+class StyleGuides:
+    """
+    Style guides for all files - the default one and one for each pattern
+    of `per-file-ignores`.
+    """
+
+    __slots__ = ("default", "per_file")
+
+    def __init__(self, options: Options) -> None:
+        """
+        :param options: options
+        """
+        self.default = StyleGuide(options)
+        self.per_file = tuple(
+            (pattern, StyleGuide(options, codes))
+            for pattern, codes in sorted(
+                options.per_file_ignores, key=lambda item: len(item[0]), reverse=True
+            )
+        )
+
+    def for_file(self, filename: str) -> StyleGuide:
+        """
+        Returns the style guide of the most specific (i.e. longest) pattern
+        matching the file.
+
+        :param filename: file path
+        :return: style guide
+        """
+        for pattern, style_guide in self.per_file:
+            if matches_filename(filename, (pattern,)):
+                return style_guide
+
+        return self.default
+
+
+def load_options(
+    config: Path | None = None,
+    isolated: bool = False,
+    overrides: dict[str, str | bool] | None = None,
+) -> Options:
+    """
+    Loads options from a Flake8 configuration file and applies command line
+    overrides on top of them.
+
+    :param config: configuration file, otherwise it's searched for
+    :param isolated: ignore configuration files
+    :param overrides: raw option values from the command line
+    :return: options
+    """
+    options = Options()
+
+    if not isolated and (config := config or find_config(Path.cwd())):
+        options = Options.from_config(config)
+
+    return options.updated(overrides or {}, Path.cwd())
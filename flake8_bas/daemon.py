@@ -0,0 +1,246 @@
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from .checker import Error, StatementChecker
+from .client import FAILED, OK, PATHS, SOURCES, STOP
+from .config import Options, StyleGuides
+from .discovery import Discovery
+from .journal import CachedError, Journal
+from .processor import FileResult, check_source
+from .records import encode_record, read_records
+from .runner import format_error
+
+# Number of results of named sources kept in memory - sources of editors change
+# with every keystroke, so only the most recent ones are likely to come again
+MAX_SOURCES = 4096
+
+
+class DaemonHandler(socketserver.BaseRequestHandler):
+    """
+    Handles a request of a client - a command record followed by records of paths or
+    of named sources.
+    """
+
+    server: "Daemon"
+
+    def handle(self) -> None:
+        """
+        Reads the request, checks its items and sends the response.
+        """
+        self.request.settimeout(self.server.timeout_seconds)
+        command = None
+
+        try:
+            (command, argument), *items = read_records(self.request.recv)
+
+            if command == PATHS:
+                cwd = argument.decode(errors="surrogateescape")
+                results = self.server.check_paths(cwd, [name for name, _ in items])
+            elif command == SOURCES:
+                results = [(r.filename, r) for r in self.server.check_sources(items)]
+            elif command == STOP:
+                results = []
+            else:
+                raise ValueError(f"Unknown command {command!r}")
+
+            records = [encode_record(OK, b"")] + [
+                encode_record(name, self.server.report(name, r)) for name, r in results
+            ]
+        except (OSError, ValueError) as e:
+            records = [encode_record(FAILED, str(e).encode())]
+        except Exception as e:
+            # The client gets a failure instead of a dropped connection
+            records = [encode_record(FAILED, f"{type(e).__name__}: {e}".encode())]
+
+        self._respond(records)
+
+        if command == STOP:
+            # The response is sent before the daemon starts stopping, as its process
+            # may exit before this thread gets to run again. shutdown() waits for
+            # the loop serving this request to stop, so it runs on a thread
+            threading.Thread(target=self.server.shutdown).start()
+
+    def _respond(self, records: list[bytes]) -> None:
+        """
+        Sends the response to the client, unless it has disconnected.
+
+        :param records: encoded records of the response
+        """
+        try:
+            self.request.sendall(b"".join(records))
+        except OSError:
+            # The client is gone
+            pass
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Resident process checking files and sources sent by clients over a Unix socket.
+    The checker, the configuration and the results of checked contents stay in
+    memory between requests, so that a request only pays for the files that changed.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: str,
+        options: Options,
+        journal: Journal,
+        timeout: float = 60.0,
+    ) -> None:
+        """
+        :param address: path of the socket - a stale socket of a daemon that's gone
+            is replaced
+        :param options: options
+        :param journal: change journal of the checked files, kept in memory
+        :param timeout: seconds to wait for a client's request
+        """
+        self.options = options
+        self.journal = journal
+        self.timeout_seconds = timeout
+        self.style_guides = StyleGuides(options)
+        # Errors of recently checked sources keyed by their digests, oldest first
+        self.sources: dict[str, list[CachedError]] = {}
+        # Checks share the journal
+        self.lock = threading.Lock()
+        remove_stale_socket(address)
+        os.makedirs(os.path.dirname(address) or ".", exist_ok=True)
+        super().__init__(address, DaemonHandler)
+
+    def server_close(self) -> None:
+        """
+        Closes the socket and removes its file.
+        """
+        super().server_close()
+
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+    def _evaluate(self, content: bytes) -> list[CachedError]:
+        """
+        Checks contents of a file.
+
+        :param content: contents
+        :return: errors
+        """
+        return [
+            e[:3] for e in check_source(content, disable_noqa=self.options.disable_noqa)
+        ]
+
+    def check_paths(self, cwd: str, paths: list[str]) -> list[tuple[str, FileResult]]:
+        """
+        Checks files and directories of a client, discovered the way the runner does.
+        Contents checked before are not checked again.
+
+        :param cwd: working directory of the client
+        :param paths: files and directories, relative to the working directory
+        :return: names of the files relative to the working directory unless passed
+            as absolute paths, and their results under absolute paths
+        """
+        output = []
+
+        with self.lock:
+            started = time.time_ns()
+
+            for path in paths:
+                for filename in Discovery(self.options).discover(
+                    [os.path.join(cwd, path)]
+                ):
+                    name = (
+                        filename
+                        if os.path.isabs(path)
+                        else os.path.relpath(filename, cwd)
+                    )
+
+                    try:
+                        errors = self.journal.check(filename, self._evaluate)
+                    except OSError as e:
+                        errors = [(1, 0, f"E902 {type(e).__name__}: {e}")]
+
+                    output.append(
+                        (
+                            name,
+                            FileResult(
+                                filename, [Error(*e, StatementChecker) for e in errors]
+                            ),
+                        )
+                    )
+
+            # Files modified before this request started can be trusted by their stat
+            # signature from now on, as if the journal was saved and loaded again
+            self.journal.timestamp_ns = started
+
+        return output
+
+    def check_sources(self, sources: list[tuple[str, bytes]]) -> list[FileResult]:
+        """
+        Checks named sources. Contents checked before are not checked again.
+
+        :param sources: names and source codes
+        :return: results
+        """
+        output = []
+
+        with self.lock:
+            for name, source in sources:
+                digest = self.journal.digest(source)
+
+                if (errors := self.sources.pop(digest, None)) is None and (
+                    errors := self.journal.results.get(digest)
+                ) is None:
+                    errors = self._evaluate(source)
+
+                self.sources[digest] = errors
+
+                if len(self.sources) > MAX_SOURCES:
+                    del self.sources[next(iter(self.sources))]
+
+                output.append(
+                    FileResult(name, [Error(*e, StatementChecker) for e in errors])
+                )
+
+        return output
+
+    def report(self, name: str, result: FileResult) -> bytes:
+        """
+        Formats the reported errors of a file. Errors are selected by the path of
+        the result, as patterns of `per-file-ignores` are absolute paths.
+
+        :param name: name of the file shown to the client
+        :param result: result
+        :return: errors, a line each
+        """
+        style_guide = self.style_guides.for_file(result.filename)
+
+        return "".join(
+            f"{format_error(name, e)}\n"
+            for e in result.errors
+            if style_guide.is_reported(e.message.split(" ", 1)[0])
+        ).encode(errors="surrogateescape")
+
+
+def remove_stale_socket(address: str) -> None:
+    """
+    Removes the socket of a daemon that's no longer running.
+
+    :param address: path of the socket
+    :raises OSError: if a daemon is running
+    """
+    if not os.path.exists(address):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(address)
+        except OSError:
+            os.unlink(address)
+
+            return
+
+    raise OSError(f"A daemon is already running on {address}")
@@ -0,0 +1,217 @@
+import bisect
+import os
+import re
+from typing import Iterable, Iterator
+
+HUNK_RE = re.compile(
+    r"^@@ -\d+(?:,(?P<old>\d+))? \+(?P<start>\d+)(?:,(?P<new>\d+))? @@"
+)
+DEV_NULL = "/dev/null"
+
+
+class LineRanges:
+    """
+    Sorted, non-overlapping ranges of changed lines of a file.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, ranges: list[tuple[int, int]]) -> None:
+        """
+        :param ranges: first and last line numbers of the ranges, in any order
+        """
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __bool__(self) -> bool:
+        """
+        :return: True if any line has changed, otherwise False
+        """
+        return bool(self.starts)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """
+        :return: first and last line numbers of the ranges
+        """
+        return zip(self.starts, self.ends)
+
+    def __eq__(self, other: object) -> bool:
+        """
+        :param other: other ranges
+        :return: True if the ranges are the same, otherwise False
+        """
+        return isinstance(other, LineRanges) and (self.starts, self.ends) == (
+            other.starts,
+            other.ends,
+        )
+
+    def __repr__(self) -> str:
+        """
+        :return: representation of the ranges
+        """
+        return f"LineRanges({list(self)})"
+
+    def __getstate__(self) -> tuple[list[int], list[int]]:
+        """
+        :return: state sent to workers
+        """
+        return self.starts, self.ends
+
+    def __setstate__(self, state: tuple[list[int], list[int]]) -> None:
+        """
+        :param state: state sent to workers
+        """
+        self.starts, self.ends = state
+
+    def overlaps(self, first: int, last: int) -> bool:
+        """
+        Checks whether any changed line is within the lines.
+
+        :param first: first line number
+        :param last: last line number
+        :return: True if it is, otherwise False
+        """
+        index = bisect.bisect_right(self.starts, last) - 1
+
+        return index >= 0 and self.ends[index] >= first
+
+
+def _strip_prefix(old: str, new: str) -> str:
+    """
+    Returns the path of a changed file, without the "b/" prefix of Git's diffs.
+
+    :param old: path of the file before the change
+    :param new: path of the file after the change
+    :return: path
+    """
+    if new.startswith("b/") and (old.startswith("a/") or old == DEV_NULL):
+        return new[2:]
+
+    return new
+
+
+def _flush_deletion(ranges: list[tuple[int, int]], lineno: int, deleted: bool) -> bool:
+    """
+    Records lines removed without adding any in their place as the lines around
+    the removal.
+
+    :param ranges: changed lines to update
+    :param lineno: number of the line after the removal
+    :param deleted: whether lines were removed
+    :return: False, nothing is pending anymore
+    """
+    if deleted:
+        ranges.append((max(lineno - 1, 1), lineno))
+
+    return False
+
+
+def parse_diff(text: str) -> dict[str, LineRanges]:
+    """
+    Parses a unified diff into the lines changed in each file - added lines and,
+    for lines removed without adding any in their place, the two lines around
+    the removal. Deleted files are skipped.
+
+    :param text: unified diff, e.g. of `git diff`
+    :return: changed lines keyed by paths of the files after the change
+    """
+    output: dict[str, list[tuple[int, int]]] = {}
+    old = new = DEV_NULL
+    ranges: list[tuple[int, int]] = []
+    lineno = old_remaining = new_remaining = 0
+    # Lines removed without adding any in their place
+    deleted = False
+
+    for line in text.splitlines():
+        if old_remaining or new_remaining:
+            if line.startswith("+"):
+                ranges.append((lineno, lineno))
+                lineno += 1
+                new_remaining -= 1
+                deleted = False
+            elif line.startswith("-"):
+                old_remaining -= 1
+                deleted = True
+            elif not line.startswith("\\"):
+                deleted = _flush_deletion(ranges, lineno, deleted)
+                lineno += 1
+                old_remaining -= 1
+                new_remaining -= 1
+
+            if not (old_remaining or new_remaining):
+                deleted = _flush_deletion(ranges, lineno, deleted)
+        elif line.startswith("--- "):
+            old = line[4:].split("\t", 1)[0]
+        elif line.startswith("+++ "):
+            new = line[4:].split("\t", 1)[0]
+            # Lines of deleted files are collected and dropped
+            ranges = []
+
+            if new != DEV_NULL:
+                ranges = output.setdefault(_strip_prefix(old, new), [])
+        elif match := HUNK_RE.match(line):
+            lineno = int(match.group("start"))
+            old_remaining = int(match.group("old") or 1)
+            new_remaining = int(match.group("new") or 1)
+
+            # An empty hunk of the new file starts at the line before the change
+            if not new_remaining:
+                lineno += 1
+
+    return {path: LineRanges(r) for path, r in output.items()}
+
+
+def changed_files(changes: dict[str, LineRanges], paths: Iterable[str]) -> list[str]:
+    """
+    Returns existing files with changed lines within files and directories.
+
+    :param changes: changed lines keyed by file paths
+    :param paths: files and directories
+    :return: file paths
+    """
+    roots = [os.path.abspath(p) for p in paths]
+    output = []
+
+    for filename, ranges in changes.items():
+        absolute = os.path.abspath(filename)
+
+        if (
+            ranges
+            and any(
+                absolute == r or absolute.startswith(os.path.join(r, "")) for r in roots
+            )
+            and os.path.isfile(filename)
+        ):
+            output.append(filename)
+
+    return output
+
+
+def resolve_paths(changes: dict[str, LineRanges], root: str) -> dict[str, LineRanges]:
+    """
+    Resolves paths of a diff relative to the root of a repository, e.g. of `git diff`
+    run in a subdirectory, to paths relative to the current directory. Paths of files
+    which exist relative to the current directory are kept.
+
+    :param changes: changed lines keyed by file paths
+    :param root: directory the paths may be relative to
+    :return: changed lines keyed by file paths
+    """
+    output = {}
+
+    for filename, ranges in changes.items():
+        if not os.path.isfile(filename) and os.path.isfile(
+            resolved := os.path.join(root, filename)
+        ):
+            filename = os.path.relpath(resolved)
+
+        output[filename] = ranges
+
+    return output
@@ -0,0 +1,485 @@
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from queue import SimpleQueue
+from typing import Iterable, Iterator, NamedTuple
+
+from .config import Options, compile_patterns
+
+STDIN = "-"
+GITIGNORE = ".gitignore"
+
+# Directories are listed by a pool of threads - listing a directory waits for
+# the file system without holding the GIL, which matters on a cold cache
+DISCOVERY_THREADS = 8
+
+
+class IgnoreRules(NamedTuple):
+    """
+    Consecutive rules of a `.gitignore` file which either all ignore paths or all
+    re-include them (`!pattern`), compiled into single regular expressions.
+    """
+
+    negated: bool
+    # Rules matching both files and directories
+    files: re.Pattern | None
+    # All rules, including the ones matching only directories (`pattern/`)
+    directories: re.Pattern | None
+
+
+def bracket_end(pattern: str, start: int) -> int:
+    """
+    Finds the end of a bracket expression, e.g. `[!a-z]`. A closing bracket right
+    after the opening one (or its negation) is a part of the expression.
+
+    :param pattern: pattern
+    :param start: position of the opening bracket
+    :return: position of the closing bracket, -1 if there's none
+    """
+    start += 2 if pattern[start + 1 : start + 2] in ("!", "^") else 1  # noqa: E203
+
+    return pattern.find("]", start + 1)
+
+
+def translate_gitignore(pattern: str) -> str:
+    """
+    Translates a `.gitignore` pattern without its leading and trailing slash into
+    a regular expression, the way Git matches it: `*` and `?` don't match a slash,
+    `**/` matches any number of directories and a trailing `/**` anything inside.
+
+    :param pattern: pattern
+    :return: regular expression
+    """
+    output = []
+    index = 0
+
+    while index < len(pattern):
+        char = pattern[index]
+
+        if pattern.startswith("**/", index) and (
+            index == 0 or pattern[index - 1] == "/"
+        ):
+            output.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("/**", index) and index + 3 == len(pattern):
+            output.append("/.*")
+            index += 3
+        elif char == "*":
+            while index < len(pattern) and pattern[index] == "*":
+                index += 1
+
+            output.append("[^/]*")
+        elif char == "?":
+            output.append("[^/]")
+            index += 1
+        elif char == "[" and (end := bracket_end(pattern, index)) > 0:
+            body = pattern[index + 1 : end].replace("[", "\\[")  # noqa: E203
+
+            if body[0] in "!^":
+                body = "^" + body[1:]
+
+            output.append(f"[{body}]")
+            index = end + 1
+        elif char == "\\" and index + 1 < len(pattern):
+            output.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            output.append(re.escape(char))
+            index += 1
+
+    return "".join(output)
+
+
+def parse_gitignore(text: str) -> tuple[IgnoreRules, ...]:
+    """
+    Parses rules of a `.gitignore` file.
+
+    :param text: content of the file
+    :return: rules in the reverse order, so that the last matching rule is found
+        first
+    """
+    groups: list[tuple[bool, list[str], list[str]]] = []
+
+    for line in text.splitlines():
+        if line.endswith(" ") and not line.endswith("\\ "):
+            line = line.rstrip(" ")
+
+        if not line or line.startswith("#"):
+            continue
+
+        negated = line.startswith("!")
+        line = line[negated:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+
+        if not line:
+            continue
+
+        # Patterns with a slash other than a trailing one are relative to
+        # the directory of the file, others match at any level below it
+        prefix = "" if "/" in line else "(?:.*/)?"
+        regex = f"{prefix}{translate_gitignore(line.lstrip('/'))}"
+
+        if not groups or groups[-1][0] != negated:
+            groups.append((negated, [], []))
+
+        groups[-1][2].append(regex)
+
+        if not directory_only:
+            groups[-1][1].append(regex)
+
+    return tuple(
+        IgnoreRules(
+            negated,
+            re.compile(f"(?:{'|'.join(files)})\\Z") if files else None,
+            re.compile(f"(?:{'|'.join(directories)})\\Z"),
+        )
+        for negated, files, directories in reversed(groups)
+    )
+
+
+class GitIgnore:
+    """
+    Rules of the `.gitignore` files of a directory and of its parents within
+    the repository.
+    """
+
+    __slots__ = ("rules",)
+
+    def __init__(
+        self, rules: tuple[tuple[int, tuple[IgnoreRules, ...]], ...] = ()
+    ) -> None:
+        """
+        :param rules: rules of each file from the deepest directory, with the length
+            of the path of its directory including the trailing separator
+        """
+        self.rules = rules
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "GitIgnore":
+        """
+        Loads the `.gitignore` files of the parents of a directory up to the root
+        of its Git repository. The directory's own file is loaded by `child()`.
+
+        :param directory: absolute directory path
+        :return: rules
+        """
+        path = Path(directory)
+        parents = (path, *path.parents)
+        root = next((p for p in parents if (p / ".git").exists()), None)
+        output = cls()
+
+        if root is None:
+            return output
+
+        for parent in reversed(parents[1 : parents.index(root) + 1]):  # noqa: E203
+            output = output.child(str(parent))
+
+        return output
+
+    def child(self, directory: str) -> "GitIgnore":
+        """
+        Adds rules of the `.gitignore` file of a subdirectory.
+
+        :param directory: absolute directory path
+        :return: rules of the subdirectory
+        """
+        try:
+            with open(
+                os.path.join(directory, GITIGNORE), encoding="UTF-8", errors="replace"
+            ) as f:
+                rules = parse_gitignore(f.read())
+        except OSError:
+            return self
+
+        if not rules:
+            return self
+
+        return GitIgnore(((len(os.path.join(directory, "")), rules), *self.rules))
+
+    def is_ignored(self, path: str, is_directory: bool) -> bool:
+        """
+        Checks whether a path is ignored. Rules of deeper directories take
+        precedence, and the last matching rule of a file wins.
+
+        :param path: absolute path within the directory
+        :param is_directory: whether the path is a directory
+        :return: True if it is, otherwise False
+        """
+        for length, groups in self.rules:
+            relative = path[length:]
+
+            if os.sep != "/":
+                relative = relative.replace(os.sep, "/")
+
+            for rules in groups:
+                regex = rules.directories if is_directory else rules.files
+
+                if regex is not None and regex.match(relative):
+                    return not rules.negated
+
+        return False
+
+
+# A directory to be listed - its path, absolute path and `.gitignore` rules of its
+# parents
+Directory = tuple[str, str, GitIgnore | None]
+
+
+class Discovery:
+    """
+    Discovers files to be checked the same way Flake8 does, listing directories
+    in parallel and optionally skipping files ignored by Git.
+    """
+
+    __slots__ = (
+        "exclude",
+        "filename",
+        "threads",
+        "gitignore",
+        "elapsed",
+        "files",
+        "directories",
+    )
+
+    def __init__(
+        self,
+        options: Options,
+        threads: int = DISCOVERY_THREADS,
+        gitignore: bool = False,
+    ) -> None:
+        """
+        :param options: options
+        :param threads: number of threads listing directories
+        :param gitignore: skip files and directories ignored by `.gitignore` files
+        """
+        self.exclude = compile_patterns(options.exclude + options.extend_exclude)
+        self.filename = compile_patterns(options.filename)
+        self.threads = max(threads, 1)
+        self.gitignore = gitignore
+        # Seconds from the start of the discovery until the last file was found
+        self.elapsed = 0.0
+        self.files = 0
+        self.directories = 0
+
+    def discover(self, paths: Iterable[str]) -> Iterator[str]:
+        """
+        Discovers files to be checked: explicitly passed files are always checked
+        unless excluded, files found in directories only if they match the filename
+        patterns. Files are yielded as soon as their directory is listed, in no
+        particular order.
+
+        :param paths: files and directories
+        :return: file paths
+        """
+        started = time.monotonic()
+
+        try:
+            for path in paths:
+                if path == STDIN:
+                    yield path
+                elif self.exclude.matches(path):
+                    continue
+                elif not os.path.isdir(path):
+                    self.files += 1
+
+                    yield path
+                else:
+                    yield from self._walk(path)
+        finally:
+            self.elapsed += time.monotonic() - started
+
+    def select(
+        self, filenames: Iterable[str], explicit: Iterable[str] = ()
+    ) -> Iterator[str]:
+        """
+        Selects files listed without walking directories (e.g. by Git) the way
+        `discover()` would find them on disk: files in excluded directories are
+        skipped, and files other than the explicitly passed ones have to match
+        the filename patterns.
+
+        :param filenames: relative file paths
+        :param explicit: explicitly passed paths
+        :return: file paths
+        """
+        explicit_paths = {os.path.normpath(p) for p in explicit}
+        # Whether each directory is excluded, including its parents
+        excluded: dict[str, bool] = {"": False}
+
+        def is_excluded(directory: str) -> bool:
+            if (decision := excluded.get(directory)) is None:
+                # The root of absolute paths is its own parent
+                parent = os.path.dirname(directory)
+                decision = excluded[directory] = (
+                    parent != directory and is_excluded(parent)
+                ) or self.exclude.matches(directory)
+
+            return decision
+
+        for filename in filenames:
+            if is_excluded(os.path.dirname(filename)) or self.exclude.matches(filename):
+                continue
+
+            if os.path.normpath(filename) in explicit_paths or self.filename.match(
+                filename
+            ):
+                self.files += 1
+
+                yield filename
+
+        self.directories += len(excluded) - 1
+
+    def _walk(self, directory: str) -> Iterator[str]:
+        """
+        Discovers files in a directory and its subdirectories.
+
+        :param directory: directory path
+        :return: file paths
+        """
+        absolute = os.path.abspath(directory)
+        pending: list[Directory] = [
+            (
+                directory,
+                absolute,
+                GitIgnore.for_directory(absolute) if self.gitignore else None,
+            )
+        ]
+
+        if self.threads == 1:
+            while pending:
+                files, directories = self._scan(*pending.pop())
+                pending.extend(directories)
+                self.files += len(files)
+                self.directories += 1
+
+                yield from files
+
+            return
+
+        # Threads take directories from a shared queue and put back the ones they
+        # found, so that each directory costs a few queue operations only
+        directories: SimpleQueue[Directory | None] = SimpleQueue()
+        results: SimpleQueue[tuple[list[str], int] | BaseException] = SimpleQueue()
+        threads = [
+            threading.Thread(
+                target=self._list,
+                args=(directories, results),
+                name=f"flake8-bas-discovery-{index}",
+                daemon=True,
+            )
+            for index in range(self.threads)
+        ]
+        directories.put(pending[0])
+        remaining = 1
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while remaining:
+                if isinstance(result := results.get(), BaseException):
+                    raise result
+
+                files, found = result
+                remaining += found - 1
+                self.files += len(files)
+                self.directories += 1
+
+                yield from files
+        finally:
+            for _ in threads:
+                directories.put(None)
+
+    def _list(
+        self,
+        directories: SimpleQueue[Directory | None],
+        results: SimpleQueue[tuple[list[str], int] | BaseException],
+    ) -> None:
+        """
+        Lists directories taken from a queue until it receives None.
+
+        :param directories: directories to be listed, shared by all threads
+        :param results: files found in each listed directory and the number of its
+            subdirectories
+        """
+        while (directory := directories.get()) is not None:
+            try:
+                files, subdirectories = self._scan(*directory)
+            except BaseException as e:
+                results.put(e)
+
+                return
+
+            for subdirectory in subdirectories:
+                directories.put(subdirectory)
+
+            results.put((files, len(subdirectories)))
+
+    def _scan(
+        self, directory: str, absolute: str, ignore: GitIgnore | None
+    ) -> tuple[list[str], list[Directory]]:
+        """
+        Lists a directory like `os.walk()` does - symbolic links to directories are
+        not followed and directories which can't be listed are skipped.
+
+        :param directory: directory path
+        :param absolute: absolute directory path
+        :param ignore: `.gitignore` rules of the parent directories
+        :return: files to be checked and subdirectories to be listed
+        """
+        if ignore is not None:
+            ignore = ignore.child(absolute)
+
+            if not ignore.rules:
+                ignore = None
+
+        files: list[str] = []
+        directories: list[Directory] = []
+
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return files, directories
+
+        for entry in entries:
+            absolute_path = os.path.join(absolute, entry.name)
+
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                is_directory = False
+
+            if self.exclude.matches(entry.name, absolute_path) or (
+                ignore is not None and ignore.is_ignored(absolute_path, is_directory)
+            ):
+                continue
+
+            if not is_directory:
+                if self.filename.match(entry.path):
+                    files.append(entry.path)
+            elif not entry.is_symlink():
+                directories.append((entry.path, absolute_path, ignore))
+
+        return files, directories
+
+
+def discover(
+    paths: Iterable[str],
+    options: Options,
+    threads: int = 1,
+    gitignore: bool = False,
+) -> Iterator[str]:
+    """
+    Discovers files to be checked, the same way Flake8 does: explicitly passed
+    files are always checked unless excluded, files found in directories only if
+    they match the filename patterns.
+
+    :param paths: files and directories
+    :param options: options
+    :param threads: number of threads listing directories
+    :param gitignore: skip files and directories ignored by `.gitignore` files
+    :return: file paths
+    """
+    return Discovery(options, threads, gitignore).discover(paths)
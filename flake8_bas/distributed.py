@@ -0,0 +1,591 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+from typing import Iterator
+
+from .api import check_chunk, chunked
+from .checker import Error, StatementChecker
+from .journal import Journal, JournalEntry
+from .processor import FileResult
+
+# Every message is a JSON object prefixed by its length and, with a shared token,
+# by its HMAC-SHA256
+HEADER = struct.Struct("!I")
+DIGEST_SIZE = hashlib.sha256().digest_size
+# Upper limits of the length of a message, checked before the message is received -
+# batches carry the contents of their files, handshakes only a few fields
+MAX_MESSAGE_SIZE = 1 << 28
+HANDSHAKE_SIZE = 1 << 10
+
+BATCH_SIZE = 16
+# Failed attempts to check a batch, e.g. by workers crashing on it, after which
+# the run fails
+BATCH_RETRIES = 3
+UNIX_PREFIX = "unix:"
+# Shared token of the coordinator and its workers
+TOKEN_VARIABLE = "FLAKE8_BAS_TOKEN"  # nosec B105
+
+
+def parse_address(value: str) -> tuple[socket.AddressFamily, str | tuple[str, int]]:
+    """
+    Parses an address of the coordinator - either "HOST:PORT" or "unix:PATH".
+
+    :param value: raw value
+    :return: address family, address
+    """
+    if value.startswith(UNIX_PREFIX):
+        return socket.AF_UNIX, value[len(UNIX_PREFIX) :]  # noqa: E203
+
+    host, separator, port = value.rpartition(":")
+
+    if not separator or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT or unix:PATH, got {value!r}")
+
+    host = host.strip("[]")
+
+    if ":" in host:
+        return socket.AF_INET6, (host, int(port))
+
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def read_token() -> bytes | None:
+    """
+    Reads the token shared by the coordinator and its workers.
+
+    :return: token, None if it isn't set
+    """
+    return os.environ.get(TOKEN_VARIABLE, "").encode() or None
+
+
+def require_token(address: str, token: bytes | None) -> None:
+    """
+    Rejects a TCP address without a token, as anyone able to connect to it could
+    read the served files and forge their results.
+
+    :param address: "HOST:PORT" or "unix:PATH"
+    :param token: shared token
+    """
+    if token is None and parse_address(address)[0] != socket.AF_UNIX:
+        raise ValueError(f"{TOKEN_VARIABLE} must be set to use a TCP address")
+
+
+def session_key(token: bytes | None, nonce: str) -> bytes | None:
+    """
+    Derives the key signing messages of a single connection from the shared token,
+    so that messages of other connections can't be replayed.
+
+    :param token: shared token
+    :param nonce: random value sent by the coordinator
+    :return: key, None without a token
+    """
+    if token is None:
+        return None
+
+    return hmac.new(token, nonce.encode(), hashlib.sha256).digest()
+
+
+def send_message(
+    connection: socket.socket, message: dict, key: bytes | None = None
+) -> None:
+    """
+    Sends a message.
+
+    :param connection: socket
+    :param message: message
+    :param key: key to sign the message with
+    """
+    data = json.dumps(message, separators=(",", ":")).encode()
+    signature = hmac.new(key, data, hashlib.sha256).digest() if key else b""
+    connection.sendall(HEADER.pack(len(data)) + signature + data)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes | None:
+    """
+    Receives the given number of bytes.
+
+    :param connection: socket
+    :param size: number of bytes
+    :return: data, None if the connection was closed
+    """
+    data = bytearray()
+
+    while len(data) < size:
+        if not (chunk := connection.recv(min(size - len(data), 1 << 20))):
+            return None
+
+        data += chunk
+
+    return bytes(data)
+
+
+def receive_message(
+    connection: socket.socket,
+    key: bytes | None = None,
+    max_size: int = MAX_MESSAGE_SIZE,
+) -> dict | None:
+    """
+    Receives a message.
+
+    :param connection: socket
+    :param key: key the message must be signed with
+    :param max_size: maximum length of the message in bytes
+    :raise ValueError: if the message is too long or its signature is invalid
+    :return: message, None if the connection was closed
+    """
+    size = HEADER.size + (DIGEST_SIZE if key else 0)
+
+    if (header := _receive_exactly(connection, size)) is None:
+        return None
+
+    # The length isn't signed, so it's checked before anything is buffered
+    if (length := HEADER.unpack_from(header)[0]) > max_size:
+        raise ValueError(f"Message of {length} bytes exceeds the limit of {max_size}")
+
+    if (data := _receive_exactly(connection, length)) is None:
+        return None
+
+    if key and not hmac.compare_digest(
+        header[HEADER.size :],  # noqa: E203
+        hmac.new(key, data, hashlib.sha256).digest(),
+    ):
+        raise ValueError("Message with an invalid signature")
+
+    return json.loads(data)
+
+
+class WorkQueue:
+    """
+    Batches of files waiting to be checked, batches being checked by workers and
+    results of the checked ones, shared by all connections of the coordinator.
+    """
+
+    __slots__ = (
+        "waiting",
+        "assigned",
+        "completed",
+        "remaining",
+        "retries",
+        "failures",
+        "error",
+        "condition",
+    )
+
+    def __init__(self, batches: list[list[str]], retries: int = BATCH_RETRIES) -> None:
+        """
+        :param batches: batches of file paths
+        :param retries: number of times a batch is re-queued before the run fails
+        """
+        self.waiting: deque[tuple[int, list[str]]] = deque(enumerate(batches))
+        self.assigned: dict[int, list[str]] = {}
+        self.completed: deque[list[FileResult]] = deque()
+        self.remaining = len(batches)
+        self.retries = retries
+        # Failed attempts of each batch
+        self.failures: dict[int, int] = {}
+        # Reason of a failed run
+        self.error: str | None = None
+        self.condition = threading.Condition()
+
+    def take(self) -> tuple[int, list[str]] | None:
+        """
+        Assigns a batch to a worker, waiting for one if all of them are assigned
+        (a worker might be lost and its batch re-queued).
+
+        :return: batch identifier and file paths, None once all batches are checked
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.waiting or not self.remaining)
+
+            if not self.remaining:
+                return None
+
+            identifier, batch = self.waiting.popleft()
+            self.assigned[identifier] = batch
+
+            return identifier, batch
+
+    def requeue(self, identifier: int) -> None:
+        """
+        Puts back a batch of a lost worker so that another worker checks it, or
+        fails the run if the batch has been lost too many times.
+
+        :param identifier: batch identifier
+        """
+        with self.condition:
+            if (batch := self.assigned.pop(identifier, None)) is None:
+                return
+
+            failures = self.failures[identifier] = self.failures.get(identifier, 0) + 1
+
+            if failures > self.retries:
+                self.error = (
+                    f"Batch of {len(batch)} files starting with {batch[0]} failed "
+                    f"{failures} times, e.g. by workers crashing or timing out"
+                )
+                self.waiting.clear()
+                self.remaining = 0
+            else:
+                self.waiting.appendleft((identifier, batch))
+
+            self.condition.notify_all()
+
+    def complete(self, identifier: int, results: list[FileResult]) -> None:
+        """
+        Stores results of a batch.
+
+        :param identifier: batch identifier
+        :param results: results
+        """
+        with self.condition:
+            if self.assigned.pop(identifier, None) is not None:
+                self.completed.append(results)
+                self.remaining -= 1
+                self.condition.notify_all()
+
+    def close(self) -> None:
+        """
+        Releases all connections waiting for a batch.
+        """
+        with self.condition:
+            self.waiting.clear()
+            self.assigned.clear()
+            self.remaining = 0
+            self.condition.notify_all()
+
+    def results(self) -> Iterator[FileResult]:
+        """
+        Yields results of batches as they are completed, until all of them are.
+
+        :raise RuntimeError: if a batch failed too many times
+        :return: results
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.completed or not self.remaining)
+
+                if self.error is not None:
+                    raise RuntimeError(self.error)
+
+                if not self.completed:
+                    return
+
+                batch = self.completed.popleft()
+
+            yield from batch
+
+
+def read_batch(
+    filenames: list[str], journal: bool
+) -> tuple[list[FileResult], list[tuple[str, str]], dict[str, JournalEntry]]:
+    """
+    Reads files of a batch to be sent to a worker, so that workers don't need
+    access to the files.
+
+    :param filenames: file paths
+    :param journal: create journal entries of the files
+    :return: results of unreadable files, names and encoded contents of the rest,
+        journal entries
+    """
+    failed = []
+    items = []
+    entries = {}
+
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+
+            with open(filename, "rb") as f:
+                source = f.read()
+        except OSError as e:
+            failed.append(
+                FileResult(
+                    filename,
+                    [Error(1, 0, f"E902 {type(e).__name__}: {e}", StatementChecker)],
+                )
+            )
+
+            continue
+
+        items.append((filename, base64.b64encode(source).decode("ascii")))
+
+        if journal:
+            entries[filename] = JournalEntry.from_stat(stat, Journal.digest(source))
+
+    return failed, items, entries
+
+
+class CoordinatorHandler(socketserver.BaseRequestHandler):
+    """
+    Serves batches to a single worker until all batches are checked. A batch of
+    a worker that disconnects, times out or replies with garbage is re-queued.
+    Workers which fail the handshake never get a batch.
+    """
+
+    server: "Coordinator"
+
+    def handle(self) -> None:
+        """
+        Serves a worker's connection.
+        """
+        queue = self.server.queue
+        self.request.settimeout(self.server.timeout)
+        nonce = secrets.token_hex(16)
+        key = session_key(self.server.token, nonce)
+
+        try:
+            send_message(
+                self.request, {"type": "hello", "nonce": nonce}, self.server.token
+            )
+            message = receive_message(self.request, key, HANDSHAKE_SIZE)
+        except (OSError, ValueError):
+            return
+
+        if not message or message.get("type") != "ready":
+            return
+
+        while (batch := queue.take()) is not None:
+            identifier, filenames = batch
+            failed, items, entries = read_batch(filenames, self.server.journal)
+
+            try:
+                send_message(
+                    self.request,
+                    {
+                        "type": "batch",
+                        "id": identifier,
+                        "disable_noqa": self.server.disable_noqa,
+                        "items": items,
+                    },
+                    key,
+                )
+                message = receive_message(self.request, key)
+
+                if not message or message.get("id") != identifier:
+                    raise ValueError("Batch not checked")
+
+                # Files missing from the results would otherwise pass unchecked
+                if sorted(name for name, _ in message["results"]) != sorted(
+                    name for name, _ in items
+                ):
+                    raise ValueError("Results don't match the batch")
+
+                results = [
+                    FileResult(
+                        name,
+                        [Error(*e, StatementChecker) for e in errors],
+                        entries.get(name),
+                    )
+                    for name, errors in message["results"]
+                ]
+            except (OSError, ValueError, LookupError, TypeError):
+                queue.requeue(identifier)
+
+                return
+
+            queue.complete(identifier, failed + results)
+
+        try:
+            send_message(self.request, {"type": "done"}, key)
+        except OSError:
+            pass
+
+
+class Coordinator(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Serves batches of files from a work queue to workers connected over TCP or
+    a Unix socket.
+    """
+
+    allow_reuse_address = True
+    block_on_close = False
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: str,
+        queue: WorkQueue,
+        disable_noqa: bool = False,
+        journal: bool = False,
+        timeout: float = 300.0,
+        token: bytes | None = None,
+    ) -> None:
+        """
+        :param address: "HOST:PORT" or "unix:PATH"
+        :param queue: work queue
+        :param disable_noqa: ignore `# noqa` comments
+        :param journal: create journal entries of the files
+        :param timeout: seconds a worker has to check a batch before it is
+            considered lost
+        :param token: token shared with the workers, required by TCP addresses
+        """
+        require_token(address, token)
+        self.address_family, server_address = parse_address(address)
+        self.queue = queue
+        self.disable_noqa = disable_noqa
+        self.journal = journal
+        self.timeout = timeout
+        self.token = token
+
+        if self.address_family == socket.AF_UNIX and os.path.exists(server_address):
+            os.unlink(server_address)
+
+        super().__init__(server_address, CoordinatorHandler)
+
+    def server_close(self) -> None:
+        """
+        Closes the socket and removes the file of a Unix socket.
+        """
+        super().server_close()
+
+        if self.address_family == socket.AF_UNIX:
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def serve(
+    filenames: list[str],
+    address: str,
+    batch_size: int = BATCH_SIZE,
+    disable_noqa: bool = False,
+    journal: bool = False,
+    timeout: float = 300.0,
+    token: bytes | None = None,
+    retries: int = BATCH_RETRIES,
+) -> Iterator[FileResult]:
+    """
+    Checks files by serving them in batches to workers (`flake8-bas worker`) that
+    pull the batches dynamically, yielding results as batches are completed.
+
+    :param filenames: file paths
+    :param address: "HOST:PORT" or "unix:PATH" to listen on
+    :param batch_size: number of files sent to a worker at once
+    :param disable_noqa: ignore `# noqa` comments
+    :param journal: create journal entries of the files
+    :param timeout: seconds a worker has to check a batch before it is
+        considered lost
+    :param token: token shared with the workers, required by TCP addresses
+    :param retries: number of times a lost batch is re-queued before the run fails
+    :raise RuntimeError: if a batch was lost more than `retries` times
+    :return: results
+    """
+    queue = WorkQueue(list(chunked(filenames, max(batch_size, 1))), retries)
+    server = Coordinator(address, queue, disable_noqa, journal, timeout, token)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield from queue.results()
+    finally:
+        queue.close()
+        server.shutdown()
+        server.server_close()
+
+
+def connect(address: str, timeout: float) -> socket.socket:
+    """
+    Connects to a coordinator, retrying until it is up or the timeout expires.
+
+    :param address: "HOST:PORT" or "unix:PATH"
+    :param timeout: seconds to keep retrying
+    :return: socket
+    """
+    family, server_address = parse_address(address)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        connection = socket.socket(family, socket.SOCK_STREAM)
+        # An unreachable host doesn't hold up the retries
+        connection.settimeout(max(deadline - time.monotonic(), 0.1))
+
+        try:
+            connection.connect(server_address)
+
+            return connection
+        except OSError:
+            connection.close()
+
+            if time.monotonic() >= deadline:
+                raise
+
+            time.sleep(0.1)
+
+
+def handshake(connection: socket.socket, token: bytes | None) -> bytes | None:
+    """
+    Answers the greeting of a coordinator.
+
+    :param connection: socket connected to the coordinator
+    :param token: token shared with the coordinator
+    :raise ValueError: if the peer isn't a coordinator sharing the token
+    :return: key signing the messages of the connection
+    """
+    message = receive_message(connection, token, HANDSHAKE_SIZE)
+
+    if not message or message.get("type") != "hello":
+        raise ValueError("Coordinator closed the connection")
+
+    key = session_key(token, message["nonce"])
+    send_message(connection, {"type": "ready"}, key)
+
+    return key
+
+
+def work(
+    address: str,
+    timeout: float = 10.0,
+    token: bytes | None = None,
+    idle_timeout: float = 600.0,
+) -> int:
+    """
+    Checks batches of files served by a coordinator until there are none left.
+
+    :param address: "HOST:PORT" or "unix:PATH" of the coordinator
+    :param timeout: seconds to keep trying to connect to the coordinator
+    :param token: token shared with the coordinator, required by TCP addresses
+    :param idle_timeout: seconds to wait for a message of the coordinator, which
+        may hold a worker until the batches of other workers are checked
+    :raise OSError: if the connection fails or times out
+    :raise ValueError: if the peer isn't a coordinator sharing the token
+    :return: number of checked batches
+    """
+    require_token(address, token)
+    batches = 0
+
+    with connect(address, timeout) as connection:
+        connection.settimeout(idle_timeout)
+        key = handshake(connection, token)
+
+        while message := receive_message(connection, key):
+            if message["type"] != "batch":
+                break
+
+            items = [
+                (name, base64.b64decode(source)) for name, source in message["items"]
+            ]
+            results = check_chunk(items, disable_noqa=message["disable_noqa"])
+            send_message(
+                connection,
+                {
+                    "type": "results",
+                    "id": message["id"],
+                    "results": [
+                        (r.filename, [e[:3] for e in r.errors]) for r in results
+                    ],
+                },
+                key,
+            )
+            batches += 1
+
+    return batches
@@ -0,0 +1,265 @@
+import subprocess  # nosec B404
+from typing import IO, Iterable, Iterator, NamedTuple
+
+GIT = "git"
+# Modes of tree entries which aren't regular files - symbolic links and submodules
+SKIPPED_MODES = ("120000", "160000")
+TREE_MODE = "40000"
+
+
+class Blob(NamedTuple):
+    """
+    File of a revision or of the staging index.
+    """
+
+    path: str
+    oid: str
+    size: int
+
+
+class Commit(NamedTuple):
+    """
+    Commit along with its root tree.
+    """
+
+    oid: str
+    tree: str
+    # Committer date in the ISO 8601 format
+    date: str
+
+
+class TreeEntry(NamedTuple):
+    """
+    Entry of a tree object - a file, a subdirectory, a symbolic link or a submodule.
+    """
+
+    mode: str
+    name: str
+    oid: str
+
+
+def run_git(*arguments: str, stdin: bytes | None = None) -> bytes:
+    """
+    Runs a Git command in the current directory.
+
+    :param arguments: command and its arguments
+    :param stdin: standard input of the command
+    :return: standard output
+    """
+    process = subprocess.run(  # nosec B603
+        [GIT, *arguments], input=stdin, capture_output=True, check=False
+    )
+
+    if process.returncode:
+        message = process.stderr.decode(errors="replace").strip()
+
+        raise ValueError(f"git {arguments[0]} failed: {message}")
+
+    return process.stdout
+
+
+def _records(output: bytes) -> Iterator[tuple[list[str], str]]:
+    """
+    Splits NUL-terminated records of `git ls-tree -z` or `git ls-files -z`.
+
+    :param output: output of the command
+    :return: fields and the path of each record
+    """
+    for record in output.split(b"\0"):
+        if record:
+            fields, _, path = record.decode(errors="surrogateescape").partition("\t")
+
+            yield fields.split(), path
+
+
+def tree_blobs(rev: str, paths: Iterable[str] = ()) -> list[Blob]:
+    """
+    Lists files of a revision, with paths relative to the current directory.
+
+    :param rev: commit, tag, branch or tree
+    :param paths: limit the files to these paths
+    :return: files
+    """
+    output = run_git("ls-tree", "-r", "-l", "-z", rev, "--", *paths)
+
+    return [
+        Blob(path, oid, int(size))
+        for (mode, kind, oid, size), path in _records(output)
+        if kind == "blob" and mode not in SKIPPED_MODES
+    ]
+
+
+def staged_blobs(paths: Iterable[str] = ()) -> list[Blob]:
+    """
+    Lists files of the staging index, with paths relative to the current directory.
+    Unmerged files are skipped.
+
+    :param paths: limit the files to these paths
+    :return: files
+    """
+    entries = [
+        (path, oid)
+        for (mode, oid, stage), path in _records(
+            run_git("ls-files", "-s", "-z", "--", *paths)
+        )
+        if stage == "0" and mode not in SKIPPED_MODES
+    ]
+    # The index doesn't store sizes of files, but they are needed for scheduling
+    sizes = object_sizes([oid for _, oid in entries])
+
+    return [Blob(path, oid, size) for (path, oid), size in zip(entries, sizes)]
+
+
+def object_sizes(oids: list[str]) -> list[int]:
+    """
+    Reads sizes of objects without reading their contents.
+
+    :param oids: object ids
+    :return: sizes in bytes
+    """
+    if not oids:
+        return []
+
+    output = run_git(
+        "cat-file",
+        "--batch-check=%(objectsize)",
+        stdin="".join(f"{oid}\n" for oid in oids).encode(),
+    )
+
+    return [int(size) for size in output.split()]
+
+
+def list_commits(revisions: str, first_parent: bool = False) -> list[Commit]:
+    """
+    Lists commits of a range from the oldest one.
+
+    :param revisions: range of commits, e.g. "v1.0..main" or "HEAD"
+    :param first_parent: follow only the first parent of merge commits
+    :return: commits
+    """
+    output = run_git(
+        "log",
+        "--reverse",
+        "--no-show-signature",
+        "--format=%H %T %cI",
+        *(("--first-parent",) if first_parent else ()),
+        revisions,
+        "--",
+    )
+
+    return [Commit(*line.split()) for line in output.decode().splitlines() if line]
+
+
+def toplevel() -> str:
+    """
+    Returns the root of the working tree of the repository of the current directory.
+
+    :return: directory
+    """
+    output = run_git("rev-parse", "--show-toplevel")
+
+    return output.decode(errors="surrogateescape").rstrip("\n")
+
+
+def diff_text(rev: str) -> str:
+    """
+    Returns changes of the working tree since a revision as a unified diff without
+    context lines, with paths relative to the current directory.
+
+    :param rev: revision, e.g. "main" or "HEAD"
+    :return: diff
+    """
+    return run_git(
+        "diff",
+        "--no-color",
+        "--no-ext-diff",
+        "--src-prefix=a/",
+        "--dst-prefix=b/",
+        "--relative",
+        "-U0",
+        rev,
+        "--",
+    ).decode(errors="surrogateescape")
+
+
+def tree_entries(content: bytes, hash_size: int) -> Iterator[TreeEntry]:
+    """
+    Parses contents of a tree object.
+
+    :param content: contents read by `git cat-file --batch`
+    :param hash_size: size of object ids in bytes - 20 (SHA-1) or 32 (SHA-256)
+    :return: entries
+    """
+    position = 0
+
+    while position < len(content):
+        space = content.index(b" ", position)
+        end = content.index(b"\0", space)
+
+        yield TreeEntry(
+            content[position:space].decode(),
+            content[space + 1 : end].decode(errors="surrogateescape"),  # noqa: E203
+            content[end + 1 : end + 1 + hash_size].hex(),  # noqa: E203
+        )
+
+        position = end + 1 + hash_size
+
+
+class CatFile:
+    """
+    Long-lived `git cat-file --batch` process reading contents of objects.
+    """
+
+    __slots__ = ("process",)
+
+    def __init__(self) -> None:
+        self.process = subprocess.Popen(  # nosec B603
+            [GIT, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def __enter__(self) -> "CatFile":
+        """
+        :return: the reader
+        """
+        return self
+
+    def __exit__(self, *_) -> None:
+        """
+        Stops the process.
+        """
+        self.close()
+
+    def read(self, oid: str) -> bytes:
+        """
+        Reads contents of an object.
+
+        :param oid: object id
+        :return: contents
+        """
+        stdin: IO[bytes] = self.process.stdin  # type: ignore[assignment]
+        stdout: IO[bytes] = self.process.stdout  # type: ignore[assignment]
+        stdin.write(f"{oid}\n".encode())
+        stdin.flush()
+        header = stdout.readline().split()
+
+        if len(header) != 3:
+            raise ValueError(f"Object {oid} is missing")
+
+        content = stdout.read(int(header[2]) + 1)
+
+        return content[:-1]
+
+    def close(self) -> None:
+        """
+        Stops the process.
+        """
+        if self.process.stdin:
+            self.process.stdin.close()
+
+        self.process.wait()
+
+        if self.process.stdout:
+            self.process.stdout.close()
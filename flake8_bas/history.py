@@ -0,0 +1,263 @@
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from .config import StyleGuides, compile_patterns
+from .git import (
+    SKIPPED_MODES,
+    TREE_MODE,
+    Blob,
+    CatFile,
+    list_commits,
+    object_sizes,
+    run_git,
+    tree_entries,
+)
+from .journal import CachedError, write_atomically
+from .runner import Runner
+
+# A tree or a file of a tree - its path, object id and whether it's a tree
+Node = tuple[str, str, bool]
+
+
+class CommitErrors(NamedTuple):
+    """
+    Numbers of errors of a commit by their codes.
+    """
+
+    commit: str
+    date: str
+    errors: dict[str, int]
+
+    @property
+    def total(self) -> int:
+        """
+        Returns the number of all errors.
+
+        :return: number of errors
+        """
+        return sum(self.errors.values())
+
+
+class BlobCache:
+    """
+    Results of blobs keyed by their object ids, so that later scans of the history
+    check only new blobs. Results are stored before errors are filtered by
+    the configuration, which can change without invalidating them.
+    """
+
+    __slots__ = ("file", "version", "results")
+
+    FORMAT = 1
+
+    def __init__(self, file: Path | str, version: str) -> None:
+        """
+        :param file: path of the cache file
+        :param version: version of the checker - results of other versions are
+            discarded
+        """
+        self.file = Path(file)
+        self.version = version
+        self.results: dict[str, list[CachedError]] = {}
+
+    def load(self) -> "BlobCache":
+        """
+        Loads the cache file. A missing, corrupted or outdated cache results in
+        an empty one.
+
+        :return: self
+        """
+        try:
+            data = json.loads(self.file.read_bytes())
+
+            if data["format"] != self.FORMAT or data["version"] != self.version:
+                return self
+
+            self.results = {
+                oid: [tuple(error) for error in errors]
+                for oid, errors in data["results"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+        return self
+
+    def save(self) -> None:
+        """
+        Writes the cache atomically.
+        """
+        data = {
+            "format": self.FORMAT,
+            "version": self.version,
+            "results": dict(sorted(self.results.items())),
+        }
+        write_atomically(self.file, json.dumps(data, separators=(",", ":")))
+
+
+class History:
+    """
+    Errors of each commit of a range. Trees are read once per path and object id,
+    so unchanged directories of consecutive commits are shared, each distinct blob
+    is checked once, and its errors are then summed up over the trees containing
+    it.
+    """
+
+    __slots__ = (
+        "runner",
+        "results",
+        "root",
+        "paths",
+        "exclude",
+        "filename",
+        "style_guides",
+        "trees",
+        "counts",
+    )
+
+    def __init__(
+        self, runner: Runner, cache: BlobCache | None = None, paths: Iterable[str] = ()
+    ) -> None:
+        """
+        :param runner: runner checking the blobs, with the options selecting files
+            and reported errors
+        :param cache: results of blobs checked before
+        :param paths: limit the files to these paths relative to the root of
+            the repository
+        """
+        options = runner.options
+        self.runner = runner
+        # Errors of blobs keyed by their object ids
+        self.results: dict[str, list[CachedError]] = cache.results if cache else {}
+        self.root = run_git("rev-parse", "--show-toplevel").decode().strip()
+        self.paths = tuple(
+            path
+            for path in (os.path.normpath(p).strip("/") for p in paths)
+            if path != "."
+        )
+        self.exclude = compile_patterns(options.exclude + options.extend_exclude)
+        self.filename = compile_patterns(options.filename)
+        self.style_guides = StyleGuides(options)
+        # Selected children of trees keyed by their path and object id
+        self.trees: dict[tuple[str, str], list[Node]] = {}
+        self.counts: dict[tuple[str, str], Counter[str]] = {}
+
+    def _selected(self, path: str, is_tree: bool) -> bool:
+        """
+        Decides whether a tree or a file is walked, the same way files are
+        discovered on disk.
+
+        :param path: path relative to the root of the repository
+        :param is_tree: whether it's a tree
+        :return: True if it is, otherwise False
+        """
+        if self.paths and not any(
+            path == p
+            or path.startswith(f"{p}/")
+            or (is_tree and p.startswith(f"{path}/"))
+            for p in self.paths
+        ):
+            return False
+
+        if self.exclude.matches(path, os.path.join(self.root, path)):
+            return False
+
+        return is_tree or path in self.paths or self.filename.match(path)
+
+    def _walk(self, cat_file: CatFile, tree: str, hash_size: int) -> set[str]:
+        """
+        Reads trees of a root tree which haven't been read yet.
+
+        :param cat_file: reader of objects
+        :param tree: object id of the root tree
+        :param hash_size: size of object ids in bytes
+        :return: object ids of the selected files of the new trees
+        """
+        blobs = set()
+        pending = [("", tree)]
+
+        while pending:
+            key = pending.pop()
+
+            if key in self.trees:
+                continue
+
+            children = self.trees[key] = []
+
+            for entry in tree_entries(cat_file.read(key[1]), hash_size):
+                path = f"{key[0]}/{entry.name}" if key[0] else entry.name
+                is_tree = entry.mode == TREE_MODE
+
+                if entry.mode in SKIPPED_MODES or not self._selected(path, is_tree):
+                    continue
+
+                children.append((path, entry.oid, is_tree))
+
+                if is_tree:
+                    pending.append((path, entry.oid))
+                else:
+                    blobs.add(entry.oid)
+
+        return blobs
+
+    def _count(self, path: str, oid: str, is_tree: bool) -> Counter[str]:
+        """
+        Counts reported errors of a tree or a file.
+
+        :param path: path relative to the root of the repository
+        :param oid: object id
+        :param is_tree: whether it's a tree
+        :return: numbers of errors by their codes
+        """
+        if (counts := self.counts.get((path, oid))) is not None:
+            return counts
+
+        counts = Counter()
+
+        if is_tree:
+            for child in self.trees[(path, oid)]:
+                counts.update(self._count(*child))
+        else:
+            style_guide = self.style_guides.for_file(os.path.join(self.root, path))
+            counts.update(
+                code
+                for _, _, message in self.results[oid]
+                if style_guide.is_reported(code := message.split(" ", 1)[0])
+            )
+
+        self.counts[(path, oid)] = counts
+
+        return counts
+
+    def run(self, revisions: str, first_parent: bool = False) -> list[CommitErrors]:
+        """
+        Checks the commits of a range.
+
+        :param revisions: range of commits, e.g. "v1.0..main" or "HEAD"
+        :param first_parent: follow only the first parent of merge commits
+        :return: errors of each commit from the oldest one
+        """
+        commits = list_commits(revisions, first_parent)
+        blobs: set[str] = set()
+
+        with CatFile() as cat_file:
+            for commit in commits:
+                blobs.update(self._walk(cat_file, commit.tree, len(commit.tree) // 2))
+
+        if pending := sorted(blobs.difference(self.results)):
+            sizes = object_sizes(pending)
+
+            for result in self.runner.check_blobs(
+                [Blob(oid, oid, size) for oid, size in zip(pending, sizes)]
+            ):
+                self.results[result.filename] = [e[:3] for e in result.errors]
+
+        return [
+            CommitErrors(
+                commit.oid,
+                commit.date,
+                dict(sorted(self._count("", commit.tree, True).items())),
+            )
+            for commit in commits
+        ]
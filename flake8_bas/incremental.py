@@ -0,0 +1,324 @@
+import ast
+import io
+from operator import attrgetter
+from typing import NamedTuple
+
+from .checker import Error, StatementChecker
+from .diff import LineRanges
+from .processor import read_lines, syntax_error
+
+# Line number and character of a line, in the coordinates of errors - lines start at
+# 1, characters at 0
+Position = tuple[int, int]
+
+position_key = attrgetter("lineno", "col_offset", "message")
+
+
+class ErrorDelta(NamedTuple):
+    """
+    Errors removed and added by an edit. Errors in neither of them stay where they
+    were, moved by the lines the edit has added or removed if they were below
+    the edited lines.
+    """
+
+    removed: list[Error]
+    added: list[Error]
+
+
+class IncrementalChecker:
+    """
+    Checks a module kept up to date by edits, e.g. a document open in an editor.
+
+    The tree and the errors of each statement are kept between edits. An edit
+    re-parses only the top-level statements it touches, shifts the line numbers of
+    the statements below it and evaluates only the statements whose neighbourhood
+    has changed, the same way as a check of changed lines. Blank lines are matched
+    within the lines of the evaluated statements, so there's no index of them to
+    keep. Modules with syntax errors are parsed whole until they are valid again.
+    Like the errors of the Flake8 plugin, the errors aren't filtered by `# noqa`
+    comments.
+    """
+
+    __slots__ = ("lines", "tree", "statement_nodes", "owners", "failure")
+
+    def __init__(self, source: bytes | str) -> None:
+        """
+        :param source: source code of the module
+        """
+        self.lines = read_lines(source)
+        self.tree: ast.Module | None = None
+        # Nodes with a line number of each top-level statement
+        self.statement_nodes: list[list[ast.AST]] = []
+        # Errors keyed by the nodes they were found on behalf of
+        self.owners: dict[ast.AST, list[Error]] = {}
+        # Syntax error of the module, if any
+        self.failure: Error | None = None
+        self._rebuild()
+
+    @property
+    def errors(self) -> list[Error]:
+        """
+        Returns errors of the module.
+
+        :return: errors sorted by their position
+        """
+        if self.failure:
+            return [self.failure]
+
+        return sorted(
+            (e for errors in self.owners.values() for e in errors), key=position_key
+        )
+
+    def edit(self, start: Position, end: Position, text: str) -> ErrorDelta:
+        """
+        Replaces a range of the module with text and checks the affected statements.
+
+        :param start: start of the range
+        :param end: end of the range, exclusive
+        :param text: replacement text
+        :return: errors removed and added by the edit
+        """
+        (first, column), (last, end_column) = sorted(
+            (self._clamp(start), self._clamp(end))
+        )
+        edited = self.lines[first - 1 : last]  # noqa: E203
+        head = edited[0][:column] if edited else ""
+        tail = edited[-1][end_column:] if last <= len(self.lines) else ""
+        replacement = io.StringIO(head + text + tail, newline=None).readlines()
+        # Last edited line, and by how many lines the lines below it move
+        last = first + len(edited) - 1
+        delta = len(replacement) - len(edited)
+
+        if self.tree is None:
+            return self._replace_all(first, last, replacement, delta)
+
+        spans = [StatementChecker._span(s) for s in self.tree.body]
+        # Top-level statements on the edited lines
+        index = next(
+            (i for i, span in enumerate(spans) if span[1] >= first), len(spans)
+        )
+        end_index = index
+
+        while end_index < len(spans) and spans[end_index][0] <= max(last, first):
+            end_index += 1
+
+        # Statements next to the edited ones, e.g. a block the edit indents lines
+        # into, are parsed along with them if the edited ones fail
+        widened = (max(index - 1, 0), min(end_index + 1, len(spans)))
+
+        for index, end_index in dict.fromkeys([(index, end_index), widened]):
+            region_first = min([first] + [s[0] for s in spans[index:end_index]])
+            region_last = max([last] + [s[1] for s in spans[index:end_index]])
+            region = (
+                self.lines[region_first - 1 : first - 1]  # noqa: E203
+                + replacement
+                + self.lines[last:region_last]
+            )
+
+            try:
+                module = ast.parse("".join(region))
+            except (SyntaxError, ValueError):
+                continue
+
+            return self._replace(
+                module,
+                (index, end_index),
+                region_first,
+                (first, last),
+                replacement,
+            )
+
+        return self._replace_all(first, last, replacement, delta)
+
+    def _clamp(self, position: Position) -> Position:
+        """
+        Moves a position outside the module to its nearest position within it.
+
+        :param position: line number and character
+        :return: position
+        """
+        lineno, column = position
+
+        if lineno < 1:
+            return 1, 0
+
+        if lineno > len(self.lines):
+            if self.lines and not self.lines[-1].endswith("\n"):
+                return len(self.lines), len(self.lines[-1])
+
+            return len(self.lines) + 1, 0
+
+        line = self.lines[lineno - 1]
+
+        return lineno, max(min(column, len(line.rstrip("\n"))), 0)
+
+    def _rebuild(self) -> None:
+        """
+        Parses and checks the whole module.
+        """
+        self.owners = {}
+
+        try:
+            self.tree = ast.parse("".join(self.lines))
+        except (SyntaxError, ValueError) as e:
+            self.tree = None
+            self.statement_nodes = []
+            self.failure = syntax_error(e)
+
+            return
+
+        self.failure = None
+        self.statement_nodes = [self._nodes(s) for s in self.tree.body]
+        checker = StatementChecker(tree=self.tree, lines=self.lines)
+
+        for node in checker.nodes:
+            if errors := checker._node_errors(node=node):
+                self.owners[node] = errors
+
+    @classmethod
+    def _nodes(cls, statement: ast.stmt) -> list[ast.AST]:
+        """
+        Returns nodes with a line number of a statement.
+
+        :param statement: top-level statement
+        :return: nodes
+        """
+        return [n for n in ast.walk(statement) if getattr(n, "lineno", None)]
+
+    def _replace_all(
+        self, first: int, last: int, replacement: list[str], delta: int
+    ) -> ErrorDelta:
+        """
+        Replaces edited lines and checks the whole module.
+
+        :param first: first edited line
+        :param last: last edited line
+        :param replacement: lines replacing the edited lines
+        :param delta: number of lines added by the edit
+        :return: errors removed and added by the edit
+        """
+        removed = self.errors
+        self.lines[first - 1 : last] = replacement  # noqa: E203
+        self._rebuild()
+
+        return self._delta(removed, self.errors, (first, last), delta)
+
+    def _replace(
+        self,
+        module: ast.Module,
+        statements: tuple[int, int],
+        first_line: int,
+        edited: tuple[int, int],
+        replacement: list[str],
+    ) -> ErrorDelta:
+        """
+        Replaces top-level statements by statements parsed from their edited lines
+        and checks the statements whose neighbourhood has changed.
+
+        :param module: parsed lines of the statements after the edit
+        :param statements: index of the first replaced statement and the index
+            after the last one
+        :param first_line: line number of the first parsed line
+        :param edited: first and last edited line
+        :param replacement: lines replacing the edited lines
+        :return: errors removed and added by the edit
+        """
+        index, end_index = statements
+        first, last = edited
+        delta = len(replacement) - (last - first + 1)
+        ast.increment_lineno(module, first_line - 1)
+        removed = []
+
+        for nodes in self.statement_nodes[index:end_index]:
+            for node in nodes:
+                if errors := self.owners.pop(node, None):
+                    removed.extend(errors)
+
+        if delta:
+            for nodes in self.statement_nodes[end_index:]:
+                for node in nodes:
+                    node.lineno += delta
+                    node.end_lineno += delta
+
+        self.lines[first - 1 : last] = replacement  # noqa: E203
+        self.tree.body[index:end_index] = module.body
+        self.statement_nodes[index:end_index] = [self._nodes(s) for s in module.body]
+
+        body = self.tree.body
+        next_index = index + len(module.body)
+        # The changed lines reach the statements around the replaced ones, which
+        # may have lost their neighbours, e.g. the new first statement of the module
+        changed_first = body[index - 1].end_lineno if index else 1
+        changed_last = len(self.lines)
+
+        if next_index < len(body):
+            changed_last = StatementChecker._span(body[next_index])[0]
+
+        checker = StatementChecker.for_changes(
+            self.tree,
+            self.lines,
+            LineRanges([(changed_first, max(changed_last, changed_first))]),
+        )
+        added = []
+
+        for node in checker.candidates:
+            removed.extend(self.owners.pop(node, ()))
+
+        if delta:
+            for node, errors in self.owners.items():
+                if any(e.lineno > last for e in errors):
+                    self.owners[node] = [self._shift(e, last, delta) for e in errors]
+
+        for node in checker.candidates:
+            if errors := checker._node_errors(node=node):
+                self.owners[node] = errors
+                added.extend(errors)
+
+        return self._delta(removed, added, edited, delta)
+
+    @classmethod
+    def _shift(cls, error: Error, last: int, delta: int) -> Error:
+        """
+        Moves an error below edited lines by the number of lines added by the edit.
+
+        :param error: error
+        :param last: last edited line
+        :param delta: number of lines added by the edit
+        :return: error
+        """
+        if error.lineno > last:
+            return error._replace(lineno=error.lineno + delta)
+
+        return error
+
+    @classmethod
+    def _delta(
+        cls,
+        removed: list[Error],
+        added: list[Error],
+        edited: tuple[int, int],
+        delta: int,
+    ) -> ErrorDelta:
+        """
+        Leaves out errors which are both removed and added, once moved by the edit.
+        Errors on the edited lines are always removed, as their lines may be gone.
+
+        :param removed: errors before the edit
+        :param added: errors after the edit
+        :param edited: first and last edited line
+        :param delta: number of lines added by the edit
+        :return: errors removed and added by the edit
+        """
+        first, last = edited
+        moved = {
+            cls._shift(e, last, delta): e
+            for e in removed
+            if not first <= e.lineno <= last
+        }
+        kept = moved.keys() & set(added)
+        unchanged = {moved[e] for e in kept}
+
+        return ErrorDelta(
+            sorted((e for e in removed if e not in unchanged), key=position_key),
+            sorted((e for e in added if e not in kept), key=position_key),
+        )
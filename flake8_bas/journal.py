@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+CachedError = tuple[int, int, str]
+
+
+def write_atomically(file: Path, content: str) -> None:
+    """
+    Writes a file atomically, so that readers see either its old or new content.
+
+    :param file: file path
+    :param content: new content
+    """
+    temp_file = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+    file.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        temp_file.write_text(content)
+        os.replace(temp_file, file)
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+
+class JournalEntry(NamedTuple):
+    """
+    Stat signature of a file along with the digest of its content.
+    """
+
+    size: int
+    mtime_ns: int
+    inode: int
+    digest: str
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result, digest: str) -> "JournalEntry":
+        """
+        Creates an entry from the result of `os.stat()`.
+
+        :param stat: stat result
+        :param digest: digest of the file's content
+        :return: journal entry
+        """
+        return cls(stat.st_size, stat.st_mtime_ns, stat.st_ino, digest)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """
+        Checks whether the stat signature of the file is unchanged.
+
+        :param stat: stat result
+        :return: True if it is, otherwise False
+        """
+        return (
+            self.size == stat.st_size
+            and self.mtime_ns == stat.st_mtime_ns
+            and self.inode == stat.st_ino
+        )
+
+
+class Journal:
+    """
+    Stat-based change journal on top of a content-hash result cache.
+
+    A file whose (size, mtime, inode) signature is unchanged since the last run reuses
+    the stored digest and its cached result without being read. A file that has been
+    touched but whose content is unchanged reuses the cached result after rehashing.
+    """
+
+    __slots__ = ("file", "version", "entries", "results", "timestamp_ns", "started_ns")
+
+    FORMAT = 1
+
+    def __init__(self, file: Path | str, version: str) -> None:
+        """
+        :param file: path of the journal file
+        :param version: version of the checker - results of other versions are
+            discarded
+        """
+        self.file = Path(file)
+        self.version = version
+        self.entries: dict[str, JournalEntry] = {}
+        self.results: dict[str, list[CachedError]] = {}
+        self.timestamp_ns = 0
+        self.started_ns = time.time_ns()
+
+    @staticmethod
+    def digest(content: bytes) -> str:
+        """
+        Computes the digest of a file's content.
+
+        :param content: file's content
+        :return: hex digest
+        """
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def load(self) -> "Journal":
+        """
+        Loads the journal file. A missing, corrupted or outdated journal results
+        in an empty one.
+
+        :return: self
+        """
+        try:
+            data = json.loads(self.file.read_bytes())
+
+            if data["format"] != self.FORMAT or data["version"] != self.version:
+                return self
+
+            entries = {
+                path: JournalEntry(*entry) for path, entry in data["entries"].items()
+            }
+            results = {
+                digest: [tuple(error) for error in errors]
+                for digest, errors in data["results"].items()
+            }
+            timestamp_ns = data["timestamp_ns"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return self
+
+        self.entries, self.results, self.timestamp_ns = entries, results, timestamp_ns
+
+        return self
+
+    def _trusted(self, entry: JournalEntry, stat: os.stat_result) -> bool:
+        """
+        Checks whether the stored digest of a file can be used without reading it.
+
+        Files modified after the run that recorded them had started are "racily
+        clean" - they might have been changed again within the granularity of the
+        file system's timestamps, so their stat signature can't be trusted.
+
+        :param entry: journal entry
+        :param stat: current stat result of the file
+        :return: True if it can, otherwise False
+        """
+        return (
+            entry.matches(stat)
+            and entry.mtime_ns < self.timestamp_ns
+            and entry.digest in self.results
+        )
+
+    def lookup(self, path: Path | str) -> list[CachedError] | None:
+        """
+        Returns the cached result of a file if its stat signature is unchanged.
+        The file is not read.
+
+        :param path: file path
+        :return: cached errors or None if the file needs to be checked
+        """
+        key = str(path)
+
+        if not (entry := self.entries.get(key)):
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            del self.entries[key]
+
+            return None
+
+        return self.results[entry.digest] if self._trusted(entry, stat) else None
+
+    def record(
+        self, path: Path | str, entry: JournalEntry, errors: list[CachedError]
+    ) -> None:
+        """
+        Records a checked file in the journal.
+
+        :param path: file path
+        :param entry: entry created from a stat result taken before the file was read
+        :param errors: errors found in the file
+        """
+        self.entries[str(path)] = entry
+        self.results[entry.digest] = [tuple(error) for error in errors]
+
+    def check(
+        self, path: Path | str, evaluate: Callable[[bytes], list[CachedError]]
+    ) -> list[CachedError]:
+        """
+        Returns errors of a file either from the journal or by evaluating its content.
+
+        :param path: file path
+        :param evaluate: function that checks the file's content
+        :return: errors
+        """
+        if (errors := self.lookup(path)) is not None:
+            return errors
+
+        # The stat has to be taken before the read so that a modification during
+        # the read results in a changed signature
+        stat = os.stat(path)
+        content = Path(path).read_bytes()
+        digest = self.digest(content)
+
+        if (errors := self.results.get(digest)) is None:
+            errors = evaluate(content)
+
+        self.record(path, JournalEntry.from_stat(stat, digest), errors)
+
+        return self.results[digest]
+
+    def verify(self, sample: int, rng: random.Random | None = None) -> list[str]:
+        """
+        Rehashes a random sample of files whose stat signature is unchanged and
+        removes entries whose content no longer matches the stored digest.
+
+        :param sample: number of entries to verify
+        :param rng: random number generator
+        :return: paths of the stale entries
+        """
+        rng = rng or random.Random()  # nosec B311
+        paths = sorted(self.entries)
+        stale = []
+
+        for path in rng.sample(paths, min(sample, len(paths))):
+            entry = self.entries[path]
+
+            try:
+                stat = os.stat(path)
+
+                if entry.matches(stat) and (
+                    self.digest(Path(path).read_bytes()) == entry.digest
+                ):
+                    continue
+            except OSError:
+                pass
+
+            stale.append(path)
+            del self.entries[path]
+
+        return stale
+
+    def save(self) -> None:
+        """
+        Writes the journal atomically. Results no longer referenced by any file are
+        dropped.
+        """
+        digests = {entry.digest for entry in self.entries.values()}
+        data = {
+            "format": self.FORMAT,
+            "version": self.version,
+            "timestamp_ns": self.started_ns,
+            "entries": {
+                path: list(entry) for path, entry in sorted(self.entries.items())
+            },
+            "results": {
+                digest: self.results[digest]
+                for digest in sorted(digests)
+                if digest in self.results
+            },
+        }
+        write_atomically(self.file, json.dumps(data, separators=(",", ":")))
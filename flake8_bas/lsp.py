@@ -0,0 +1,582 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor
+from typing import Callable
+from urllib.parse import unquote, urlparse
+
+from .aio import DocumentChecker
+from .checker import Error
+from .config import Options, StyleGuides
+
+HEADER_SEPARATOR = b"\r\n\r\n"
+# Error codes of JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+# TextDocumentSyncKind.Incremental - changes are sent as edits of ranges
+INCREMENTAL_SYNC = 2
+WARNING_SEVERITY = 2
+# MessageType.Error of "window/logMessage" notifications
+ERROR_MESSAGE = 1
+# Notification of the documents visible in the editor, checked before the others,
+# with the list of their identifiers under "uris"
+VISIBLE_DOCUMENTS = "flake8-bas/visibleDocuments"
+# Seconds a document has to stay unchanged before it's checked
+DEBOUNCE = 0.2
+
+
+def encode_message(message: dict) -> bytes:
+    """
+    Encodes a JSON-RPC message with its header.
+
+    :param message: message
+    :return: encoded message
+    """
+    body = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode()
+
+    return b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict | None:
+    """
+    Reads a JSON-RPC message.
+
+    :param reader: stream, e.g. of the standard input
+    :return: message, None at the end of the stream
+    :raises ValueError: if the message is malformed
+    """
+    try:
+        header = await reader.readuntil(HEADER_SEPARATOR)
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise ValueError("Truncated header") from None
+
+        return None
+
+    length = None
+
+    for line in header.decode("ascii").split("\r\n"):
+        name, _, value = line.partition(":")
+
+        if name.strip().lower() == "content-length":
+            length = int(value)
+
+    if length is None:
+        raise ValueError("Missing Content-Length header")
+
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ValueError("Truncated message") from None
+
+    if not isinstance(message := json.loads(body), dict):
+        raise ValueError("Expected a JSON object")
+
+    return message
+
+
+def line_bounds(text: str, line: int) -> tuple[int, int]:
+    """
+    Finds a line of a text.
+
+    :param text: text
+    :param line: zero-based line number
+    :return: offsets of the line's first character and of its end, without
+        the line break
+    """
+    start = 0
+
+    for _ in range(line):
+        if (start := text.find("\n", start) + 1) == 0:
+            return len(text), len(text)
+
+    end = text.find("\n", start)
+
+    return start, len(text) if end < 0 else end
+
+
+def text_offset(text: str, position: dict) -> int:
+    """
+    Converts a position of the protocol to an offset within a text.
+
+    :param text: text
+    :param position: zero-based line and character in UTF-16 code units
+    :return: offset in code points
+    """
+    start, end = line_bounds(text, position["line"])
+    line = text[start:end]
+    units = position["character"]
+
+    if line.isascii():
+        return start + min(units, len(line))
+
+    prefix = line.encode("utf-16-le")[: units * 2].decode("utf-16-le", "ignore")
+
+    return start + len(prefix)
+
+
+def utf16_column(line: str, col_offset: int) -> int:
+    """
+    Converts a column of the checker to a character of the protocol.
+
+    :param line: line of the text
+    :param col_offset: offset in UTF-8 bytes, like `ast`'s
+    :return: offset in UTF-16 code units
+    """
+    if line.isascii():
+        return col_offset
+
+    prefix = line.encode()[:col_offset].decode(errors="ignore")
+
+    return len(prefix.encode("utf-16-le")) // 2
+
+
+def uri_path(uri: str) -> str:
+    """
+    Returns the path of a document identified by a "file" URI.
+
+    :param uri: URI
+    :return: path, the URI itself for other schemes
+    """
+    parsed = urlparse(uri)
+
+    return unquote(parsed.path) if parsed.scheme == "file" else uri
+
+
+class Document:
+    """
+    Text of a document open in the editor.
+    """
+
+    __slots__ = ("uri", "text", "version", "visible", "changed")
+
+    def __init__(self, uri: str, text: str, version: int, changed: float) -> None:
+        """
+        :param uri: identifier of the document
+        :param text: text
+        :param version: version of the text
+        :param changed: time of the last change
+        """
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.visible = True
+        self.changed = changed
+
+    def apply(self, change: dict) -> None:
+        """
+        Applies a change - either a replacement of a range or of the whole text.
+
+        :param change: TextDocumentContentChangeEvent
+        """
+        if "range" not in change:
+            self.text = change["text"]
+
+            return
+
+        start = text_offset(self.text, change["range"]["start"])
+        end = text_offset(self.text, change["range"]["end"])
+        self.text = f"{self.text[:start]}{change['text']}{self.text[end:]}"
+
+    def diagnostics(self, errors: list[Error]) -> list[dict]:
+        """
+        Converts errors of the document's text into diagnostics.
+
+        :param errors: errors
+        :return: diagnostics
+        """
+        output = []
+
+        for error in errors:
+            start, end = line_bounds(self.text, error.lineno - 1)
+            character = utf16_column(self.text[start:end], error.col_offset)
+            code, _, message = error.message.partition(" ")
+            position = {"line": error.lineno - 1, "character": character}
+            output.append(
+                {
+                    "range": {"start": position, "end": position},
+                    "severity": WARNING_SEVERITY,
+                    "code": code,
+                    "source": "flake8-bas",
+                    "message": message,
+                }
+            )
+
+        return output
+
+
+class LanguageServer:
+    """
+    Language server publishing errors of open documents as they're edited.
+
+    A document is checked once it stays unchanged for the debounce period, and a
+    change cancels its check in progress - its result would be stale. A check
+    already running in the executor can't be interrupted, it runs to completion and
+    only its result is discarded. Documents waiting for a check are checked one at
+    a time, the visible ones first and the most recently changed ones first among
+    them. A check that fails is logged and the document's previous diagnostics are
+    left in place.
+    """
+
+    __slots__ = (
+        "write",
+        "style_guides",
+        "checker",
+        "debounce",
+        "documents",
+        "due",
+        "wakeup",
+        "shutdown_requested",
+    )
+
+    def __init__(
+        self,
+        write: Callable[[bytes], None],
+        options: Options,
+        debounce: float = DEBOUNCE,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        :param write: writes an encoded message to the client
+        :param options: options
+        :param debounce: seconds a document has to stay unchanged before it's
+            checked
+        :param executor: executor the checks are sent to, the event loop's default
+            (thread) executor unless specified
+        """
+        self.write = write
+        self.style_guides = StyleGuides(options)
+        self.checker = DocumentChecker(executor, options.disable_noqa)
+        self.debounce = debounce
+        self.documents: dict[str, Document] = {}
+        # Documents waiting for a check with the time they're due at
+        self.due: dict[str, float] = {}
+        self.wakeup = asyncio.Event()
+        self.shutdown_requested = False
+
+    def send(self, message: dict) -> None:
+        """
+        Sends a message to the client.
+
+        :param message: message without the protocol version
+        """
+        self.write(encode_message({"jsonrpc": "2.0", **message}))
+
+    def publish(self, uri: str, diagnostics: list[dict], version: int | None) -> None:
+        """
+        Publishes diagnostics of a document.
+
+        :param uri: identifier of the document
+        :param diagnostics: diagnostics
+        :param version: version of the document they were found in
+        """
+        self.send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": uri, "version": version, "diagnostics": diagnostics},
+            }
+        )
+
+    def log(self, message: str) -> None:
+        """
+        Logs an error to the client.
+
+        :param message: message
+        """
+        self.send(
+            {
+                "method": "window/logMessage",
+                "params": {"type": ERROR_MESSAGE, "message": message},
+            }
+        )
+
+    def schedule(self, uri: str, delay: float = 0.0) -> None:
+        """
+        Schedules a check of a document, discarding the result of its check in
+        progress.
+
+        :param uri: identifier of the document
+        :param delay: seconds to wait for further changes
+        """
+        self.checker.cancel(uri)
+        self.due[uri] = asyncio.get_running_loop().time() + delay
+        self.wakeup.set()
+
+    async def serve(self, reader: asyncio.StreamReader) -> int:
+        """
+        Serves a client until it sends the "exit" notification or closes the stream.
+
+        :param reader: stream of the client's messages
+        :return: exit status - 0 if the client requested a shutdown first
+        """
+        scheduler = asyncio.ensure_future(self._run_checks())
+
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except ValueError as e:
+                    self.send(
+                        {"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}}
+                    )
+
+                    continue
+
+                if message is None or message.get("method") == "exit":
+                    break
+
+                try:
+                    self.handle(message)
+                except (KeyError, TypeError, ValueError) as e:
+                    if "id" in message:
+                        self.send(
+                            {
+                                "id": message["id"],
+                                "error": {
+                                    "code": INVALID_PARAMS,
+                                    "message": f"Invalid params: {e!r}",
+                                },
+                            }
+                        )
+        finally:
+            scheduler.cancel()
+
+            for uri in list(self.checker.tasks):
+                self.checker.cancel(uri)
+
+        return 0 if self.shutdown_requested else 1
+
+    def handle(self, message: dict) -> None:
+        """
+        Handles a request or a notification of the client.
+
+        :param message: message
+        """
+        method = message.get("method")
+
+        if handler := self.HANDLERS.get(method):
+            result = getattr(self, handler)(message.get("params") or {})
+
+            # Requests are answered, notifications aren't
+            if "id" in message:
+                self.send({"id": message["id"], "result": result})
+        elif "id" in message and method is not None:
+            self.send(
+                {
+                    "id": message["id"],
+                    "error": {
+                        "code": METHOD_NOT_FOUND,
+                        "message": f"Method not found: {method}",
+                    },
+                }
+            )
+        elif "id" in message and "result" not in message and "error" not in message:
+            self.send(
+                {
+                    "id": message["id"],
+                    "error": {"code": INVALID_REQUEST, "message": "Missing method"},
+                }
+            )
+
+    def _initialize(self, params: dict) -> dict:
+        """
+        Handles the "initialize" request.
+
+        :param params: parameters of the request
+        :return: capabilities of the server
+        """
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": INCREMENTAL_SYNC,
+                    "save": {"includeText": False},
+                }
+            },
+            "serverInfo": {"name": "flake8-bas"},
+        }
+
+    def _shutdown(self, params: dict) -> None:
+        """
+        Handles the "shutdown" request.
+
+        :param params: parameters of the request
+        """
+        self.shutdown_requested = True
+
+    def _did_open(self, params: dict) -> None:
+        """
+        Handles the "textDocument/didOpen" notification.
+
+        :param params: parameters of the notification
+        """
+        document = params["textDocument"]
+        self.documents[document["uri"]] = Document(
+            document["uri"],
+            document["text"],
+            document["version"],
+            asyncio.get_running_loop().time(),
+        )
+        self.schedule(document["uri"])
+
+    def _did_change(self, params: dict) -> None:
+        """
+        Handles the "textDocument/didChange" notification.
+
+        :param params: parameters of the notification
+        """
+        if document := self.documents.get(params["textDocument"]["uri"]):
+            for change in params["contentChanges"]:
+                document.apply(change)
+
+            document.version = params["textDocument"]["version"]
+            document.changed = asyncio.get_running_loop().time()
+            self.schedule(document.uri, self.debounce)
+
+    def _did_save(self, params: dict) -> None:
+        """
+        Handles the "textDocument/didSave" notification.
+
+        :param params: parameters of the notification
+        """
+        if (uri := params["textDocument"]["uri"]) in self.documents:
+            self.schedule(uri)
+
+    def _did_close(self, params: dict) -> None:
+        """
+        Handles the "textDocument/didClose" notification.
+
+        :param params: parameters of the notification
+        """
+        uri = params["textDocument"]["uri"]
+        self.checker.cancel(uri)
+        self.due.pop(uri, None)
+
+        if self.documents.pop(uri, None):
+            self.publish(uri, [], None)
+
+    def _visible_documents(self, params: dict) -> None:
+        """
+        Handles the notification of the documents visible in the editor.
+
+        :param params: parameters of the notification
+        """
+        visible = set(params["uris"])
+
+        for document in self.documents.values():
+            document.visible = document.uri in visible
+
+    # Names of the methods handling the client's messages, by their LSP methods
+    HANDLERS = {
+        "initialize": "_initialize",
+        "shutdown": "_shutdown",
+        "textDocument/didOpen": "_did_open",
+        "textDocument/didChange": "_did_change",
+        "textDocument/didSave": "_did_save",
+        "textDocument/didClose": "_did_close",
+        VISIBLE_DOCUMENTS: "_visible_documents",
+    }
+
+    def _priority(self, uri: str) -> tuple[bool, float]:
+        """
+        Returns the priority of a document's check - the lower, the sooner.
+
+        :param uri: identifier of the document
+        :return: priority
+        """
+        document = self.documents[uri]
+
+        return not document.visible, -document.changed
+
+    async def _run_checks(self) -> None:
+        """
+        Checks documents as they become due, one at a time, by their priority.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            now = loop.time()
+            due = [u for u, at in self.due.items() if at <= now and u in self.documents]
+
+            if not due:
+                self.wakeup.clear()
+
+                try:
+                    await asyncio.wait_for(
+                        self.wakeup.wait(),
+                        min(self.due.values()) - now if self.due else None,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+                continue
+
+            uri = min(due, key=self._priority)
+            del self.due[uri]
+
+            try:
+                await self._check(self.documents[uri])
+            except Exception as e:
+                # The other documents keep being checked
+                self.log(f"Check of {uri} failed: {type(e).__name__}: {e}")
+
+    async def _check(self, document: Document) -> None:
+        """
+        Checks a document and publishes its diagnostics unless it has changed since.
+
+        :param document: document
+        """
+        version = document.version
+        task = asyncio.ensure_future(self.checker.check(document.uri, document.text))
+        # Unlike awaiting the task, waiting for it doesn't raise if the task is
+        # cancelled by a change of the document
+        await asyncio.wait([task])
+
+        if task.cancelled():
+            return
+
+        # Raises if the check failed, even if its result is stale
+        errors = task.result()
+
+        if self.documents.get(document.uri) is not document or (
+            document.version != version
+        ):
+            return
+
+        style_guide = self.style_guides.for_file(uri_path(document.uri))
+        errors = [
+            e for e in errors if style_guide.is_reported(e.message.split(" ", 1)[0])
+        ]
+        self.publish(document.uri, document.diagnostics(errors), version)
+
+
+async def serve_stdio(
+    options: Options, debounce: float = DEBOUNCE, executor: Executor | None = None
+) -> int:
+    """
+    Serves a client connected to the standard input and output.
+
+    :param options: options
+    :param debounce: seconds a document has to stay unchanged before it's checked
+    :param executor: executor the checks are sent to
+    :return: exit status
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer
+    )
+    output = sys.stdout.buffer
+
+    def write(data: bytes) -> None:
+        """
+        Writes a message to the standard output.
+
+        :param data: encoded message
+        """
+        output.write(data)
+        output.flush()
+
+    return await LanguageServer(write, options, debounce, executor).serve(reader)
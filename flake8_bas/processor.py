@@ -0,0 +1,390 @@
+import ast
+import io
+import mmap
+import os
+import re
+import tokenize
+from typing import BinaryIO, NamedTuple
+
+from .checker import Error, StatementChecker
+from .diff import LineRanges
+from .journal import Journal, JournalEntry
+from .segments import SegmentPool, check_segments, segment_count
+
+# Same patterns as Flake8 uses
+NOQA_INLINE_RE = re.compile(
+    r"# noqa(?::[\s]?(?P<codes>([A-Z]+[0-9]+(?:[,\s]+)?)+))?", re.IGNORECASE
+)
+NOQA_FILE_RE = re.compile(r"\s*# flake8[:=]\s*noqa", re.IGNORECASE)
+CODE_SEPARATOR_RE = re.compile(r"[,\s]")
+
+# Bytes-level counterparts of `StatementChecker.BLANK_LINE_RE` for lines of ASCII
+# whitespace - a newline followed by a blank line and a blank first line
+BLANK_LINE_BYTES_RE = re.compile(rb"\n(?=[ \t\f\v\r\x1c-\x1f]*\n)")
+FIRST_BLANK_LINE_BYTES_RE = re.compile(rb"[ \t\f\v\r\x1c-\x1f]*\n")
+# Lines which can't be judged without decoding them - lines of whitespace and
+# non-ASCII characters, which could be whitespace as well, and lines ending with
+# "\r" alone, which is a line break once decoded
+UNSCANNABLE_LINE_RE = re.compile(
+    rb"\n[ \t\f\v\r\x1c-\x1f]*[\x80-\xff][ \t\f\v\r\x1c-\x1f\x80-\xff]*\n"
+)
+UNSCANNABLE_FIRST_LINE_RE = re.compile(
+    rb"[ \t\f\v\r\x1c-\x1f]*[\x80-\xff][ \t\f\v\r\x1c-\x1f\x80-\xff]*\n"
+)
+LONE_CARRIAGE_RETURN_RE = re.compile(rb"\r(?!\n)")
+NOQA_BYTES_RE = re.compile(rb"noqa", re.IGNORECASE)
+
+# Files smaller than this are read, mapping them into memory costs more than
+# copying them
+MMAP_THRESHOLD = 1 << 14
+
+Buffer = bytes | mmap.mmap
+
+
+class FileResult(NamedTuple):
+    """
+    Errors found in a file along with the file's journal entry, if it could
+    be created.
+    """
+
+    filename: str
+    errors: list[Error]
+    entry: JournalEntry | None = None
+
+
+def read_lines(source: bytes | str) -> list[str]:
+    """
+    Decodes the source code of a module into lines the same way Flake8 does.
+
+    :param source: source code
+    :return: lines of code
+    """
+    if isinstance(source, str):
+        text = source
+    else:
+        try:
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+            text = source.decode(encoding)
+        except (SyntaxError, UnicodeError):
+            text = source.decode("latin-1")
+
+    lines = io.StringIO(text, newline=None).readlines()
+
+    if lines and lines[0].startswith("\ufeff"):
+        lines[0] = lines[0][1:]
+
+    return lines
+
+
+def read_buffer(file: BinaryIO, size: int) -> Buffer:
+    """
+    Maps a file into memory, or reads it if it is small or can't be mapped (e.g.
+    a pipe).
+
+    :param file: file opened in binary mode
+    :param size: size of the file
+    :return: buffer
+    """
+    if size >= MMAP_THRESHOLD:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            pass
+
+    return file.read()
+
+
+def has_noqa(data: Buffer) -> bool:
+    """
+    Checks whether a buffer contains a `noqa` comment in any letter case. Letters
+    "qa" are rare in code, so finding them first is faster than a case-insensitive
+    search.
+
+    :param data: buffer
+    :return: True if it might, otherwise False
+    """
+    return any(data.find(s) >= 0 for s in (b"qa", b"qA", b"Qa", b"QA")) and bool(
+        NOQA_BYTES_RE.search(data)
+    )
+
+
+def blank_line_numbers(data: Buffer) -> set[int] | None:
+    """
+    Finds blank lines by scanning the raw buffer of a module, without decoding it
+    and splitting it into lines.
+
+    :param data: buffer
+    :return: line numbers of blank lines, None if there are lines which can only be
+        judged once decoded
+    """
+    if (
+        UNSCANNABLE_FIRST_LINE_RE.match(data)
+        or UNSCANNABLE_LINE_RE.search(data)
+        or LONE_CARRIAGE_RETURN_RE.search(data)
+    ):
+        return None
+
+    output = {1} if FIRST_BLANK_LINE_BYTES_RE.match(data) else set()
+    add = output.add
+    lineno = 1
+    position = 0
+
+    for match in BLANK_LINE_BYTES_RE.finditer(data):
+        start = match.start()
+        lineno += data[position:start].count(b"\n")
+        position = start
+        add(lineno + 1)
+
+    return output
+
+
+def noqa_lines(lines: list[str]) -> dict[int, str]:
+    """
+    Maps line numbers to the text searched for a `# noqa` comment, the same way
+    Flake8 does - lines spanned by a token (e.g. a multi-line string) map to all
+    the lines joined together.
+
+    :param lines: lines of code
+    :return: line mapping
+    """
+    output = {}
+    first_line = last_line = None
+
+    try:
+        for token in tokenize.generate_tokens(iter(lines).__next__):
+            if token.type in (tokenize.ENDMARKER, tokenize.DEDENT):
+                continue
+
+            first_line = first_line or token.start[0]
+            last_line = max(last_line or 0, token.end[0])
+
+            if token.type in (tokenize.NL, tokenize.NEWLINE):
+                joined = "".join(lines[first_line - 1 : last_line])  # noqa: E203
+                output.update(dict.fromkeys(range(first_line, last_line + 1), joined))
+                first_line = last_line = None
+    except (tokenize.TokenError, SyntaxError, StopIteration):
+        return {n: line for n, line in enumerate(lines, start=1)}
+
+    return output
+
+
+def is_inline_ignored(code: str, line: str | None) -> bool:
+    """
+    Checks whether an error code is ignored by a `# noqa` comment.
+
+    :param code: error code
+    :param line: text searched for the comment
+    :return: True if it is, otherwise False
+    """
+    if not line or not (match := NOQA_INLINE_RE.search(line)):
+        return False
+
+    if (codes := match.group("codes")) is None:
+        return True
+
+    return code.startswith(tuple(c for c in CODE_SEPARATOR_RE.split(codes) if c))
+
+
+def syntax_error(exception: Exception) -> Error:
+    """
+    Turns an exception raised while parsing a module into an error.
+
+    :param exception: exception
+    :return: error
+    """
+    code = "E902" if isinstance(exception, tokenize.TokenError) else "E999"
+
+    if len(exception.args) > 1 and exception.args[1] and len(exception.args[1]) > 2:
+        lineno, offset = exception.args[1][1:3]
+    else:
+        lineno, offset = 1, 0
+
+    return Error(
+        lineno or 1,
+        offset or 0,
+        f"{code} {type(exception).__name__}: {exception.args[0]}",
+        StatementChecker,
+    )
+
+
+def check_lines(
+    lines: list[str],
+    disable_noqa: bool = False,
+    split_threshold: int | None = None,
+    changes: LineRanges | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> list[Error]:
+    """
+    Checks lines of code of a module.
+
+    :param lines: lines of code
+    :param disable_noqa: ignore `# noqa` comments
+    :param split_threshold: size in characters above which the module is split into
+        segments checked in parallel
+    :param segment_pool: pool checking the segments, a new pool of processes for
+        each split module by default
+    :param changes: check only the statements affected by these changed lines
+    :return: errors sorted by their position
+    """
+    if not disable_noqa and any(NOQA_FILE_RE.match(line) for line in lines):
+        return []
+
+    workers = segment_pool.workers if segment_pool else None
+    errors = None
+
+    if (
+        changes is None
+        and (count := segment_count(lines, split_threshold, workers)) > 1
+    ):
+        # The processes of the pool are started only once a module is split
+        executor = segment_pool.executor if segment_pool else None
+        errors = check_segments(lines, count, executor)
+
+    if errors is None:
+        try:
+            tree = ast.parse("".join(lines))
+        except (SyntaxError, ValueError) as e:
+            return [syntax_error(e)]
+
+        if changes is None:
+            errors = StatementChecker(tree=tree, lines=lines).run()
+        else:
+            errors = StatementChecker.for_changes(tree, lines, changes).run()
+
+    errors = sorted(errors, key=lambda e: (e.lineno, e.col_offset))
+
+    if errors and not disable_noqa and any("noqa" in line.lower() for line in lines):
+        mapping = noqa_lines(lines)
+        errors = [
+            e
+            for e in errors
+            if not is_inline_ignored(e.message.split(" ", 1)[0], mapping.get(e.lineno))
+        ]
+
+    return errors
+
+
+def check_source(
+    source: bytes | str,
+    disable_noqa: bool = False,
+    split_threshold: int | None = None,
+    changes: LineRanges | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> list[Error]:
+    """
+    Checks source code of a module.
+
+    :param source: source code
+    :param disable_noqa: ignore `# noqa` comments
+    :param split_threshold: size in characters above which the module is split into
+        segments checked in parallel
+    :param segment_pool: pool checking the segments, a new pool of processes for
+        each split module by default
+    :param changes: check only the statements affected by these changed lines
+    :return: errors sorted by their position
+    """
+    return check_lines(
+        read_lines(source),
+        disable_noqa=disable_noqa,
+        split_threshold=split_threshold,
+        changes=changes,
+        segment_pool=segment_pool,
+    )
+
+
+def check_buffer(
+    data: Buffer,
+    disable_noqa: bool = False,
+    split_threshold: int | None = None,
+    changes: LineRanges | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> list[Error]:
+    """
+    Checks a module from its raw buffer, e.g. a memory-mapped file. The buffer is
+    parsed as it is and blank lines are found by a bytes-level scan, so that it
+    doesn't need to be decoded into lines. Modules which need their lines - with
+    `noqa` comments, bigger than the split threshold, with unusual whitespace or
+    syntax errors - are checked from their lines. So are changes of modules, whose
+    blank lines are looked up only around the affected statements.
+
+    :param data: buffer
+    :param disable_noqa: ignore `# noqa` comments
+    :param split_threshold: size in characters above which the module is split into
+        segments checked in parallel
+    :param segment_pool: pool checking the segments, a new pool of processes for
+        each split module by default
+    :param changes: check only the statements affected by these changed lines
+    :return: errors sorted by their position
+    """
+    if (
+        changes is None
+        and (disable_noqa or not has_noqa(data))
+        and (not split_threshold or len(data) <= split_threshold)
+        and (blank_lines := blank_line_numbers(data)) is not None
+    ):
+        try:
+            tree = ast.parse(data)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            checker = StatementChecker(tree=tree, lines=[])
+            checker.blank_lines = blank_lines
+
+            return sorted(checker.run(), key=lambda e: (e.lineno, e.col_offset))
+
+    return check_source(
+        data[:],
+        disable_noqa=disable_noqa,
+        split_threshold=split_threshold,
+        changes=changes,
+        segment_pool=segment_pool,
+    )
+
+
+def check_file(
+    filename: str,
+    disable_noqa: bool = False,
+    journal: bool = False,
+    split_threshold: int | None = None,
+    changes: LineRanges | None = None,
+    segment_pool: SegmentPool | None = None,
+) -> FileResult:
+    """
+    Checks a file.
+
+    :param filename: file path
+    :param disable_noqa: ignore `# noqa` comments
+    :param journal: create the file's journal entry
+    :param split_threshold: size in characters above which the module is split into
+        segments checked in parallel
+    :param segment_pool: pool checking the segments, a new pool of processes for
+        each split module by default
+    :param changes: check only the statements affected by these changed lines
+    :return: result
+    """
+    try:
+        stat = os.stat(filename)
+
+        with open(filename, "rb") as f:
+            data = read_buffer(f, stat.st_size)
+    except OSError as e:
+        return FileResult(
+            filename,
+            [Error(1, 0, f"E902 {type(e).__name__}: {e}", StatementChecker)],
+        )
+
+    try:
+        return FileResult(
+            filename,
+            check_buffer(
+                data,
+                disable_noqa=disable_noqa,
+                split_threshold=split_threshold,
+                changes=changes,
+                segment_pool=segment_pool,
+            ),
+            JournalEntry.from_stat(stat, Journal.digest(data)) if journal else None,
+        )
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
@@ -0,0 +1,78 @@
+# Imported by the client of the daemon, so it imports no module that isn't loaded
+# at interpreter startup anyway - not even typing
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterator
+
+# A record is a name, the length of the payload in bytes as a decimal number and
+# the payload, separated by NUL bytes: NAME \0 LENGTH \0 PAYLOAD
+SEPARATOR = b"\0"
+BUFFER_SIZE = 1 << 16
+
+
+def encode_record(name: str, payload: bytes) -> bytes:
+    """
+    Encodes a record.
+
+    :param name: name, e.g. of a file
+    :param payload: payload, e.g. source code
+    :return: record
+    """
+    if SEPARATOR in (encoded := name.encode(errors="surrogateescape")):
+        raise ValueError(f"Name contains a NUL byte: {name!r}")
+
+    return b"".join(
+        (encoded, SEPARATOR, str(len(payload)).encode(), SEPARATOR, payload)
+    )
+
+
+def read_records(read: "Callable[[int], bytes]") -> "Iterator[tuple[str, bytes]]":
+    """
+    Reads records. Each record is yielded as soon as its last byte arrives, without
+    waiting for more input.
+
+    :param read: reads up to the given number of bytes, returning what's available
+        as soon as there's something, and nothing at the end of the input, e.g.
+        `read1()` of a binary stream or `recv()` of a socket
+    :return: names and payloads
+    """
+    buffer = bytearray()
+
+    def fill() -> bool:
+        data = read(BUFFER_SIZE)
+        buffer.extend(data)
+
+        return bool(data)
+
+    def field() -> bytes | None:
+        start = 0
+
+        while (end := buffer.find(SEPARATOR, start)) < 0:
+            start = len(buffer)
+
+            if not fill():
+                if buffer:
+                    raise ValueError("Truncated record")
+
+                return None
+
+        value = bytes(buffer[:end])
+        del buffer[: end + 1]
+
+        return value
+
+    while (name := field()) is not None:
+        length = field()
+
+        if length is None or not length.isdigit():
+            raise ValueError(f"Invalid length of record {name!r}: {length!r}")
+
+        while len(buffer) < int(length):
+            if not fill():
+                raise ValueError(f"Truncated record {name!r}")
+
+        payload = bytes(buffer[: int(length)])
+        del buffer[: int(length)]
+
+        yield name.decode(errors="surrogateescape"), payload
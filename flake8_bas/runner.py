@@ -0,0 +1,396 @@
+import itertools
+import os
+import sys
+import time
+from typing import Iterable, Iterator
+
+from .api import Source, check_chunks
+from .archives import ARCHIVE_ERRORS, archive_sources, is_archive
+from .checker import Error, StatementChecker
+from .config import Options, StyleGuides
+from .diff import LineRanges, changed_files
+from .discovery import DISCOVERY_THREADS, STDIN, Discovery
+from .distributed import serve
+from .git import Blob, CatFile, staged_blobs, tree_blobs
+from .journal import Journal
+from .processor import FileResult, check_source
+from .scheduler import FILE_COST, RunStats, batched, schedule
+from .shards import Shard
+
+
+def jobs_count(jobs: str | int) -> int:
+    """
+    Resolves the number of jobs.
+
+    :param jobs: number of jobs or "auto" for the number of CPUs
+    :return: number of jobs
+    """
+    if str(jobs) == "auto":
+        return os.cpu_count() or 1
+
+    return max(int(jobs), 1)
+
+
+class Runner:
+    """
+    Checks files outside of Flake8, optionally in a pool of workers.
+    """
+
+    __slots__ = (
+        "options",
+        "jobs",
+        "pool",
+        "journal",
+        "shard",
+        "address",
+        "token",
+        "split_threshold",
+        "memory_limit",
+        "recycle_after",
+        "discovery_threads",
+        "gitignore",
+        "rev",
+        "staged",
+        "changes",
+        "stdin_display_name",
+        "stats",
+        "discovery",
+    )
+
+    # Upper limit of files sent to a worker at once. Smaller chunks balance the load
+    # better, larger chunks reduce the overhead of inter-process communication.
+    MAX_CHUNK_SIZE = 64
+
+    def __init__(
+        self,
+        options: Options,
+        jobs: str | int = "auto",
+        pool: str = "process",
+        journal: Journal | None = None,
+        shard: Shard | None = None,
+        address: str | None = None,
+        token: bytes | None = None,
+        split_threshold: int | None = None,
+        memory_limit: int | None = None,
+        recycle_after: int | None = None,
+        discovery_threads: int = DISCOVERY_THREADS,
+        gitignore: bool = False,
+        rev: str | None = None,
+        staged: bool = False,
+        changes: dict[str, LineRanges] | None = None,
+        stdin_display_name: str = "stdin",
+    ) -> None:
+        """
+        :param options: options
+        :param jobs: number of workers or "auto"
+        :param pool: kind of the pool of workers - "process", "interpreter" or
+            "thread"
+        :param journal: change journal of previously checked files
+        :param shard: check only a part of the discovered files
+        :param address: serve the files to workers (`flake8-bas worker`) connected
+            to this address instead of checking them in a local pool
+        :param token: token shared with the workers, required by TCP addresses
+        :param split_threshold: size in characters above which a module is split
+            into segments checked in parallel
+        :param memory_limit: memory limit of all workers in bytes - fewer workers
+            are started and big files are checked by fewer workers at once
+        :param recycle_after: replace a worker process by a new one after it
+            checked this number of files, sending files to workers one at a time
+            (Python 3.11+)
+        :param discovery_threads: number of threads listing directories
+        :param gitignore: skip files and directories ignored by `.gitignore` files
+        :param rev: check files of this Git revision instead of the working tree
+        :param staged: check files of the Git staging index instead of the working
+            tree
+        :param changes: check only the changed files, and in them only
+            the statements affected by the changed lines
+        :param stdin_display_name: name of the file read from the standard input
+        """
+        self.options = options
+        self.jobs = jobs_count(jobs)
+        self.pool = pool
+        self.journal = journal
+        self.shard = shard
+        self.address = address
+        self.token = token
+        self.split_threshold = split_threshold
+        self.memory_limit = memory_limit
+        self.recycle_after = recycle_after
+        self.discovery_threads = discovery_threads
+        self.gitignore = gitignore
+        self.rev = rev
+        self.staged = staged
+        self.changes = changes
+        self.stdin_display_name = stdin_display_name
+        # Timings of chunks checked locally during the last run
+        self.stats: RunStats | None = None
+        # Discovery of files of the last run
+        self.discovery: Discovery | None = None
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        Returns the upper limit of files sent to a worker at once. Recycled workers
+        receive one file at a time, so that the tasks of a worker count its files.
+
+        :return: number of files
+        """
+        return 1 if self.recycle_after else self.MAX_CHUNK_SIZE
+
+    def _check(
+        self, filenames: list[str], archives: Iterable[str] = ()
+    ) -> Iterator[FileResult]:
+        """
+        Checks files either serially, in a local pool of workers or by remote
+        workers.
+
+        :param filenames: file paths
+        :param archives: paths of archives whose files are checked in the same pool
+            after the files, see `archive_sources()`
+        :return: results
+        """
+        archives = list(archives)
+
+        if not filenames and not archives:
+            return
+
+        if self.address:
+            yield from serve(
+                filenames,
+                self.address,
+                disable_noqa=self.options.disable_noqa,
+                journal=self.journal is not None,
+                token=self.token,
+            )
+
+            return
+
+        chunks = schedule(filenames, self.jobs, self.chunk_size)
+
+        if not archives:
+            yield from self._check_chunks(chunks, len(chunks))
+
+            return
+
+        # Members of archives are batched as they're read, so that the archives are
+        # neither extracted nor held in memory
+        failed: list[FileResult] = []
+        members = batched(
+            self._archive_sources(archives, failed),
+            self.chunk_size,
+            lambda item: len(item[1]) + FILE_COST,
+        )
+
+        yield from self._check_chunks(itertools.chain(chunks, members))
+
+        yield from failed
+
+    def _archive_sources(
+        self, archives: list[str], failed: list[FileResult]
+    ) -> Iterator[tuple[str, bytes]]:
+        """
+        Streams files of archives selected the way `discover()` would find them
+        in directories. An archive that can't be read is reported as an error of
+        the archive, after the files read before the error.
+
+        :param archives: paths of archives
+        :param failed: list to add results of unreadable archives to
+        :return: paths of the files within the archives and their contents
+        """
+        discovery = self.discovery or Discovery(
+            self.options, self.discovery_threads, self.gitignore
+        )
+
+        for archive in archives:
+            try:
+                yield from archive_sources(archive, discovery.select)
+            except ARCHIVE_ERRORS as e:
+                failed.append(
+                    FileResult(
+                        archive,
+                        [
+                            Error(
+                                1, 0, f"E902 {type(e).__name__}: {e}", StatementChecker
+                            )
+                        ],
+                    )
+                )
+
+    def _check_chunks(
+        self,
+        chunks: Iterable[list[Source]],
+        count: int | None = None,
+    ) -> Iterator[FileResult]:
+        """
+        Checks scheduled chunks in a local pool of workers.
+
+        :param chunks: chunks of file paths or pairs of a name and source code
+        :param count: number of chunks, None if they're streamed
+        :return: results
+        """
+        self.stats = RunStats()
+
+        yield from check_chunks(
+            chunks,
+            workers=self.jobs if count is None else min(self.jobs, count),
+            pool=self.pool,
+            disable_noqa=self.options.disable_noqa,
+            journal=self.journal is not None,
+            split_threshold=self.split_threshold,
+            stats=self.stats,
+            memory_limit=self.memory_limit,
+            max_tasks=self.recycle_after or None,
+            changes=self.changes,
+        )
+
+    def check_blobs(self, blobs: list[Blob]) -> Iterator[FileResult]:
+        """
+        Checks files of a revision or of the staging index read from Git. Files of
+        the same contents are checked once, and contents are read only as their
+        chunks are sent to workers.
+
+        :param blobs: files
+        :return: results
+        """
+        paths: dict[str, list[str]] = {}
+        sizes: dict[str, int] = {}
+
+        for blob in blobs:
+            paths.setdefault(blob.oid, []).append(blob.path)
+            sizes[blob.oid] = blob.size
+
+        if not paths:
+            return
+
+        chunks = schedule(
+            paths, self.jobs, self.chunk_size, lambda oid: sizes[oid] + FILE_COST
+        )
+
+        with CatFile() as cat_file:
+            # Results are reported under object ids, then copied to every path
+            sources = ([(oid, cat_file.read(oid)) for oid in chunk] for chunk in chunks)
+
+            for result in self._check_chunks(sources, len(chunks)):
+                for path in paths[result.filename]:
+                    yield FileResult(path, result.errors)
+
+    def run(self, paths: Iterable[str]) -> list[FileResult]:
+        """
+        Checks files and directories.
+
+        :param paths: files and directories
+        :return: results sorted by file names
+        """
+        output = []
+        pending = []
+        archives = []
+        self.discovery = Discovery(self.options, self.discovery_threads, self.gitignore)
+
+        if self.rev is not None or self.staged:
+            started = time.monotonic()
+            paths = list(paths)
+            blobs = (
+                tree_blobs(self.rev, paths)
+                if self.rev is not None
+                else staged_blobs(paths)
+            )
+            selected = set(self.discovery.select((b.path for b in blobs), paths))
+            self.discovery.elapsed = time.monotonic() - started
+            output = list(self.check_blobs([b for b in blobs if b.path in selected]))
+
+            return sorted(output, key=lambda r: r.filename)
+
+        if self.changes is not None:
+            started = time.monotonic()
+            paths = list(paths)
+            filenames = list(
+                self.discovery.select(changed_files(self.changes, paths), paths)
+            )
+            self.discovery.elapsed = time.monotonic() - started
+
+            return sorted(self._check(filenames), key=lambda r: r.filename)
+
+        # Files are looked up in the journal while directories are still being
+        # listed, checks start once all files are known to schedule them by size
+        filenames = self.discovery.discover(paths)
+
+        if self.shard:
+            filenames = self.shard.select(filenames)
+
+        for filename in filenames:
+            if filename == STDIN:
+                output.append(
+                    FileResult(
+                        self.stdin_display_name,
+                        check_source(
+                            sys.stdin.buffer.read(),
+                            disable_noqa=self.options.disable_noqa,
+                            split_threshold=self.split_threshold,
+                        ),
+                    )
+                )
+            elif is_archive(filename):
+                archives.append(filename)
+            elif self.journal and (cached := self.journal.lookup(filename)) is not None:
+                output.append(
+                    FileResult(filename, [Error(*e, StatementChecker) for e in cached])
+                )
+            else:
+                pending.append(filename)
+
+        for result in self._check(pending, archives):
+            if self.journal and result.entry:
+                self.journal.record(
+                    result.filename, result.entry, [e[:3] for e in result.errors]
+                )
+
+            output.append(result)
+
+        if self.journal:
+            self.journal.save()
+
+        return sorted(output, key=lambda r: r.filename)
+
+
+def format_error(filename: str, error: Error) -> str:
+    """
+    Formats an error the same way Flake8 does by default.
+
+    :param filename: file path
+    :param error: error
+    :return: formatted error
+    """
+    return f"{filename}:{error.lineno}:{error.col_offset + 1}: {error.message}"
+
+
+def reported_errors(
+    results: Iterable[FileResult], options: Options
+) -> Iterator[tuple[str, Error]]:
+    """
+    Filters errors based on the selected and ignored error codes.
+
+    :param results: results
+    :param options: options
+    :return: file paths and their reported errors
+    """
+    style_guides = StyleGuides(options)
+
+    for result in results:
+        style_guide = style_guides.for_file(result.filename)
+
+        for error in result.errors:
+            if style_guide.is_reported(error.message.split(" ", 1)[0]):
+                yield result.filename, error
+
+
+def journal_version(options: Options) -> str:
+    """
+    Returns the version of journal entries - cached results depend on the version
+    of the checker and on whether `# noqa` comments are respected.
+
+    :param options: options
+    :return: version
+    """
+    return (
+        f"{StatementChecker.version}{'+disable-noqa' if options.disable_noqa else ''}"
+    )
@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+from .shards import file_size
+
+# Estimated cost of checking a file on top of its size, i.e. of reading it and
+# sending it to a worker and its result back, in bytes of code
+FILE_COST = 512
+# Estimated cost of a chunk of small files sent to a worker at once
+TARGET_COST = 1 << 16
+
+T = TypeVar("T")
+
+# Estimated peak memory of checking a module per byte of its code - its lines,
+# tree and the checker's indices take up to 95 bytes per byte on CPython 3.11
+MEMORY_PER_BYTE = 100
+# Estimated memory of an idle worker process with the checker imported
+WORKER_MEMORY = 24 << 20
+
+
+def file_cost(filename: str) -> int:
+    """
+    Estimates the cost of checking a file.
+
+    :param filename: file path
+    :return: cost in bytes of code
+    """
+    return file_size(filename) + FILE_COST
+
+
+def source_size(item: str | os.PathLike | tuple[str, bytes | str]) -> int:
+    """
+    Returns size of a file or of a named source code.
+
+    :param item: file path or a pair of a name and source code
+    :return: size in bytes
+    """
+    if isinstance(item, tuple):
+        return len(item[1])
+
+    return file_size(os.fspath(item))
+
+
+def chunk_memory(chunk: list) -> int:
+    """
+    Estimates the peak memory of checking a chunk. Files of a chunk are checked one
+    by one, so it's the memory of checking its biggest file.
+
+    :param chunk: file paths or pairs of a name and source code
+    :return: memory in bytes
+    """
+    return max((source_size(i) for i in chunk), default=0) * MEMORY_PER_BYTE
+
+
+def memory_workers(limit: int, workers: int) -> int:
+    """
+    Reduces the number of workers so that idle workers take at most half of
+    the memory limit, leaving the rest to the chunks being checked.
+
+    :param limit: memory limit in bytes
+    :param workers: requested number of workers
+    :return: number of workers
+    """
+    return max(1, min(workers, limit // (2 * WORKER_MEMORY)))
+
+
+def schedule(
+    filenames: Iterable[str],
+    workers: int,
+    max_size: int,
+    cost: Callable[[str], int] = file_cost,
+) -> list[list[str]]:
+    """
+    Splits files into chunks sent to workers in the returned order. The most costly
+    files are sent first, each in a chunk of its own, so that a big file found last
+    doesn't extend the run by its whole duration. Small files are batched into chunks
+    of about the same cost so that they don't pay the overhead of a chunk each, while
+    each worker still receives several chunks to balance the load.
+
+    :param filenames: file paths
+    :param workers: number of workers
+    :param max_size: maximum number of files of a chunk
+    :param cost: estimates the cost of checking a file
+    :return: chunks of file paths
+    """
+    files = sorted((-cost(f), f) for f in filenames)
+    total = -sum(cost for cost, _ in files)
+    target = max(1, min(TARGET_COST, total // (max(workers, 1) * 4)))
+    output: list[list[str]] = []
+    chunk: list[str] = []
+    chunk_cost = 0
+
+    for negative_cost, filename in files:
+        if chunk and (chunk_cost - negative_cost > target or len(chunk) >= max_size):
+            output.append(chunk)
+            chunk = []
+            chunk_cost = 0
+
+        chunk.append(filename)
+        chunk_cost -= negative_cost
+
+    if chunk:
+        output.append(chunk)
+
+    return output
+
+
+def batched(
+    items: Iterable[T],
+    max_size: int,
+    cost: Callable[[T], int],
+    target: int = TARGET_COST,
+) -> Iterator[list[T]]:
+    """
+    Batches a stream of files into chunks in the order they arrive, for files that
+    can't be sorted by cost up front, e.g. members of an archive read as they're
+    decompressed. Consecutive small files are batched into chunks of about
+    the target cost, a costly file ends up in a chunk on its own. A chunk is
+    yielded as soon as it's full, without waiting for the next file.
+
+    :param items: files, e.g. pairs of a name and source code
+    :param max_size: maximum number of files of a chunk
+    :param cost: estimates the cost of checking a file
+    :param target: cost of a chunk
+    :return: chunks of files
+    """
+    chunk: list[T] = []
+    chunk_cost = 0
+
+    for item in items:
+        item_cost = cost(item)
+
+        if chunk and chunk_cost + item_cost > target:
+            yield chunk
+
+            chunk = []
+            chunk_cost = 0
+
+        chunk.append(item)
+        chunk_cost += item_cost
+
+        if chunk_cost >= target or len(chunk) >= max_size:
+            yield chunk
+
+            chunk = []
+            chunk_cost = 0
+
+    if chunk:
+        yield chunk
+
+
+def worker_name() -> str:
+    """
+    Identifies the current worker - a process, a subinterpreter's or a pool's thread.
+
+    :return: process and thread identifiers
+    """
+    return f"{os.getpid()}:{threading.get_native_id()}"
+
+
+class ChunkTiming(NamedTuple):
+    """
+    When and by which worker a chunk was checked.
+    """
+
+    worker: str
+    started: float
+    finished: float
+    files: int
+
+
+class WorkerStats(NamedTuple):
+    """
+    Summary of the chunks a worker checked during a run.
+    """
+
+    worker: str
+    chunks: int
+    files: int
+    busy: float
+    # Time of the run the worker spent starting up or waiting for a chunk
+    idle: float
+
+
+class RunStats:
+    """
+    Timings of chunks checked during a run, collected by the parent as results
+    arrive.
+    """
+
+    __slots__ = ("started", "finished", "timings")
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.finished: float | None = None
+        self.timings: list[ChunkTiming] = []
+
+    def record(self, timing: ChunkTiming) -> None:
+        """
+        Records the timing of a checked chunk.
+
+        :param timing: timing
+        """
+        self.timings.append(timing)
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Returns the duration of the run up to the last checked chunk.
+
+        :return: seconds
+        """
+        return (self.finished or self.started) - self.started
+
+    def workers(self) -> list[WorkerStats]:
+        """
+        Summarizes the timings per worker. Timings are measured by the monotonic
+        clock, which is shared by all processes of the machine.
+
+        :return: stats of each worker sorted by the worker's identifier
+        """
+        timings: defaultdict[str, list[ChunkTiming]] = defaultdict(list)
+
+        for timing in self.timings:
+            timings[timing.worker].append(timing)
+
+        output = []
+
+        for worker, chunks in sorted(timings.items()):
+            busy = sum(t.finished - t.started for t in chunks)
+            output.append(
+                WorkerStats(
+                    worker,
+                    len(chunks),
+                    sum(t.files for t in chunks),
+                    busy,
+                    max(self.elapsed - busy, 0.0),
+                )
+            )
+
+        return output
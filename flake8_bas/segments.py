@@ -0,0 +1,395 @@
+import ast
+import multiprocessing.util
+import os
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import NamedTuple
+
+from .checker import STATEMENT_TYPES, Error, StatementChecker
+
+# Lines a module can be split at - code in the first column which neither continues
+# a compound statement nor starts with a string, which could be a part of a chain
+# of constant expressions
+SPLIT_LINE_RE = re.compile(
+    r"(?!(?:else|elif|except|finally)\b)(?![rRbBuUfF]{0,2}[\"'])[^\s#)\]}]"
+)
+# Endings of lines the following line can't be split at
+CONTINUATION_ENDINGS = ("\\", ",", "(", "[", "{")
+
+# Position of an error in the order of the serial run - level of the evaluated node
+# in the tree, segment, position of the node within the level and the segment, and
+# 0 for an error before the statement or 1 for an error after it
+ErrorKey = tuple[int, int, int, int]
+
+
+class SegmentResult(NamedTuple):
+    """
+    Errors of a segment of a module - a range of its top-level statements - and
+    details of the first and the last statement of the segment, whose errors depend
+    on the neighbouring segments.
+    """
+
+    errors: list[tuple[ErrorKey, int, int, str]]
+    # False if an error depends on the neighbouring segments in a way that can't be
+    # stitched, i.e. the module needs to be checked serially
+    resolved: bool
+    first_key: tuple[int, int]
+    first_end: int
+    last_key: tuple[int, int]
+    # First line of the last top-level statement other than a constant expression
+    tail_start: int | None
+
+
+class SegmentPool:
+    """
+    Pool of processes checking segments of the modules split during a run, shared
+    by all of them instead of starting processes for each module. The processes are
+    started when the first module is split.
+
+    A pool sent to a worker process is replaced by a pool of the same size owned
+    by that process, shared by all chunks the worker checks.
+    """
+
+    __slots__ = ("workers", "_executor", "_lock")
+
+    def __init__(self, workers: int | None = None) -> None:
+        """
+        :param workers: number of processes, one per CPU by default
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        # Threads of a run split modules at the same time
+        self._lock = threading.Lock()
+
+    def __reduce__(self) -> tuple:
+        return worker_segment_pool, (self.workers,)
+
+    def __enter__(self) -> "SegmentPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+
+    @property
+    def executor(self) -> Executor:
+        """
+        Returns the executor of the pool, starting it if needed.
+
+        :return: executor
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+            return self._executor
+
+    def shutdown(self) -> None:
+        """
+        Stops the processes of the pool.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown()
+
+
+# Pools of this process received by `SegmentPool.__reduce__()`, by their size
+_worker_pools: dict[int, SegmentPool] = {}
+
+
+def worker_segment_pool(workers: int) -> SegmentPool:
+    """
+    Returns the pool checking segments of modules split by this worker process.
+
+    :param workers: number of processes of the pool
+    :return: pool
+    """
+    if (pool := _worker_pools.get(workers)) is None:
+        pool = _worker_pools[workers] = SegmentPool(workers)
+        # Worker processes exit without running `atexit` handlers, and they wait
+        # for their children to exit first. The pool is shut down before
+        # the finalizers of its queues (priority 10) stop feeding them.
+        multiprocessing.util.Finalize(None, pool.shutdown, exitpriority=100)
+
+    return pool
+
+
+def split_points(lines: list[str], count: int) -> list[int]:
+    """
+    Finds lines splitting a module into segments of about the same size. Lines are
+    only scanned by simple heuristics, so a split may still be invalid, e.g. within
+    a string - then a segment fails to parse and the module is checked serially.
+
+    :param lines: lines of code
+    :param count: number of segments
+    :return: indices of the first lines of all segments but the first one
+    """
+    target = sum(len(line) for line in lines) / count
+    output = []
+    offset = 0
+    code_seen = False
+    in_string = False
+    previous = ""
+
+    for index, line in enumerate(lines):
+        if (
+            code_seen
+            and not in_string
+            and offset >= target * (len(output) + 1)
+            and SPLIT_LINE_RE.match(line)
+            and not previous.rstrip().endswith(CONTINUATION_ENDINGS)
+            and not previous.startswith("@")
+        ):
+            output.append(index)
+
+            if len(output) == count - 1:
+                break
+
+        offset += len(line)
+
+        if (line.count('"""') + line.count("'''")) % 2:
+            in_string = not in_string
+
+        if (stripped := line.strip()) and not stripped.startswith("#"):
+            code_seen = True
+            previous = line
+
+    return output
+
+
+def _parse(lines: list[str], first_line: int) -> tuple[ast.Module, StatementChecker]:
+    """
+    Parses a part of a module keeping line numbers of the module and creates
+    a checker of the part.
+
+    :param lines: lines of code of the part
+    :param first_line: line number of the first line
+    :return: tree, checker
+    """
+    tree = ast.parse("\n" * (first_line - 1) + "".join(lines))
+    checker = StatementChecker(tree=tree, lines=lines)
+    checker.blank_lines = {n + first_line - 1 for n in checker.blank_lines}
+
+    return tree, checker
+
+
+def _first_line(node: ast.stmt) -> int:
+    """
+    Returns the first line of a statement including its decorators.
+
+    :param node: statement
+    :return: line number
+    """
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+
+def _evaluated_node(node: ast.stmt) -> ast.AST:
+    """
+    Returns the node a statement is evaluated on behalf of - `yield (from)` is
+    wrapped in an expression.
+
+    :param node: statement
+    :return: node
+    """
+    if isinstance(node, ast.Expr) and isinstance(
+        node.value, (ast.Yield, ast.YieldFrom)
+    ):
+        return node.value
+
+    return node
+
+
+def _is_constant(node: ast.stmt) -> bool:
+    """
+    Checks whether a statement is a constant expression, e.g. a docstring.
+
+    :param node: statement
+    :return: True if it is, otherwise False
+    """
+    return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+
+
+def check_segment(
+    lines: list[str], first_line: int, segment: int
+) -> SegmentResult | None:
+    """
+    Checks a segment of a module.
+
+    The nodes of a whole module are evaluated in breadth-first order, which is the
+    order of the nodes of each level of the tree, segment by segment. Neighbours of
+    a node therefore only differ from the serial run if the node is the first or
+    the last node of its level within the segment. Such nodes are either top-level
+    statements, which are evaluated separately, the first or the last statements
+    of their blocks, whose errors don't depend on their neighbours, or bare `yield`
+    expressions, which make the segment unresolved.
+
+    :param lines: lines of code of the segment
+    :param first_line: line number of the first line of the segment
+    :param segment: index of the segment
+    :return: result, None if the segment can't be parsed
+    """
+    try:
+        tree, checker = _parse(lines, first_line)
+    except (SyntaxError, ValueError):
+        return None
+
+    body = tree.body
+    levels: dict[ast.AST, int] = {tree: 0}
+    counts: defaultdict[int, int] = defaultdict(int)
+    keys = {}
+
+    def level(node: ast.AST) -> int:
+        if (value := levels.get(node)) is None:
+            value = levels[node] = level(checker.parents[node]) + 1
+
+        return value
+
+    for node in checker.nodes:
+        node_level = level(node)
+        keys[node] = (node_level, counts[node_level])
+        counts[node_level] += 1
+
+    errors = []
+    resolved = not (segment and _is_constant(body[0]))
+
+    for node in checker.nodes:
+        if not isinstance(node, STATEMENT_TYPES):
+            continue
+
+        node_level, position = keys[node]
+
+        if (
+            node_level > 1
+            and position in (0, counts[node_level] - 1)
+            and isinstance(node, (ast.Yield, ast.YieldFrom))
+            and _evaluated_node(checker.parents[node]) is not node
+        ):
+            resolved = False
+
+        for kind in (0, 1):
+            errors.extend(
+                ((node_level, segment, position, kind), *error[:3])
+                for error in checker._node_errors(
+                    node=node, before=not kind, after=bool(kind)
+                )
+            )
+
+    tail = [node for node in body if not _is_constant(node)]
+
+    return SegmentResult(
+        errors,
+        resolved,
+        keys[_evaluated_node(body[0])],
+        body[0].end_lineno,
+        keys[_evaluated_node(body[-1])],
+        _first_line(tail[-1]) if tail else None,
+    )
+
+
+def _window_errors(
+    lines: list[str], first_line: int, split_line: int
+) -> list[tuple[bool, Error]] | None:
+    """
+    Checks the statements around a boundary of two segments - the error before
+    the first statement of the latter segment and the error after the last
+    statement of the former one.
+
+    :param lines: lines of code from the first statement either of them depends on
+    :param first_line: line number of the first line
+    :param split_line: first line of the latter segment
+    :return: pairs of a flag whether the error belongs to the latter segment and
+        the error, None if the lines can't be parsed
+    """
+    try:
+        tree, checker = _parse(lines, first_line)
+    except (SyntaxError, ValueError):
+        return None
+
+    index = next(i for i, n in enumerate(tree.body) if _first_line(n) >= split_line)
+    first, last = tree.body[index], tree.body[index - 1]
+
+    return [
+        (True, e) for e in checker._node_errors(_evaluated_node(first), after=False)
+    ] + [(False, e) for e in checker._node_errors(_evaluated_node(last), before=False)]
+
+
+def check_segments(
+    lines: list[str], count: int, executor: Executor | None = None
+) -> list[Error] | None:
+    """
+    Checks a module split into segments in parallel and stitches the errors at
+    the boundaries of the segments back together, producing the same errors in
+    the same order as the serial run.
+
+    :param lines: lines of code
+    :param count: number of segments
+    :param executor: executor the segments are sent to, a new pool of processes
+        by default
+    :return: errors, None if the module can't be split and needs to be checked
+        serially
+    """
+    if count < 2 or not (points := split_points(lines, count)):
+        return None
+
+    bounds = list(zip([0, *points], [*points, len(lines)]))
+    pool = executor or ProcessPoolExecutor(max_workers=len(bounds))
+
+    try:
+        futures = [
+            pool.submit(check_segment, lines[start:end], start + 1, segment)
+            for segment, (start, end) in enumerate(bounds)
+        ]
+        results = [f.result() for f in futures]
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+    if not all(r and r.resolved for r in results):
+        return None
+
+    errors = [e for r in results for e in r.errors]
+
+    for segment in range(1, len(results)):
+        # Errors around the boundary may depend on a chain of constant expressions
+        # at the end of the preceding segments
+        starts = [r.tail_start for r in results[:segment] if r.tail_start]
+        start = starts[-1] if starts else 1
+        end = results[segment].first_end
+        window = lines[start - 1 : end]  # noqa: E203
+
+        if (stitched := _window_errors(window, start, bounds[segment][0] + 1)) is None:
+            return None
+
+        for latter, error in stitched:
+            if latter:
+                level, position = results[segment].first_key
+                key = (level, segment, position, 0)
+            else:
+                level, position = results[segment - 1].last_key
+                key = (level, segment - 1, position, 1)
+
+            errors.append((key, *error[:3]))
+
+    return [Error(*e[1:], StatementChecker) for e in sorted(errors)]
+
+
+def segment_count(
+    lines: list[str], threshold: int | None, workers: int | None = None
+) -> int:
+    """
+    Decides into how many segments a module is split - modules bigger than
+    the threshold are split into one segment per process checking them.
+
+    :param lines: lines of code
+    :param threshold: size threshold in characters, None to never split
+    :param workers: number of processes checking the segments, one per CPU
+        by default
+    :return: number of segments
+    """
+    if not threshold or sum(len(line) for line in lines) <= threshold:
+        return 1
+
+    return workers or os.cpu_count() or 1
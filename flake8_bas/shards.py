@@ -0,0 +1,158 @@
+import heapq
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+# A reported error - file path, line number, column offset and message
+ReportedError = tuple[str, int, int, str]
+
+SHARD_RE = re.compile(r"^(?P<index>\d+)/(?P<count>\d+)$")
+
+
+class Shard(NamedTuple):
+    """
+    One of `count` parts of the checked files, numbered from 1.
+    """
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Shard":
+        """
+        Parses a shard in the form of "INDEX/COUNT", e.g. "3/16".
+
+        :param value: raw value
+        :return: shard
+        """
+        if not (match := SHARD_RE.match(value.strip())):
+            raise ValueError(f"Expected INDEX/COUNT, got {value!r}")
+
+        shard = cls(int(match.group("index")), int(match.group("count")))
+
+        if not 1 <= shard.index <= shard.count:
+            raise ValueError(f"Shard index must be between 1 and {shard.count}")
+
+        return shard
+
+    def __str__(self) -> str:
+        """
+        Returns the shard in the form of "INDEX/COUNT".
+
+        :return: shard
+        """
+        return f"{self.index}/{self.count}"
+
+    def select(self, filenames: Iterable[str]) -> list[str]:
+        """
+        Selects files belonging to the shard.
+
+        :param filenames: all file paths
+        :return: file paths of the shard
+        """
+        return partition(filenames, self.count)[self.index - 1]
+
+
+def file_size(filename: str) -> int:
+    """
+    Returns size of a file, 0 if it can't be determined.
+
+    :param filename: file path
+    :return: size in bytes
+    """
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+def partition(filenames: Iterable[str], count: int) -> list[list[str]]:
+    """
+    Splits files into parts of about the same total size, so that checks of all
+    parts take about the same time. Files are assigned from the largest to the
+    smallest, each to the part with the smallest total size (then the smallest
+    number of files, e.g. for empty `__init__.py` files) so far. The result
+    only depends on the file names and sizes, not on the order they are discovered
+    in, so every CI node computes the same partitioning.
+
+    :param filenames: file paths
+    :param count: number of parts
+    :return: sorted file paths of each part
+    """
+    files = sorted((-file_size(f), f) for f in set(filenames))
+    parts: list[list[str]] = [[] for _ in range(count)]
+    totals = [(0, 0, index) for index in range(count)]
+
+    for negative_size, filename in files:
+        total, length, index = heapq.heappop(totals)
+        parts[index].append(filename)
+        heapq.heappush(totals, (total - negative_size, length + 1, index))
+
+    return [sorted(part) for part in parts]
+
+
+def save_results(
+    file: Path, shard: Shard | None, files: int, errors: list[ReportedError]
+) -> None:
+    """
+    Stores reported errors of a run, so that results of all shards can be merged.
+
+    :param file: results file
+    :param shard: shard the run checked, None if it checked all files
+    :param files: number of checked files
+    :param errors: reported errors
+    """
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(
+        json.dumps(
+            {
+                "shard": str(shard) if shard else None,
+                "files": files,
+                "errors": errors,
+            },
+            separators=(",", ":"),
+        )
+    )
+
+
+def merge_results(files: Iterable[Path]) -> tuple[int, list[ReportedError]]:
+    """
+    Merges results of shards. Raises `ValueError` if any shard is missing,
+    duplicated or the shards don't agree on their count.
+
+    :param files: results files
+    :return: number of checked files, reported errors sorted by file path and
+        position
+    """
+    checked = 0
+    errors: list[ReportedError] = []
+    shards = []
+
+    for file in files:
+        data = json.loads(Path(file).read_text())
+        checked += data["files"]
+        errors.extend(tuple(e) for e in data["errors"])
+        shards.append(Shard.parse(data["shard"]) if data["shard"] else None)
+
+    counts = {s.count for s in shards if s}
+
+    if len(counts) > 1 or (counts and None in shards):
+        raise ValueError("Results of different partitionings can't be merged")
+
+    if counts:
+        expected = set(range(1, counts.pop() + 1))
+        indices = [s.index for s in shards]
+
+        if missing := expected - set(indices):
+            raise ValueError(
+                f"Missing shard(s): {', '.join(map(str, sorted(missing)))}"
+            )
+
+        if len(indices) != len(set(indices)):
+            raise ValueError("Duplicate shard(s)")
+
+    # Errors at the same position keep the order they were reported in, as in a run
+    # without shards
+    return checked, sorted(errors, key=lambda error: error[:3])
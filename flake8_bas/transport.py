@@ -0,0 +1,84 @@
+import struct
+from typing import NamedTuple
+
+from .checker import STATEMENTS, Error, StatementChecker
+from .journal import JournalEntry
+from .processor import FileResult
+from .scheduler import ChunkTiming
+
+ERROR_TYPES = ("before", "after", "sibling")
+# Every message the checker produces, identified by its position in the table
+MESSAGES = tuple(s.error_message(t) for s in STATEMENTS for t in ERROR_TYPES)
+MESSAGE_IDS = {message: index for index, message in enumerate(MESSAGES)}
+
+# Fixed-width record of an error - index of the file within its chunk, line number,
+# column offset and identifier of the message
+RECORD = struct.Struct("=IIIH")
+
+
+class PackedChunk(NamedTuple):
+    """
+    Results of a chunk in the compact form sent by a worker to the parent. File
+    names are not sent back - the parent knows which files it sent in the chunk.
+    """
+
+    records: bytes
+    # Messages missing in the table (e.g. of syntax errors), identified by their
+    # position following the table
+    extras: tuple[str, ...]
+    # Journal entries of the files, None if none of the files has one
+    entries: tuple[JournalEntry | None, ...] | None
+    timing: ChunkTiming | None = None
+
+
+def pack_chunk(
+    results: list[FileResult], timing: ChunkTiming | None = None
+) -> PackedChunk:
+    """
+    Packs results of a chunk into fixed-width records.
+
+    :param results: results of the files of the chunk
+    :param timing: timing of the chunk
+    :return: packed results
+    """
+    records = bytearray()
+    extras: dict[str, int] = {}
+
+    for index, result in enumerate(results):
+        for error in result.errors:
+            if (identifier := MESSAGE_IDS.get(error.message)) is None:
+                identifier = extras.setdefault(
+                    error.message, len(MESSAGES) + len(extras)
+                )
+
+            records += RECORD.pack(index, error.lineno, error.col_offset, identifier)
+
+    entries = tuple(r.entry for r in results)
+
+    return PackedChunk(
+        bytes(records),
+        tuple(extras),
+        entries if any(entries) else None,
+        timing,
+    )
+
+
+def unpack_chunk(names: list[str], packed: PackedChunk) -> list[FileResult]:
+    """
+    Restores results of a chunk, taking messages from the static table.
+
+    :param names: names of the files of the chunk in the order they were sent
+    :param packed: packed results
+    :return: results
+    """
+    messages = MESSAGES + packed.extras
+    errors: list[list[Error]] = [[] for _ in names]
+
+    for index, lineno, col_offset, identifier in RECORD.iter_unpack(packed.records):
+        errors[index].append(
+            Error(lineno, col_offset, messages[identifier], StatementChecker)
+        )
+
+    entries = packed.entries or (None,) * len(names)
+
+    return [FileResult(*result) for result in zip(names, errors, entries)]
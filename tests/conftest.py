@@ -1,5 +1,7 @@
 import ast
 import re
+import shutil
+import subprocess  # nosec B404
 import sys
 from dataclasses import dataclass
 from pathlib import Path
@@ -14,6 +16,11 @@ FILE_FORMAT = re.compile(r"([a-z_]+)-?(\d*)")
 STATEMENT_MAP = {s.keyword: s for s in STATEMENTS}
 TEST_ROOT = Path(__file__).parent
 
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="Requires Git")
+
 
 @dataclass(frozen=True)
 class StatementTest:
@@ -136,3 +143,30 @@ def statement_test(request: SubRequest, checker: Callable) -> StatementTest:
         statement_from_file(request.param),
         error_count_from_file(request.param),
     )
+
+
+def git(*arguments: str) -> None:
+    """
+    Runs a Git command in the current directory as a test user.
+
+    :param arguments: arguments of the command
+    """
+    subprocess.run(  # nosec B603 B607
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+        + list(arguments),
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture()
+def git_repository(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    Creates an empty Git repository in a temporary directory and changes into it.
+
+    :return: root of the repository
+    """
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q", ".")
+
+    return tmp_path
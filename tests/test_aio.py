@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from flake8_bas import DocumentChecker, acheck_files, acheck_source
+from flake8_bas.processor import check_source
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+
+
+def test_acheck_source():
+    assert asyncio.run(acheck_source(INVALID)) == check_source(INVALID)
+
+
+@pytest.mark.parametrize("ordered", (False, True))
+def test_acheck_files(tmp_path: Path, ordered: bool):
+    (tmp_path / "module.py").write_text(INVALID)
+    items = [(f"{i}.py", VALID) for i in range(20)] + [tmp_path / "module.py"]
+
+    async def collect() -> list:
+        return [r async for r in acheck_files(items, concurrency=3, ordered=ordered)]
+
+    results = asyncio.run(collect())
+
+    assert len(results) == len(items)
+    assert [r.filename for r in results if r.errors] == [str(tmp_path / "module.py")]
+
+    if ordered:
+        assert [r.filename for r in results][:20] == [n for n, _ in items[:20]]
+
+
+def test_document_checker(monkeypatch: pytest.MonkeyPatch):
+    release = threading.Event()
+
+    def slow_check_source(source: str, **kwargs) -> list:
+        if source == INVALID:
+            release.wait(5)
+
+        return check_source(source, **kwargs)
+
+    monkeypatch.setattr("flake8_bas.aio.check_source", slow_check_source)
+
+    async def run() -> tuple:
+        documents = DocumentChecker()
+        outdated = asyncio.ensure_future(documents.check("file:///a.py", INVALID))
+        await asyncio.sleep(0.01)
+        latest = await documents.check("file:///a.py", VALID)
+        release.set()
+
+        return outdated, latest, documents.tasks
+
+    outdated, latest, tasks = asyncio.run(run())
+
+    assert outdated.cancelled()
+    assert latest == []
+    assert tasks == {}
@@ -0,0 +1,264 @@
+import gc
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import count
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from flake8_bas import FileResult, check_files
+from flake8_bas.api import (
+    GC_FREEZE_VARIABLE,
+    _segment_pool,
+    check_chunks,
+    create_pool,
+)
+from flake8_bas.scheduler import WORKER_MEMORY, RunStats
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+
+
+def sources(total: int, consumed: list | None = None) -> iter:
+    for index in range(total):
+        if consumed is not None:
+            consumed.append(index)
+
+        yield f"module_{index}.py", INVALID if index % 2 else VALID
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def submit(self, *args, **kwargs):
+        future = super().submit(*args, **kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        future.add_done_callback(
+            lambda _: setattr(self, "in_flight", self.in_flight - 1)
+        )
+
+        return future
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_check_files(workers: int):
+    results = list(check_files(sources(50), workers=workers, chunk_size=4))
+
+    assert all(isinstance(r, FileResult) for r in results)
+    assert sorted(r.filename for r in results) == sorted(n for n, _ in sources(50))
+    assert sum(len(r.errors) for r in results) == 25
+
+
+def test_check_files_ordered():
+    results = check_files(sources(50), workers=2, ordered=True, chunk_size=3)
+
+    assert [r.filename for r in results] == [n for n, _ in sources(50)]
+
+
+def test_check_files_paths(tmp_path: Path):
+    (tmp_path / "module.py").write_text(INVALID)
+    results = list(check_files([tmp_path / "module.py", str(tmp_path / "x.py")]))
+
+    assert results[0].filename == str(tmp_path / "module.py")
+    assert results[0].errors[0].message.startswith("BAS506")
+    assert results[1].errors[0].message.startswith("E902")
+
+
+def test_check_files_window():
+    consumed = []
+
+    with CountingExecutor() as executor:
+        results = check_files(
+            sources(1000, consumed), window=3, chunk_size=5, executor=executor
+        )
+
+        for _ in zip(range(100), results):
+            assert len(consumed) <= (3 + 1) * 5 + 100
+
+    assert executor.max_in_flight <= 3
+
+
+def test_check_files_lazy():
+    results = check_files(((f"{i}.py", VALID) for i in count()), workers=2)
+
+    assert len([r for _, r in zip(range(100), results)]) == 100
+
+
+@pytest.mark.skipif(sys.version_info < (3, 14), reason="Requires Python 3.14+")
+def test_check_files_interpreters():
+    results = list(check_files(sources(50), workers=2, pool="interpreter"))
+
+    assert sum(len(r.errors) for r in results) == 25
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 14), reason="Requires Python <3.14")
+def test_interpreter_pool_unsupported():
+    with pytest.raises(RuntimeError):
+        create_pool("interpreter", 2)
+
+
+def test_unknown_pool():
+    with pytest.raises(ValueError):
+        create_pool("abc", 2)
+
+
+def test_check_files_threads_stress(file_fixture):
+    files = sorted(file_fixture("").rglob("*.py")) * 20
+    expected = list(check_files(files))
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        results = list(
+            check_files(files, workers=8, ordered=True, chunk_size=1, pool="thread")
+        )
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert results == expected
+
+
+@pytest.mark.parametrize("memory_limit", (None, 4 * WORKER_MEMORY))
+def test_check_chunks_memory_limit(
+    memory_limit: int | None, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr("flake8_bas.api.chunk_memory", lambda _: 2 * WORKER_MEMORY)
+    executor = CountingExecutor()
+    chunks = [[(f"module_{i}.py", INVALID)] for i in range(8)]
+
+    with executor:
+        results = list(
+            check_chunks(
+                chunks, workers=2, executor=executor, memory_limit=memory_limit
+            )
+        )
+
+    assert len(results) == 8
+    # Two chunks would need more memory than is left after the workers
+    assert (executor.max_in_flight == 1) is bool(memory_limit)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="Requires Python 3.11+")
+def test_check_chunks_recycled_workers():
+    chunks = [[(f"module_{i}.py", INVALID)] for i in range(6)]
+    stats = RunStats()
+    results = list(check_chunks(chunks, workers=2, max_tasks=1, stats=stats))
+
+    assert len(results) == 6
+    assert len(stats.workers()) == 6
+
+
+def test_recycled_threads():
+    with pytest.raises(ValueError):
+        create_pool("thread", 2, max_tasks=1)
+
+
+@pytest.mark.parametrize("value", ["1", None])
+def test_gc_freeze(monkeypatch: pytest.MonkeyPatch, value: str | None):
+    if value is None:
+        monkeypatch.delenv(GC_FREEZE_VARIABLE, raising=False)
+    else:
+        monkeypatch.setenv(GC_FREEZE_VARIABLE, value)
+
+    frozen = gc.get_freeze_count()
+
+    with create_pool("process", 1) as executor:
+        worker_frozen = executor.submit(gc.get_freeze_count).result()
+
+    # Opt-in, and only the workers are frozen
+    assert bool(worker_frozen) == (value == "1")
+    assert gc.get_freeze_count() == frozen
+
+
+@pytest.mark.parametrize(
+    "executor, pool, workers, expected",
+    (
+        (None, "process", 1, 4),
+        (None, "process", 2, 2),
+        # Workers taking all CPUs don't split modules
+        (None, "process", 4, None),
+        (None, "thread", 4, 4),
+        (None, "interpreter", 2, None),
+        (ThreadPoolExecutor, "process", 2, 4),
+        (ProcessPoolExecutor, "thread", 2, 2),
+    ),
+)
+def test_segment_pool(
+    monkeypatch: pytest.MonkeyPatch,
+    executor: type | None,
+    pool: str,
+    workers: int,
+    expected: int | None,
+):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    segment_pool = _segment_pool(executor and executor(1), pool, workers)
+
+    assert (segment_pool and segment_pool.workers) == expected
+
+
+def split_sources(file_fixture: Callable) -> list[tuple[str, str]]:
+    source = "\n".join(p.read_text() for p in sorted(file_fixture("").rglob("*.py")))
+
+    return [(f"module_{i}.py", source) for i in range(4)]
+
+
+def test_split_threads(monkeypatch: pytest.MonkeyPatch, file_fixture: Callable):
+    items = split_sources(file_fixture)
+    expected = list(check_files(items, ordered=True))
+    pools = []
+
+    def counting_pool(max_workers: int) -> ThreadPoolExecutor:
+        pools.append(max_workers)
+
+        return ThreadPoolExecutor(max_workers)
+
+    monkeypatch.setattr("os.cpu_count", lambda: 3)
+    monkeypatch.setattr("flake8_bas.segments.ProcessPoolExecutor", counting_pool)
+    results = list(
+        check_files(
+            items,
+            workers=2,
+            ordered=True,
+            chunk_size=1,
+            pool="thread",
+            split_threshold=1000,
+        )
+    )
+
+    assert results == expected
+    # A single pool of the run is shared by the threads
+    assert pools == [3]
+
+
+@pytest.mark.parametrize("max_tasks", (None, 1))
+def test_split_processes(
+    monkeypatch: pytest.MonkeyPatch, file_fixture: Callable, max_tasks: int | None
+):
+    items = split_sources(file_fixture)
+    # Each of the worker processes gets a pool of 2 processes
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    chunks = [[item] for item in items]
+    results = list(
+        check_chunks(
+            chunks, workers=2, ordered=True, split_threshold=1000, max_tasks=max_tasks
+        )
+    )
+
+    assert results == list(check_files(items, ordered=True))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 14), reason="Requires Python 3.14+")
+def test_split_interpreters(file_fixture: Callable):
+    items = split_sources(file_fixture)
+    results = list(
+        check_files(
+            items, workers=2, ordered=True, pool="interpreter", split_threshold=1000
+        )
+    )
+
+    assert results == list(check_files(items, ordered=True))
@@ -0,0 +1,110 @@
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.archives import archive_sources, is_archive, member_path
+from flake8_bas.cli import main
+from flake8_bas.config import Options
+from flake8_bas.discovery import Discovery
+from flake8_bas.runner import Runner
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+MEMBERS = {
+    "pkg/__init__.py": VALID,
+    "pkg/mod.py": INVALID,
+    "pkg/data.txt": INVALID,
+    "pkg/__pycache__/mod.py": INVALID,
+    "pkg-1.0.dist-info/METADATA": "Name: pkg\n",
+}
+
+
+def create_archive(path: Path, members: dict[str, str] = MEMBERS) -> str:
+    """
+    Creates an archive of files, either a ZIP file or a tarball based on its name.
+
+    :param path: archive path
+    :param members: contents of the files keyed by their names
+    :return: archive path
+    """
+    if path.suffix in (".whl", ".zip"):
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for name, contents in members.items():
+                zip_file.writestr(name, contents)
+    else:
+        with tarfile.open(path, "w" if path.suffix == ".tar" else "w:gz") as tar:
+            for name, contents in members.items():
+                data = contents.encode()
+                info = tarfile.TarInfo(f"./pkg-1.0/{name}")
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+    return str(path)
+
+
+def test_is_archive():
+    assert is_archive("dist/pkg-1.0-py3-none-any.whl")
+    assert is_archive("dist/pkg-1.0.TAR.GZ")
+    assert not is_archive("dist/pkg.py")
+    assert not is_archive("dist/pkg.gz")
+
+
+def test_member_path():
+    assert member_path("a.whl", "pkg/mod.py") == os.path.join("a.whl", "pkg", "mod.py")
+    assert member_path("a.tgz", "./pkg/../mod.py") == os.path.join("a.tgz", "mod.py")
+    assert member_path("a.tar", "/mod.py") == os.path.join("a.tar", "mod.py")
+
+
+@pytest.mark.parametrize("name", ("pkg-1.0-py3-none-any.whl", "pkg-1.0.tar.gz"))
+def test_archive_sources(tmp_path: Path, name: str):
+    archive = create_archive(tmp_path / name)
+    discovery = Discovery(Options())
+    sources = dict(archive_sources(archive, discovery.select))
+    root = archive if name.endswith(".whl") else os.path.join(archive, "pkg-1.0")
+
+    assert sources == {
+        os.path.join(root, "pkg", "__init__.py"): VALID.encode(),
+        os.path.join(root, "pkg", "mod.py"): INVALID.encode(),
+    }
+    assert discovery.files == 2
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_runner_archives(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, jobs: int):
+    monkeypatch.chdir(tmp_path)
+    create_archive(tmp_path / "pkg-1.0-py3-none-any.whl")
+    create_archive(tmp_path / "pkg-1.0.tar")
+    (tmp_path / "module.py").write_text(INVALID)
+    (tmp_path / "broken.zip").write_bytes(b"PK\x03\x04 truncated")
+    results = Runner(Options(), jobs=jobs).run(
+        ["pkg-1.0-py3-none-any.whl", "pkg-1.0.tar", "module.py", "broken.zip"]
+    )
+
+    assert [(r.filename, [e.lineno for e in r.errors]) for r in results] == [
+        ("broken.zip", [1]),
+        ("module.py", [2]),
+        (os.path.join("pkg-1.0-py3-none-any.whl", "pkg", "__init__.py"), []),
+        (os.path.join("pkg-1.0-py3-none-any.whl", "pkg", "mod.py"), [2]),
+        (os.path.join("pkg-1.0.tar", "pkg-1.0", "pkg", "__init__.py"), []),
+        (os.path.join("pkg-1.0.tar", "pkg-1.0", "pkg", "mod.py"), [2]),
+    ]
+    assert results[0].errors[0].message.startswith("E902 BadZipFile")
+
+
+def test_cli_archives(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    create_archive(tmp_path / "pkg.zip")
+
+    assert main(["--isolated", "--extend-exclude=*/pkg/mod.py", "pkg.zip"]) == 0
+    assert main(["--isolated", "pkg.zip"]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        f"{os.path.join('pkg.zip', 'pkg', 'mod.py')}:2:1: "
+        'BAS506 Missing blank line before "if" statement.'
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["--serve=127.0.0.1:0", "pkg.zip"])
@@ -0,0 +1,81 @@
+import io
+import subprocess  # nosec B404
+import sys
+
+import pytest
+
+from flake8_bas.batch import check_records
+from flake8_bas.cli import main
+from flake8_bas.records import encode_record, read_records
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+ERROR = 'BAS506 Missing blank line before "if" statement.'
+
+
+def test_encode_record():
+    assert encode_record("a.py", b"x = 1\n") == b"a.py\x006\x00x = 1\n"
+    assert encode_record("\udcff.py", b"") == b"\xff.py\x000\x00"
+
+    with pytest.raises(ValueError):
+        encode_record("a\0.py", b"")
+
+
+def test_read_records():
+    stream = io.BytesIO(encode_record("a.py", b"\0" * 3) + encode_record("b.py", b""))
+
+    assert list(read_records(stream.read1)) == [("a.py", b"\0" * 3), ("b.py", b"")]
+    assert list(read_records(io.BytesIO(b"").read1)) == []
+
+
+@pytest.mark.parametrize(
+    "data", (b"a.py", b"a.py\x00", b"a.py\x00x\x00", b"a.py\x005\x00abc")
+)
+def test_read_records_invalid(data: bytes):
+    with pytest.raises(ValueError):
+        list(read_records(io.BytesIO(data).read1))
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_check_records(workers: int):
+    records = [(f"{i}.py", (INVALID if i % 3 else VALID).encode()) for i in range(100)]
+    results = list(check_records(records, workers))
+
+    assert [r.filename for r in results] == [name for name, _ in records]
+    assert [len(r.errors) for r in results] == [int(bool(i % 3)) for i in range(100)]
+
+
+def test_cli_batch(monkeypatch: pytest.MonkeyPatch):
+    stdin = io.BytesIO(
+        encode_record("a.py", INVALID.encode()) + encode_record("b.py", VALID.encode())
+    )
+    stdout = io.BytesIO()
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BufferedReader(stdin)))
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(stdout))
+
+    assert main(["batch", "--isolated"]) == 1
+    assert stdout.getvalue() == encode_record(
+        "a.py", f"a.py:2:1: {ERROR}\n".encode()
+    ) + encode_record("b.py", b"")
+
+
+def test_cli_batch_interactive():
+    # Each result is written before the next record is sent
+    process = subprocess.Popen(  # nosec B603
+        [sys.executable, "-m", "flake8_bas", "batch", "--isolated", "--exit-zero"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    for name, source, expected in (
+        ("a.py", INVALID, f"a.py:2:1: {ERROR}\n"),
+        ("b.py", VALID, ""),
+    ):
+        process.stdin.write(encode_record(name, source.encode()))
+        process.stdin.flush()
+
+        assert next(read_records(process.stdout.read1)) == (name, expected.encode())
+
+    process.stdin.close()
+
+    assert process.wait(timeout=60) == 0
@@ -1,9 +1,22 @@
 import ast
+import dataclasses
+import gc
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 
 import pytest
 
-from flake8_bas.checker import StatementChecker
+from flake8_bas.checker import (
+    GC_FREEZE_VARIABLE,
+    STATEMENT_MAP,
+    STATEMENT_TYPES,
+    STATEMENTS,
+    StatementChecker,
+    freeze_on_fork,
+)
 
 
 @pytest.mark.parametrize(
@@ -21,17 +34,30 @@ def test_blank_line_regex(value: str, expected: bool):
 
 def test_indexed_nodes(file_fixture: Callable):
     tree = ast.parse(file_fixture("indexed_tree.py").read_text())
-    nodes = StatementChecker._indexed_nodes(tree)
+    nodes, indices, parents = StatementChecker._indexed_nodes(tree)
     counter_index = 0
 
     assert isinstance(nodes, list)
 
     for index, node in enumerate(nodes):
         assert index == counter_index
-        assert node.index == counter_index
+        assert indices[node] == counter_index
 
         counter_index += 1
 
+    assert tree not in parents
+    assert all(child in parents for child in ast.iter_child_nodes(tree))
+
+
+def test_tree_untouched(file_fixture: Callable):
+    source = file_fixture("indexed_tree.py").read_text()
+    tree = ast.parse(source)
+    list(StatementChecker(tree, source.splitlines(keepends=True)).run())
+
+    for node in ast.walk(tree):
+        assert not hasattr(node, "parent_node")
+        assert not hasattr(node, "index")
+
 
 @pytest.mark.parametrize(
     "statement, equal, real_node_cls",
@@ -44,7 +70,7 @@ def test_real_node(
     statement: type, equal: bool, real_node_cls: type, file_fixture: Callable
 ):
     tree = ast.parse(file_fixture("real_node.py").read_text())
-    nodes = StatementChecker._indexed_nodes(tree)
+    nodes, _, _ = StatementChecker._indexed_nodes(tree)
     node = list(filter(lambda n: isinstance(n, statement), nodes))[0]
     result = StatementChecker._real_node(node)
 
@@ -62,8 +88,109 @@ def test_real_node(
     ),
 )
 def test_is_nth_child(statement: type, index: int, file_fixture: Callable):
-    tree = ast.parse(file_fixture("nth_child.py").read_text())
-    nodes = StatementChecker._indexed_nodes(tree)
-    node = list(filter(lambda n: isinstance(n, statement), nodes))[0]
+    source = file_fixture("nth_child.py").read_text()
+    checker = StatementChecker(ast.parse(source), source.splitlines(keepends=True))
+    node = list(filter(lambda n: isinstance(n, statement), checker.nodes))[0]
+
+    assert checker._is_nth_child(node, index)
+
+
+def test_shared_tree_threads(file_fixture: Callable):
+    source = file_fixture("overlapping_errors.py").read_text()
+    lines = source.splitlines(keepends=True)
+    tree = ast.parse(source)
+    expected = list(StatementChecker(tree, lines).run())
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda _: list(StatementChecker(tree, lines).run()), range(200)
+                )
+            )
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert expected
+    assert all(result == expected for result in results)
+
+
+def tables_state() -> tuple:
+    """
+    Captures identities and values of the shared statement tables.
+
+    :return: state of the tables
+    """
+    return (
+        [(id(s), repr(s)) for s in STATEMENTS],
+        [(id(k), id(v)) for k, v in STATEMENT_MAP.items()],
+        [id(t) for t in STATEMENT_TYPES],
+    )
+
+
+def check_in_worker(source: str) -> tuple[list, tuple]:
+    """
+    Checks a source in a forked worker.
+
+    :param source: source code
+    :return: errors and state of the tables after the check
+    """
+    lines = source.splitlines(keepends=True)
+    errors = list(StatementChecker(ast.parse(source), lines).run())
+
+    return [e[:3] for e in errors], tables_state()
+
+
+def test_tables_immutable():
+    with pytest.raises(TypeError):
+        STATEMENT_MAP[ast.Pass] = STATEMENTS[0]
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        STATEMENTS[0].keyword = "pass"
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        STATEMENTS[0].errors.before = "BAS000"
+
+    assert StatementChecker.statement_map is STATEMENT_MAP
+    assert isinstance(STATEMENT_TYPES, tuple)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="Requires fork"
+)
+def test_forked_workers_share_tables(file_fixture: Callable):
+    source = file_fixture("overlapping_errors.py").read_text()
+    expected = check_in_worker(source)[0]
+    state = tables_state()
+
+    with multiprocessing.get_context("fork").Pool(2) as pool:
+        results = pool.map(check_in_worker, [source] * 4)
+
+    assert expected
+    assert all(errors == expected for errors, _ in results)
+    assert all(worker_state == state for _, worker_state in results)
+    assert tables_state() == state
+
+
+@pytest.mark.parametrize("value", ["1", "0", None])
+def test_freeze_on_fork(monkeypatch: pytest.MonkeyPatch, value: str | None):
+    hooks = []
+    monkeypatch.setattr(os, "register_at_fork", lambda **kwargs: hooks.append(kwargs))
+    freeze_on_fork.cache_clear()
+
+    if value is None:
+        monkeypatch.delenv(GC_FREEZE_VARIABLE, raising=False)
+    else:
+        monkeypatch.setenv(GC_FREEZE_VARIABLE, value)
+
+    try:
+        # Flake8 parses the options of the plugin more than once, e.g. in tests
+        for _ in range(2):
+            StatementChecker.parse_options(None)
+    finally:
+        freeze_on_fork.cache_clear()
 
-    assert StatementChecker._is_nth_child(node, index)
+    # Opt-in, registered once, and only the children are frozen
+    assert hooks == ([{"after_in_child": gc.freeze}] if value == "1" else [])
@@ -0,0 +1,139 @@
+import fnmatch
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.config import (
+    Options,
+    PatternMatcher,
+    StyleGuide,
+    StyleGuides,
+    find_config,
+    load_options,
+    matches_filename,
+    parse_list,
+    parse_mapping,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    (
+        ("", ()),
+        ("BAS1", ("BAS1",)),
+        ("BAS1, BAS2,BAS3\n  BAS4", ("BAS1", "BAS2", "BAS3", "BAS4")),
+    ),
+)
+def test_parse_list(value: str, expected: tuple):
+    assert parse_list(value) == expected
+
+
+@pytest.mark.parametrize(
+    "path", ("a.py", "src/a.py", "src/tests/b.txt", "build", "x.egg", ".", "./c.py")
+)
+def test_pattern_matcher(path: str):
+    patterns = ("*.egg", "*tests*", "build", os.path.abspath("src/a.py"), "?.py")
+    matcher = PatternMatcher(patterns)
+
+    assert matcher.matches(path) == any(
+        fnmatch.fnmatch(os.path.basename(path), p)
+        or fnmatch.fnmatch(os.path.abspath(path), p)
+        for p in patterns
+    )
+    assert matcher.match(path) == any(fnmatch.fnmatch(path, p) for p in patterns)
+    assert not PatternMatcher(()).matches(path)
+    assert matches_filename(path, patterns) == matcher.matches(path)
+
+
+def test_parse_mapping():
+    assert parse_mapping("a.py b/*.py: BAS1, BAS2\n  c.py:BAS3") == (
+        ("a.py", ("BAS1", "BAS2")),
+        ("b/*.py", ("BAS1", "BAS2")),
+        ("c.py", ("BAS3",)),
+    )
+
+
+def test_parse_mapping_invalid():
+    with pytest.raises(ValueError):
+        parse_mapping("a.py BAS1")
+
+
+@pytest.mark.parametrize(
+    "options, code, expected",
+    (
+        ({}, "BAS101", True),
+        ({}, "E999", True),
+        ({}, "E501", False),
+        ({"select": "E"}, "BAS101", False),
+        ({"extend_select": "E"}, "E501", True),
+        ({"ignore": "BAS"}, "BAS101", False),
+        ({"ignore": "BAS1"}, "BAS201", True),
+        ({"select": "BAS101", "ignore": "BAS1"}, "BAS101", True),
+        ({"select": "BAS1", "ignore": "BAS101"}, "BAS101", False),
+        ({"select": "BAS1", "ignore": "BAS1"}, "BAS101", False),
+        ({"extend_ignore": "BAS10", "select": "BAS"}, "BAS101", False),
+    ),
+)
+def test_style_guide(options: dict, code: str, expected: bool):
+    style_guide = StyleGuide(Options().updated(options, Path.cwd()))
+
+    assert style_guide.is_reported(code) is expected
+
+
+def test_style_guides():
+    options = Options().updated(
+        {"per_file_ignores": "*.py: BAS1 tests/*.py: BAS2"}, Path.cwd()
+    )
+    style_guides = StyleGuides(options)
+
+    assert style_guides.for_file("app/main.py").is_reported("BAS101") is False
+    assert style_guides.for_file("app/main.py").is_reported("BAS201") is True
+    assert style_guides.for_file("tests/test.py").is_reported("BAS101") is True
+    assert style_guides.for_file("tests/test.py").is_reported("BAS201") is False
+    assert style_guides.for_file("README.md") is style_guides.default
+
+
+@pytest.fixture()
+def config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    (tmp_path / "tox.ini").write_text("[tox]\nenvlist = py\n")
+    (tmp_path / ".flake8").write_text(
+        "[flake8]\n"
+        "extend-ignore = BAS3\n"
+        "exclude = build/*, .git\n"
+        "per_file_ignores =\n"
+        "    tests/*: BAS1\n"
+        "disable-noqa = true\n"
+    )
+    (tmp_path / "src").mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+
+    return tmp_path / ".flake8"
+
+
+def test_find_config(config: Path):
+    assert find_config(Path.cwd()) == config
+
+
+def test_load_options(config: Path):
+    options = load_options()
+
+    assert options.extend_ignore == ("BAS3",)
+    assert options.exclude == (str(config.parent / "build" / "*"), ".git")
+    assert options.per_file_ignores == (
+        (str(config.parent / "tests" / "*"), ("BAS1",)),
+    )
+    assert options.disable_noqa is True
+    assert options.is_excluded("../build/module.py")
+    assert not options.is_excluded("build/module.py")
+
+
+def test_load_options_overrides(config: Path):
+    options = load_options(overrides={"extend_ignore": "BAS1", "select": None})
+
+    assert options.extend_ignore == ("BAS1",)
+    assert options.select is None
+
+
+def test_load_options_isolated(config: Path):
+    assert load_options(isolated=True) == Options()
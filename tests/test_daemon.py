@@ -0,0 +1,176 @@
+import io
+import os
+import socket
+import subprocess  # nosec B404
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from flake8_bas.client import FAILED, PATHS, SOURCES, main, parse_arguments, request
+from flake8_bas.config import Options, StyleGuides
+from flake8_bas.daemon import Daemon
+from flake8_bas.journal import Journal
+from flake8_bas.records import encode_record
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+ERROR = 'BAS506 Missing blank line before "if" statement.'
+
+
+@pytest.fixture()
+def daemon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Daemon]:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(INVALID)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "b.py").write_text(VALID)
+    (tmp_path / "pkg" / "c.py").write_text(INVALID)
+    (tmp_path / "pkg" / "d.txt").write_text(INVALID)
+    server = Daemon(
+        str(tmp_path / "daemon.sock"), Options(), Journal(tmp_path / "j.json", "1")
+    )
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_parse_arguments():
+    assert parse_arguments(["--socket", "s", "--stdin-display-name=x.py", "-"]) == {
+        "socket": "s",
+        "stdin_display_name": "x.py",
+        "exit_zero": False,
+        "stop": False,
+        "paths": ["-"],
+    }
+
+    for argv in (["--socket"], ["--unknown"]):
+        with pytest.raises(ValueError):
+            parse_arguments(argv)
+
+
+def test_daemon_paths(daemon: Daemon, tmp_path: Path, capsysbinary):
+    socket_argument = f"--socket={daemon.server_address}"
+    checked = []
+    evaluate = daemon._evaluate
+    daemon._evaluate = lambda content: checked.append(content) or evaluate(content)
+
+    assert main([socket_argument, "a.py", "pkg"]) == 1
+    assert capsysbinary.readouterr().out.decode().splitlines() == [
+        f"a.py:2:1: {ERROR}",
+        f"{os.path.join('pkg', 'c.py')}:2:1: {ERROR}",
+    ]
+    # Contents checked before aren't checked again
+    assert main([socket_argument, str(tmp_path / "pkg" / "c.py")]) == 1
+    assert capsysbinary.readouterr().out.decode() == (
+        f"{tmp_path / 'pkg' / 'c.py'}:2:1: {ERROR}\n"
+    )
+    assert len(checked) == 2
+    assert main([socket_argument, "--exit-zero", "missing.py"]) == 0
+    assert (
+        capsysbinary.readouterr()
+        .out.decode()
+        .startswith("missing.py:1:1: E902 FileNotFoundError")
+    )
+
+
+def test_daemon_per_file_ignores(daemon: Daemon, tmp_path: Path):
+    daemon.style_guides = StyleGuides(
+        Options().updated({"per_file_ignores": "pkg/c.py: BAS"}, tmp_path)
+    )
+    # A client in a subdirectory of the daemon's working directory
+    records = [
+        encode_record(PATHS, str(tmp_path / "pkg").encode()),
+        encode_record("c.py", b""),
+        encode_record("../a.py", b""),
+    ]
+
+    assert request(daemon.server_address, records)[1:] == [
+        ("c.py", b""),
+        ("../a.py", f"../a.py:2:1: {ERROR}\n".encode()),
+    ]
+
+
+def test_daemon_sources(daemon: Daemon, monkeypatch: pytest.MonkeyPatch, capsysbinary):
+    for source, status in ((INVALID, 1), (VALID, 0), (INVALID, 1)):
+        monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(source.encode())))
+
+        assert (
+            main([f"--socket={daemon.server_address}", "--stdin-display-name=x", "-"])
+            == status
+        )
+
+    assert (
+        capsysbinary.readouterr().out.decode().splitlines() == [f"x:2:1: {ERROR}"] * 2
+    )
+    assert len(daemon.sources) == 2
+
+
+def test_daemon_errors(daemon: Daemon, tmp_path: Path, capsys):
+    assert request(daemon.server_address, [encode_record("unknown", b"")]) == [
+        (FAILED, b"Unknown command 'unknown'")
+    ]
+    assert request(daemon.server_address, [encode_record(PATHS, b"")])[0] == (
+        "ok",
+        b"",
+    )
+
+    # Unexpected exceptions are reported to the client as well
+    daemon.check_sources = lambda sources: 1 / 0
+
+    assert request(
+        daemon.server_address, [encode_record(SOURCES, b""), encode_record("x", b"")]
+    ) == [(FAILED, b"ZeroDivisionError: division by zero")]
+
+    with pytest.raises(OSError, match="already running"):
+        Daemon(daemon.server_address, Options(), Journal(tmp_path / "j.json", "1"))
+
+    assert main([f"--socket={tmp_path / 'missing.sock'}"]) == 2
+    assert "missing.sock" in capsys.readouterr().err
+
+
+def test_daemon_stale_socket(tmp_path: Path):
+    address = str(tmp_path / "daemon.sock")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(address)
+
+    server = Daemon(address, Options(), Journal(tmp_path / "j.json", "1"))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    assert main([f"--socket={address}", "--stop"]) == 0
+
+    thread.join(timeout=10)
+    server.server_close()
+
+    assert not thread.is_alive()
+    assert not os.path.exists(address)
+
+
+def test_cli_daemon(tmp_path: Path):
+    (tmp_path / "a.py").write_text(INVALID)
+    address = str(tmp_path / "daemon.sock")
+    process = subprocess.Popen(  # nosec B603
+        [sys.executable, "-m", "flake8_bas", "daemon", "--isolated", "--cache"]
+        + [f"--socket={address}"],
+        cwd=tmp_path,
+    )
+    deadline = time.monotonic() + 30
+
+    while not os.path.exists(address) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    records = [encode_record(PATHS, str(tmp_path).encode()), encode_record("a.py", b"")]
+
+    assert request(address, records)[1] == ("a.py", f"a.py:2:1: {ERROR}\n".encode())
+    assert main([f"--socket={address}", "--stop"]) == 0
+    assert process.wait(timeout=30) == 0
+    assert (tmp_path / ".flake8-bas-cache" / "journal.json").exists()
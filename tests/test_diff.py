@@ -0,0 +1,238 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.checker import STATEMENT_TYPES, StatementChecker
+from flake8_bas.cli import main
+from flake8_bas.config import Options
+from flake8_bas.diff import LineRanges, changed_files, parse_diff, resolve_paths
+from flake8_bas.processor import check_source
+from flake8_bas.runner import Runner
+from .conftest import git, requires_git
+
+DIFF = """\
+diff --git a/src/a.py b/src/a.py
+index 0000000..1111111 100644
+--- a/src/a.py
++++ b/src/a.py
+@@ -1,3 +1,4 @@
+ import os
++import sys
+ if os:
+-    pass
++    pass  # changed
+@@ -10 +11,0 @@
+-removed = 1
+\\ No newline at end of file
+diff --git a/old.py b/old.py
+deleted file mode 100644
+--- a/old.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+diff --git a/new.py b/new.py
+new file mode 100644
+--- /dev/null
++++ b/new.py
+@@ -0,0 +1,2 @@
++++x
++--y
+"""
+
+SOURCE = """\
+import os
+import sys
+if os:
+    pass
+x = 1
+y = 2
+def f():
+    z = 1
+    for i in []:
+        pass
+    return z
+"""
+
+
+def test_parse_diff():
+    changes = parse_diff(DIFF)
+
+    assert changes == {
+        "src/a.py": LineRanges([(2, 2), (4, 4), (11, 12)]),
+        "new.py": LineRanges([(1, 2)]),
+    }
+    assert parse_diff("--- x.py\n+++ x.py\n@@ -1,3 +1,2 @@\n a\n-b\n c\n") == {
+        "x.py": LineRanges([(1, 2)])
+    }
+
+
+def test_line_ranges():
+    ranges = LineRanges([(10, 12), (1, 2), (3, 3), (11, 15)])
+
+    assert list(ranges) == [(1, 3), (10, 15)]
+    assert ranges.overlaps(3, 9)
+    assert ranges.overlaps(15, 20)
+    assert not ranges.overlaps(4, 9)
+    assert not ranges.overlaps(16, 20)
+    assert not LineRanges([])
+
+
+@pytest.mark.parametrize(
+    "ranges, expected",
+    (
+        ([(2, 2)], [2, 3, 3, 5]),
+        # The "if" statement reaches the next statement
+        ([(5, 5)], [3, 5]),
+        ([(6, 6)], [7]),
+        ([(9, 10)], [7, 9, 11, 11]),
+        # Lines added at the end follow the last statements
+        ([(12, 12)], [7, 11]),
+        ([(1, 11)], [2, 3, 3, 5, 7, 9, 11, 11]),
+    ),
+)
+def test_for_changes(ranges: list[tuple[int, int]], expected: list[int]):
+    tree = ast.parse(SOURCE)
+    lines = SOURCE.splitlines(True)
+    checker = StatementChecker.for_changes(tree, lines, LineRanges(ranges))
+
+    assert sorted(e.lineno for e in checker.run()) == expected
+
+
+@pytest.mark.parametrize("first", range(1, 60, 7))
+def test_for_changes_equivalence(first: int):
+    # The evaluated statements get the same errors as from the full index
+    source = (Path(__file__).parent / "fixtures" / "nth_child.py").read_text()
+    tree = ast.parse(source)
+    lines = source.splitlines(True)
+    changes = LineRanges([(first, first + 2)])
+    checker = StatementChecker.for_changes(tree, lines, changes)
+    full = StatementChecker(tree, lines)
+
+    assert list(checker.run()) == [
+        e for node in checker.candidates for e in full._node_errors(node)
+    ]
+    # Every changed statement is evaluated
+    assert {
+        StatementChecker._real_node(n)
+        for n in full.nodes
+        if isinstance(StatementChecker._real_node(n), STATEMENT_TYPES)
+        and changes.overlaps(n.lineno, n.end_lineno)
+    } <= set(checker.candidates)
+
+
+def test_check_source_changes():
+    assert [e.lineno for e in check_source(SOURCE, changes=LineRanges([(5, 5)]))] == [
+        3,
+        5,
+    ]
+    assert [e.lineno for e in check_source(SOURCE, changes=LineRanges([]))] == []
+
+
+def test_changed_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text(SOURCE)
+    (tmp_path / "b.py").write_text(SOURCE)
+    changes = {
+        "src/a.py": LineRanges([(1, 1)]),
+        "b.py": LineRanges([(1, 1)]),
+        "missing.py": LineRanges([(1, 1)]),
+        "empty.py": LineRanges([]),
+    }
+
+    assert changed_files(changes, ["."]) == ["src/a.py", "b.py"]
+    assert changed_files(changes, ["src"]) == ["src/a.py"]
+    assert changed_files(changes, ["sr"]) == []
+
+
+def test_resolve_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text(SOURCE)
+    (tmp_path / "src" / "b.py").write_text(SOURCE)
+    (tmp_path / "b.py").write_text(SOURCE)
+    monkeypatch.chdir(tmp_path / "src")
+    changes = {
+        "src/a.py": LineRanges([(1, 1)]),
+        "b.py": LineRanges([(1, 1)]),
+        "missing.py": LineRanges([(1, 1)]),
+    }
+
+    # Files found relative to the current directory are kept
+    assert list(resolve_paths(changes, str(tmp_path))) == [
+        "a.py",
+        "b.py",
+        "missing.py",
+    ]
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_runner_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, jobs: int):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(SOURCE)
+    (tmp_path / "b.py").write_text(SOURCE)
+    (tmp_path / "c.txt").write_text(SOURCE)
+    changes = {"a.py": LineRanges([(5, 5)]), "c.txt": LineRanges([(5, 5)])}
+    results = Runner(Options(), jobs=jobs, changes=changes).run(["."])
+
+    assert [(r.filename, [e.lineno for e in r.errors]) for r in results] == [
+        ("a.py", [3, 5])
+    ]
+
+
+def test_cli_diff(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(SOURCE)
+    (tmp_path / "changes.diff").write_text(
+        "--- a/a.py\n+++ b/a.py\n@@ -6 +6 @@\n-y = 3\n+y = 2\n"
+    )
+
+    assert main(["--diff=changes.diff", "--isolated", "."]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        'a.py:7:1: BAS502 Missing blank line before "def" statement.'
+    ]
+
+    for argv in (["--diff=missing.diff"], ["--diff=changes.diff", "--cache"]):
+        with pytest.raises(SystemExit):
+            main(argv)
+
+    # The diff doesn't match the checked files
+    (tmp_path / "a.py").unlink()
+
+    with pytest.raises(SystemExit):
+        main(["--diff=changes.diff", "."])
+
+    assert "Changed files of the diff not found: a.py" in capsys.readouterr().err
+
+
+@requires_git
+def test_cli_diff_subdirectory(
+    git_repository: Path, monkeypatch: pytest.MonkeyPatch, capsys
+):
+    (git_repository / "src").mkdir()
+    (git_repository / "src" / "a.py").write_text(SOURCE)
+    (git_repository / "changes.diff").write_text(
+        "--- a/src/a.py\n+++ b/src/a.py\n@@ -6 +6 @@\n-y = 3\n+y = 2\n"
+    )
+    # Paths of the diff are relative to the root of the repository
+    monkeypatch.chdir(git_repository / "src")
+
+    assert main(["--diff=../changes.diff", "--isolated", "."]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        'a.py:7:1: BAS502 Missing blank line before "def" statement.'
+    ]
+
+
+@requires_git
+def test_cli_diff_base(git_repository: Path, capsys):
+    (git_repository / "a.py").write_text(SOURCE)
+    (git_repository / "b.py").write_text(SOURCE)
+    git("add", ".")
+    git("commit", "-q", "-m", "A")
+    (git_repository / "a.py").write_text(SOURCE.replace("y = 2", "y = 3"))
+
+    assert main(["--diff-base=HEAD", "--isolated", "."]) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+    with pytest.raises(SystemExit):
+        main(["--diff-base=missing", "."])
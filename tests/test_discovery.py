@@ -0,0 +1,165 @@
+import fnmatch
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.config import Options
+from flake8_bas.discovery import Discovery, GitIgnore, discover, parse_gitignore
+
+GITIGNORE = """
+# Build artifacts
+*.log
+!important.log
+build/
+/root_only.py
+docs/**/gen_*.py
+**/cache
+vendor/**
+[!x]y.py
+\\#hash.py
+foo?.py
+trailing.py
+"""
+
+
+def walk(path: str, options: Options) -> set[str]:
+    """
+    Discovers files the way the runner used to, with `os.walk()` and `fnmatch`.
+    """
+    output = set()
+
+    for root, directories, files in os.walk(path):
+        directories[:] = [
+            d for d in directories if not options.is_excluded(os.path.join(root, d))
+        ]
+        output.update(
+            os.path.join(root, f)
+            for f in files
+            if not options.is_excluded(os.path.join(root, f))
+            and any(fnmatch.fnmatch(os.path.join(root, f), p) for p in options.filename)
+        )
+
+    return output
+
+
+@pytest.fixture()
+def repository(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text(GITIGNORE)
+
+    for path in (
+        "x.log",
+        "important.log",
+        "build/module.py",
+        "src/build/module.py",
+        "build.py",
+        "root_only.py",
+        "src/root_only.py",
+        "docs/gen_a.py",
+        "docs/api/v1/gen_b.py",
+        "docs/conf.py",
+        "src/cache/module.py",
+        "vendor/package/module.py",
+        "zy.py",
+        "xy.py",
+        "#hash.py",
+        "foo1.py",
+        "foo.py",
+        "trailing.py",
+        "src/package/module.py",
+        "src/package/generated.py",
+        "src/.tox/module.py",
+    ):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("x = 1\n")
+
+    (tmp_path / "src" / "package" / ".gitignore").write_text("*.py\n!module.py\n")
+    (tmp_path / "src" / "package" / "local.py").symlink_to(tmp_path / "zy.py")
+    (tmp_path / "src" / "link").symlink_to(tmp_path / "src" / "package")
+    monkeypatch.chdir(tmp_path)
+
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "path, is_directory, expected",
+    (
+        ("x.log", False, True),
+        ("important.log", False, False),
+        ("build", True, True),
+        ("build", False, False),
+        ("src/build", True, True),
+        ("root_only.py", False, True),
+        ("src/root_only.py", False, False),
+        ("docs/gen_a.py", False, True),
+        ("docs/api/v1/gen_b.py", False, True),
+        ("docs/api/gen", True, False),
+        ("src/cache", True, True),
+        ("vendor", True, False),
+        ("vendor/package/module.py", False, True),
+        ("zy.py", False, True),
+        ("xy.py", False, False),
+        ("#hash.py", False, True),
+        ("foo1.py", False, True),
+        ("foo.py", False, False),
+        ("trailing.py", False, True),
+    ),
+)
+def test_gitignore(tmp_path: Path, path: str, is_directory: bool, expected: bool):
+    (tmp_path / ".gitignore").write_text(GITIGNORE)
+    ignore = GitIgnore().child(str(tmp_path))
+
+    assert ignore.is_ignored(str(tmp_path / path), is_directory) is expected
+
+
+def test_gitignore_precedence(repository: Path):
+    directory = str(repository / "src" / "package")
+    ignore = GitIgnore.for_directory(directory)
+
+    assert ignore.is_ignored(str(repository / "x.log"), False)
+    assert not ignore.is_ignored(os.path.join(directory, "module.py"), False)
+
+    ignore = ignore.child(directory)
+
+    assert ignore.is_ignored(os.path.join(directory, "local.py"), False)
+    assert not ignore.is_ignored(os.path.join(directory, "module.py"), False)
+    assert GitIgnore.for_directory(str(repository)).rules == ()
+
+
+def test_parse_gitignore():
+    rules = parse_gitignore("# comment\n\n*.py\n!a.py\n!b.py\nbuild/\n")
+
+    assert [r.negated for r in rules] == [False, True, False]
+    assert rules[0].files is None
+
+
+@pytest.mark.parametrize("threads", (1, 4))
+def test_discovery(repository: Path, threads: int):
+    options = Options().updated({"extend_exclude": "vendor,*.log"}, repository)
+    discovery = Discovery(options, threads=threads)
+    files = list(discovery.discover([".", "x.log", "-", "foo.py"]))
+
+    assert files.count("-") == 1
+    assert files.count("./foo.py") == 1
+    assert set(files) == walk(".", options) | {"-", "foo.py"}
+    assert discovery.files == len(files) - 1
+    assert discovery.directories == 9
+    assert discovery.elapsed > 0
+
+
+@pytest.mark.parametrize("threads", (1, 4))
+def test_discovery_gitignore(repository: Path, threads: int):
+    files = set(discover(["."], Options(), threads=threads, gitignore=True))
+
+    assert files == {
+        "./build.py",
+        "./docs/conf.py",
+        "./foo.py",
+        "./src/package/module.py",
+        "./src/root_only.py",
+        "./xy.py",
+    }
+    assert set(discover(["src/package"], Options(), gitignore=True)) == {
+        "src/package/module.py"
+    }
@@ -0,0 +1,262 @@
+import socket
+import subprocess  # nosec B404
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.api import check_files
+from flake8_bas.distributed import (
+    HEADER,
+    MAX_MESSAGE_SIZE,
+    TOKEN_VARIABLE,
+    WorkQueue,
+    connect,
+    handshake,
+    parse_address,
+    receive_message,
+    send_message,
+    serve,
+    work,
+)
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+
+
+@pytest.fixture()
+def files(tmp_path: Path) -> list[str]:
+    output = []
+
+    for index in range(50):
+        file = tmp_path / f"module_{index}.py"
+        file.write_text(INVALID if index % 2 else VALID)
+        output.append(str(file))
+
+    return output
+
+
+@pytest.fixture()
+def address(tmp_path: Path) -> str:
+    return f"unix:{tmp_path / 'coordinator.sock'}"
+
+
+def collect(filenames: list[str], address: str, output: list, **kwargs):
+    thread = threading.Thread(
+        target=lambda: output.extend(serve(filenames, address, **kwargs)), daemon=True
+    )
+    thread.start()
+
+    return thread
+
+
+def summary(results) -> list:
+    return sorted((r.filename, [e[:3] for e in r.errors]) for r in results)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    (
+        ("unix:/tmp/a.sock", (socket.AF_UNIX, "/tmp/a.sock")),
+        ("localhost:8000", (socket.AF_INET, ("localhost", 8000))),
+        (":8000", (socket.AF_INET, ("127.0.0.1", 8000))),
+        ("[::1]:8000", (socket.AF_INET6, ("::1", 8000))),
+    ),
+)
+def test_parse_address(value: str, expected: tuple):
+    assert parse_address(value) == expected
+
+
+@pytest.mark.parametrize("value", ("localhost", "localhost:port", "/tmp/a.sock"))
+def test_parse_address_invalid(value: str):
+    with pytest.raises(ValueError):
+        parse_address(value)
+
+
+def test_work_queue():
+    queue = WorkQueue([["a.py"], ["b.py"]])
+
+    assert queue.take() == (0, ["a.py"])
+    assert queue.take() == (1, ["b.py"])
+
+    queue.requeue(0)
+
+    assert queue.take() == (0, ["a.py"])
+
+    queue.complete(0, [])
+    queue.complete(0, [])
+    queue.complete(1, [])
+
+    assert queue.remaining == 0
+    assert queue.take() is None
+
+
+def test_work_queue_retries():
+    queue = WorkQueue([["a.py"], ["b.py"]], retries=1)
+
+    for _ in range(2):
+        assert queue.take() == (0, ["a.py"])
+
+        queue.requeue(0)
+
+    # Lost more times than it may be retried
+    assert queue.take() is None
+
+    with pytest.raises(RuntimeError, match="starting with a.py failed 2 times"):
+        list(queue.results())
+
+
+def test_local_workers(files: list[str], address: str):
+    results = []
+    coordinator = collect(files, address, results, batch_size=4)
+    workers = [
+        subprocess.Popen(  # nosec B603
+            [sys.executable, "-m", "flake8_bas", "worker", address]
+        )
+        for _ in range(3)
+    ]
+
+    for process in workers:
+        assert process.wait(timeout=60) == 0
+
+    coordinator.join(timeout=10)
+
+    assert summary(results) == summary(check_files(files))
+
+
+@pytest.mark.parametrize("reply", (None, "other batch", "missing files"))
+def test_lost_worker(files: list[str], address: str, reply: str | None):
+    results = []
+    coordinator = collect(files, address, results, batch_size=4)
+
+    with connect(address, timeout=10) as connection:
+        handshake(connection, None)
+        batch = receive_message(connection)
+
+        assert batch["type"] == "batch"
+
+        if reply:
+            identifier = batch["id"] if reply == "missing files" else -1
+            checked = [(name, []) for name, _ in batch["items"][1:]]
+            send_message(
+                connection, {"type": "results", "id": identifier, "results": checked}
+            )
+            receive_message(connection)
+
+    assert work(address) == 13
+
+    coordinator.join(timeout=10)
+
+    assert summary(results) == summary(check_files(files))
+
+
+def test_message_size():
+    sender, receiver = socket.socketpair()
+
+    with sender, receiver:
+        # Only the header of the message is sent
+        sender.sendall(HEADER.pack(MAX_MESSAGE_SIZE + 1))
+
+        with pytest.raises(ValueError, match="exceeds the limit"):
+            receive_message(receiver)
+
+        sender.sendall(HEADER.pack(2) + b"{}")
+
+        with pytest.raises(ValueError, match="exceeds the limit"):
+            receive_message(receiver, max_size=1)
+
+
+def test_worker_timeout(files: list[str], address: str):
+    results = []
+    coordinator = collect(files[:4], address, results, timeout=0.2)
+
+    with connect(address, timeout=10) as connection:
+        handshake(connection, None)
+
+        assert receive_message(connection)["type"] == "batch"
+        assert receive_message(connection) is None
+
+    assert work(address) == 1
+
+    coordinator.join(timeout=10)
+
+    assert len(results) == 4
+
+
+def test_unreadable_file(files: list[str], address: str):
+    results = []
+    coordinator = collect([*files[:2], "missing.py"], address, results, journal=True)
+    work(address)
+    coordinator.join(timeout=10)
+    results = {r.filename: r for r in results}
+
+    assert results["missing.py"].errors[0].message.startswith("E902 ")
+    assert results["missing.py"].entry is None
+    assert all(results[f].entry for f in files[:2])
+
+
+def test_lost_batch(files: list[str], address: str):
+    results = []
+    output = []
+
+    def run():
+        try:
+            results.extend(serve(files[:4], address, timeout=0.2, retries=1))
+        except RuntimeError as e:
+            output.append(str(e))
+
+    coordinator = threading.Thread(target=run, daemon=True)
+    coordinator.start()
+
+    # Workers keep timing out on the batch
+    for _ in range(2):
+        with connect(address, timeout=10) as connection:
+            handshake(connection, None)
+
+            assert receive_message(connection)["type"] == "batch"
+            assert receive_message(connection) is None
+
+    coordinator.join(timeout=10)
+
+    assert not results
+    assert output == [
+        f"Batch of 4 files starting with {files[0]} failed 2 times, "
+        "e.g. by workers crashing or timing out"
+    ]
+
+
+def test_token(files: list[str]):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        address = f"127.0.0.1:{probe.getsockname()[1]}"
+
+    # TCP addresses require a token
+    with pytest.raises(ValueError, match=TOKEN_VARIABLE):
+        list(serve(files, address))
+
+    with pytest.raises(ValueError, match=TOKEN_VARIABLE):
+        work(address)
+
+    results = []
+    coordinator = collect(files, address, results, token=b"secret")
+
+    # A worker with another token is rejected before it gets a batch
+    with pytest.raises(ValueError, match="invalid signature"):
+        work(address, token=b"forged")
+
+    assert work(address, token=b"secret") == 4
+
+    coordinator.join(timeout=10)
+
+    assert summary(results) == summary(check_files(files))
+
+
+def test_worker_idle_timeout(tmp_path: Path):
+    with socket.socket(socket.AF_UNIX) as server:
+        server.bind(str(tmp_path / "silent.sock"))
+        server.listen()
+
+        # The coordinator never sends anything
+        with pytest.raises(OSError):
+            work(f"unix:{tmp_path / 'silent.sock'}", idle_timeout=0.2)
@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.cli import main
+from flake8_bas.config import Options
+from flake8_bas.git import (
+    CatFile,
+    TreeEntry,
+    list_commits,
+    run_git,
+    staged_blobs,
+    tree_blobs,
+    tree_entries,
+)
+from flake8_bas.runner import Runner
+from .conftest import INVALID, VALID, git, requires_git
+
+pytestmark = requires_git
+
+
+@pytest.fixture()
+def repository(git_repository: Path) -> Path:
+    for path, source in (
+        ("src/a.py", INVALID),
+        ("src/b.py", INVALID),
+        ("src/c.py", VALID),
+        ("src/README.md", INVALID),
+        ("build/d.py", INVALID),
+        ("script", INVALID),
+    ):
+        (git_repository / path).parent.mkdir(exist_ok=True)
+        (git_repository / path).write_text(source)
+
+    (git_repository / "src" / "link.py").symlink_to("a.py")
+    git("add", ".")
+    git("commit", "-q", "-m", "Initial")
+    # Changes of the working tree and of the index after the commit
+    (git_repository / "src" / "c.py").write_text(INVALID)
+    (git_repository / "src" / "a.py").write_text(VALID)
+    git("add", "src/a.py")
+
+    return git_repository
+
+
+def test_tree_blobs(repository: Path):
+    blobs = {b.path: b for b in tree_blobs("HEAD")}
+
+    assert set(blobs) == {
+        "src/a.py",
+        "src/b.py",
+        "src/c.py",
+        "src/README.md",
+        "build/d.py",
+        "script",
+    }
+    assert blobs["src/a.py"].oid == blobs["src/b.py"].oid
+    assert blobs["src/a.py"].size == len(INVALID)
+    assert {b.path for b in tree_blobs("HEAD", ["src/a.py", "build"])} == {
+        "src/a.py",
+        "build/d.py",
+    }
+
+    with pytest.raises(ValueError, match="git ls-tree failed"):
+        tree_blobs("missing")
+
+
+def test_staged_blobs(repository: Path):
+    blobs = {b.path: b for b in staged_blobs(["src"])}
+
+    assert set(blobs) == {"src/a.py", "src/b.py", "src/c.py", "src/README.md"}
+    assert blobs["src/a.py"].size == len(VALID)
+
+
+def test_cat_file(repository: Path):
+    oid = run_git("rev-parse", "HEAD:src/c.py").decode().strip()
+
+    with CatFile() as cat_file:
+        assert cat_file.read(oid) == VALID.encode()
+        assert cat_file.read(oid) == VALID.encode()
+
+        with pytest.raises(ValueError):
+            cat_file.read("0" * 40)
+
+
+def test_tree_entries(repository: Path):
+    commit = list_commits("HEAD")[0]
+
+    with CatFile() as cat_file:
+        entries = list(tree_entries(cat_file.read(commit.tree), len(commit.tree) // 2))
+
+    assert [e.name for e in entries] == ["build", "script", "src"]
+    assert entries[0] == TreeEntry(
+        "40000", "build", run_git("rev-parse", "HEAD:build").decode().strip()
+    )
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_runner_rev(repository: Path, monkeypatch: pytest.MonkeyPatch, jobs: int):
+    options = Options().updated({"extend_exclude": "build"}, repository)
+    checked = []
+    monkeypatch.setattr(
+        "flake8_bas.runner.CatFile.read",
+        lambda self, oid, read=CatFile.read: checked.append(oid) or read(self, oid),
+    )
+    results = Runner(options, jobs=jobs, rev="HEAD").run([".", "script"])
+
+    assert [(r.filename, len(r.errors)) for r in results] == [
+        ("script", 1),
+        ("src/a.py", 1),
+        ("src/b.py", 1),
+        ("src/c.py", 0),
+    ]
+    # Identical files are read and checked once
+    assert sorted(checked) == sorted(set(checked))
+    assert len(checked) == 2
+
+    results = Runner(options, jobs=jobs, staged=True).run(["src"])
+
+    assert [(r.filename, len(r.errors)) for r in results] == [
+        ("src/a.py", 0),
+        ("src/b.py", 1),
+        ("src/c.py", 0),
+    ]
+
+
+def test_cli_rev(repository: Path, capsys: pytest.CaptureFixture):
+    assert main(["--rev=HEAD", "--isolated", "src"]) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 2
+    assert main(["--staged", "--isolated", "src"]) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+    for argv in (["--rev=missing"], ["--rev=HEAD", "--cache"], ["--staged", "-"]):
+        with pytest.raises(SystemExit):
+            main(argv)
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.cli import main
+from flake8_bas.config import Options
+from flake8_bas.history import BlobCache, History
+from flake8_bas.runner import Runner
+from .conftest import INVALID, VALID, git, requires_git
+
+pytestmark = requires_git
+
+
+def commit(root: Path, files: dict[str, str]) -> None:
+    for path, source in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(source)
+
+    git("add", ".")
+    git("commit", "-q", "-m", "Change")
+
+
+@pytest.fixture()
+def repository(git_repository: Path) -> Path:
+    commit(
+        git_repository, {"src/a.py": INVALID, "src/b.py": VALID, "build/c.py": INVALID}
+    )
+    commit(git_repository, {"src/b.py": INVALID, "docs/README.md": INVALID})
+    commit(git_repository, {"src/a.py": VALID, "src/d.py": INVALID})
+
+    return git_repository
+
+
+def test_history(repository: Path, monkeypatch: pytest.MonkeyPatch):
+    runner = Runner(Options().updated({"extend_exclude": "build"}, repository), jobs=1)
+    checked = []
+    check_blobs = Runner.check_blobs
+    monkeypatch.setattr(
+        Runner,
+        "check_blobs",
+        lambda self, blobs: checked.extend(blobs) or check_blobs(self, blobs),
+    )
+    commits = History(runner).run("HEAD")
+
+    assert [c.total for c in commits] == [1, 2, 2]
+    assert commits[0].errors == {"BAS506": 1}
+    # Both versions of the files, each distinct content once
+    assert len(checked) == 2
+    assert [c.total for c in History(runner).run("HEAD~1..HEAD")] == [2]
+    assert [c.total for c in History(runner, paths=["src/a.py"]).run("HEAD")] == [
+        1,
+        1,
+        0,
+    ]
+
+
+def test_history_cache(repository: Path, monkeypatch: pytest.MonkeyPatch):
+    cache = BlobCache(repository / "cache" / "blobs.json", "1.0.0")
+    expected = History(Runner(Options(), jobs=1), cache).run("HEAD")
+    cache.save()
+    cache = BlobCache(repository / "cache" / "blobs.json", "1.0.0").load()
+    monkeypatch.setattr(Runner, "check_blobs", lambda *_: pytest.fail("Checked"))
+
+    assert len(cache.results) == 2
+    assert History(Runner(Options(), jobs=1), cache).run("HEAD") == expected
+    assert not BlobCache(repository / "cache" / "blobs.json", "2.0.0").load().results
+
+
+def test_cli_history(repository: Path, capsys: pytest.CaptureFixture):
+    assert main(["history", "HEAD", "--isolated", "--cache=blobs.json"]) == 0
+
+    output = capsys.readouterr().out.splitlines()
+
+    assert [line.split()[2:] for line in output] == [
+        ["2", "BAS506=2"],
+        ["3", "BAS506=3"],
+        ["3", "BAS506=3"],
+    ]
+    assert (repository / "blobs.json").exists()
+    assert main(["history", "HEAD~1..HEAD", "src", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["errors"] == {"BAS506": 2}
+
+    with pytest.raises(SystemExit):
+        main(["history", "missing"])
@@ -0,0 +1,78 @@
+import subprocess  # nosec B404
+import sys
+
+import pytest
+
+from flake8_bas.checker import LazyVersion, StatementChecker
+
+# Modules that are slow to import and are not supposed to be imported together
+# with the plugin
+HEAVY_MODULES = ("pkg_resources", "setuptools", "importlib.metadata")
+
+# Budget for the cumulative import time of the checker in microseconds. It is
+# an order of magnitude guard - importing `pkg_resources` alone would exceed it.
+IMPORT_TIME_BUDGET = 100_000
+
+
+def import_times(statement: str) -> tuple[dict[str, int], set[str]]:
+    """
+    Runs an import statement in a fresh interpreter with `-X importtime`.
+
+    :param statement: Python code
+    :return: cumulative import times in microseconds of modules imported by
+        the import statement and all modules loaded afterwards
+    """
+    result = subprocess.run(  # nosec B603
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"{statement}; import sys; print(*sys.modules)",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, module = line.split(":", 1)[1].split("|")
+        times[module.strip()] = int(cumulative)
+
+    return times, set(result.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "statement",
+    (
+        "import flake8_bas.checker",
+        "from flake8_bas import StatementChecker",
+    ),
+)
+def test_no_heavy_imports(statement: str):
+    _, modules = import_times(statement)
+
+    assert "flake8_bas.checker" in modules
+    assert not set(HEAVY_MODULES) & modules
+
+
+def test_import_time():
+    times, _ = import_times("import flake8_bas.checker")
+
+    assert times["flake8_bas.checker"] < IMPORT_TIME_BUDGET
+
+
+def test_lazy_package_import():
+    _, modules = import_times("import flake8_bas")
+
+    assert "flake8_bas" in modules
+    assert "flake8_bas.checker" not in modules
+
+
+def test_version():
+    assert isinstance(StatementChecker.version, str)
+    assert LazyVersion("flake8-bas-nonexistent-distribution").__get__(None) == "?.?.?"
@@ -0,0 +1,163 @@
+import ast
+import random
+import warnings
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.checker import StatementChecker
+from flake8_bas.incremental import ErrorDelta, IncrementalChecker, position_key
+from flake8_bas.processor import syntax_error
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+SOURCE = """\
+import os
+
+if os:
+    pass
+def f():
+    x = 1
+    return x
+"""
+# Snippets typed into the fixtures by the randomized test
+SNIPPETS = (
+    "",
+    "\n",
+    "\n\n",
+    "#",
+    "(",
+    ")",
+    "'''",
+    "    ",
+    "pass",
+    "x = 1\n",
+    "    y = 2\n",
+    "@decorator\n",
+    "import os\n",
+    "if x:\n    pass\n",
+    "else:\n    pass\n",
+    "def f():\n    return 1\n",
+)
+
+
+def full_errors(lines: list[str]) -> list:
+    """
+    Checks whole lines of a module.
+
+    :param lines: lines of code
+    :return: errors sorted by their position
+    """
+    try:
+        tree = ast.parse("".join(lines))
+    except (SyntaxError, ValueError) as e:
+        return [syntax_error(e)]
+
+    return sorted(StatementChecker(tree, lines).run(), key=position_key)
+
+
+def codes(errors: list) -> list[tuple[int, str]]:
+    return [(e.lineno, e.message.split(" ", 1)[0]) for e in errors]
+
+
+def test_edit():
+    checker = IncrementalChecker(SOURCE)
+
+    assert codes(checker.errors) == [(5, "BAS502"), (5, "BAS606"), (7, "BAS111")]
+
+    # A blank line before the return statement
+    delta = checker.edit((7, 0), (7, 0), "\n")
+
+    assert codes(delta.removed) == [(7, "BAS111")]
+    assert delta.added == []
+    assert "".join(checker.lines) == SOURCE.replace("    return", "\n    return")
+
+    # Lines added above errors only move them
+    assert checker.edit((1, 0), (1, 0), "import sys\n\n") == ErrorDelta([], [])
+    assert codes(checker.errors) == [(7, "BAS502"), (7, "BAS606")]
+
+    # A replacement of the whole "if" statement
+    delta = checker.edit((5, 0), (6, 8), "x = 1")
+
+    assert codes(delta.removed) == [(7, "BAS606")]
+    assert delta.added == []
+    assert checker.errors == full_errors(checker.lines)
+
+
+def test_edit_block():
+    checker = IncrementalChecker(SOURCE)
+    # Lines indented into the body of the function after its end, which don't parse
+    # on their own
+    delta = checker.edit((8, 0), (8, 0), "    for i in x:\n        pass\n")
+
+    assert codes(delta.added) == [(8, "BAS211"), (8, "BAS504")]
+    assert checker.tree.body[-1].body[-1].lineno == 8
+    assert checker.errors == full_errors(checker.lines)
+
+
+def test_edit_syntax_error():
+    checker = IncrementalChecker(SOURCE)
+    before = checker.errors
+    delta = checker.edit((3, 0), (3, 0), "(")
+
+    assert delta.removed == before
+    assert codes(delta.added) == [(3, "E999")]
+    assert checker.tree is None
+
+    # Fixed by the next edit
+    delta = checker.edit((3, 0), (3, 1), "")
+
+    assert codes(delta.removed) == [(3, "E999")]
+    assert delta.added == before
+    assert checker.errors == before
+
+
+def test_edit_positions():
+    checker = IncrementalChecker("x = 1")
+    # Positions past the end of the module move to its end
+    checker.edit((9, 9), (9, 9), "\nimport os\n")
+
+    assert checker.lines == ["x = 1\n", "import os\n"]
+
+    checker.edit((0, 0), (1, 99), "y = 2")
+
+    assert checker.lines == ["y = 2\n", "import os\n"]
+
+    # Line breaks are normalized
+    delta = checker.edit((2, 0), (2, 0), "if x:\r\n    pass\r\n")
+
+    assert codes(delta.added) == [(2, "BAS506"), (4, "BAS106"), (4, "BAS606")]
+    assert checker.lines[1:3] == ["if x:\n", "    pass\n"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_edit_equivalence(seed: int):
+    # Random edits of the fixtures get the same errors as checks of whole modules
+    rng = random.Random(seed)
+    sources = [p.read_text() for p in sorted(FIXTURES.rglob("*.py"))]
+
+    with warnings.catch_warnings():
+        # Invalid escape sequences and the like in the edited modules
+        warnings.simplefilter("ignore", SyntaxWarning)
+
+        for _ in range(30):
+            checker = IncrementalChecker(rng.choice(sources))
+
+            for _ in range(6):
+                count = len(checker.lines)
+                first = rng.randint(1, count + 1)
+                last = min(first + rng.choice((0, 0, 1, 3)), count + 1)
+                start = checker._clamp((first, rng.randint(0, 8)))
+                end = checker._clamp((last, rng.randint(0, 8)))
+                last = min(max(start, end)[0], count)
+                before = checker.errors
+                delta = checker.edit(start, end, rng.choice(SNIPPETS))
+                kept = [
+                    IncrementalChecker._shift(e, last, len(checker.lines) - count)
+                    for e in before
+                    if e not in delta.removed
+                ]
+
+                assert checker.errors == full_errors(checker.lines)
+                # Errors which aren't a part of the delta only move with the lines
+                assert sorted(kept + delta.added, key=position_key) == checker.errors
@@ -0,0 +1,111 @@
+import os
+import random
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from flake8_bas.journal import Journal
+
+ERRORS = [(3, 0, 'BAS506 Missing blank line before "if" statement.')]
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    file = tmp_path / "module.py"
+    file.write_text("a = 1\nif a:\n    pass\n")
+
+    return file
+
+
+def evaluator(calls: list) -> Callable:
+    def _(content: bytes) -> list:
+        calls.append(content)
+
+        return ERRORS
+
+    return _
+
+
+def reloaded(journal: Journal) -> Journal:
+    journal.save()
+
+    return Journal(journal.file, journal.version).load()
+
+
+def test_unchanged_file_is_not_read(
+    source: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    calls = []
+    journal = Journal(tmp_path / "journal.json", "1.0.0")
+
+    assert journal.check(source, evaluator(calls)) == ERRORS
+
+    journal = reloaded(journal)
+    monkeypatch.setattr(Path, "read_bytes", lambda _: pytest.fail("File was read"))
+
+    assert journal.check(source, evaluator(calls)) == ERRORS
+    assert len(calls) == 1
+
+
+def test_touched_file_reuses_result(source: Path, tmp_path: Path):
+    calls = []
+    journal = Journal(tmp_path / "journal.json", "1.0.0")
+    journal.check(source, evaluator(calls))
+    journal = reloaded(journal)
+    os.utime(source, ns=(journal.timestamp_ns - 1, journal.timestamp_ns - 1))
+
+    assert journal.lookup(source) is None
+    assert journal.check(source, evaluator(calls)) == ERRORS
+    assert len(calls) == 1
+
+
+def test_modified_file_is_evaluated(source: Path, tmp_path: Path):
+    calls = []
+    journal = reloaded(Journal(tmp_path / "journal.json", "1.0.0"))
+    journal.check(source, evaluator(calls))
+    source.write_text("a = 1\n\nif a:\n    pass\n")
+    journal.check(source, evaluator(calls))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("version", ("1.0.0", "2.0.0"))
+def test_load(source: Path, tmp_path: Path, version: str):
+    journal = Journal(tmp_path / "journal.json", "1.0.0")
+    journal.check(source, evaluator([]))
+    journal.save()
+
+    assert bool(Journal(journal.file, version).load().entries) is (version == "1.0.0")
+
+
+def test_load_corrupted(tmp_path: Path):
+    (tmp_path / "journal.json").write_text("{")
+
+    assert not Journal(tmp_path / "journal.json", "1.0.0").load().entries
+
+
+def test_save_drops_unreferenced_results(source: Path, tmp_path: Path):
+    journal = Journal(tmp_path / "journal.json", "1.0.0")
+    journal.check(source, evaluator([]))
+    source.write_text("pass\n")
+    journal.check(source, lambda _: [])
+    journal = reloaded(journal)
+
+    assert list(journal.results.values()) == [[]]
+    assert not list(tmp_path.glob(".journal.json.*"))
+
+
+def test_verify(source: Path, tmp_path: Path):
+    journal = Journal(tmp_path / "journal.json", "1.0.0")
+    journal.check(source, evaluator([]))
+    journal = reloaded(journal)
+    stat = source.stat()
+
+    # Same size and timestamps, different content
+    source.write_text(source.read_text().replace("a", "b"))
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert journal.lookup(source) == ERRORS
+    assert journal.verify(10, random.Random(0)) == [str(source)]
+    assert journal.lookup(source) is None
@@ -0,0 +1,373 @@
+import asyncio
+import json
+import subprocess  # nosec B404
+import sys
+import time
+from typing import Callable
+
+import pytest
+
+from flake8_bas.config import Options
+from flake8_bas.lsp import (
+    INCREMENTAL_SYNC,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    VISIBLE_DOCUMENTS,
+    Document,
+    LanguageServer,
+    encode_message,
+    read_message,
+    text_offset,
+    utf16_column,
+)
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+
+
+class ScriptedClient:
+    """
+    Client sending messages to a language server running in the same event loop
+    and collecting the messages the server sends back.
+    """
+
+    def __init__(self, debounce: float = 0.0) -> None:
+        """
+        :param debounce: debounce period of the server
+        """
+        self.reader = asyncio.StreamReader()
+        self.received: list[dict] = []
+        self.arrived = asyncio.Event()
+        self.ids = 0
+        self.server = LanguageServer(self._receive, Options(), debounce)
+        self.serving = asyncio.ensure_future(self.server.serve(self.reader))
+
+    def _receive(self, data: bytes) -> None:
+        header, body = data.split(b"\r\n\r\n", 1)
+
+        assert header == b"Content-Length: %d" % len(body)
+
+        self.received.append(json.loads(body))
+        self.arrived.set()
+
+    def notify(self, method: str, params: dict) -> None:
+        self.reader.feed_data(encode_message({"method": method, "params": params}))
+
+    def request(self, method: str, params: dict | None = None) -> int:
+        self.ids += 1
+        self.reader.feed_data(
+            encode_message({"id": self.ids, "method": method, "params": params})
+        )
+
+        return self.ids
+
+    def open_document(self, uri: str, text: str) -> None:
+        document = {"uri": uri, "languageId": "python", "version": 1, "text": text}
+        self.notify("textDocument/didOpen", {"textDocument": document})
+
+    def change(self, uri: str, version: int, changes: list[dict]) -> None:
+        self.notify(
+            "textDocument/didChange",
+            {
+                "textDocument": {"uri": uri, "version": version},
+                "contentChanges": changes,
+            },
+        )
+
+    async def wait_for(
+        self, predicate: Callable[[dict], bool], timeout: float = 10.0
+    ) -> dict:
+        deadline = time.monotonic() + timeout
+
+        while True:
+            for message in self.received:
+                if predicate(message):
+                    return message
+
+            self.arrived.clear()
+            await asyncio.wait_for(self.arrived.wait(), deadline - time.monotonic())
+
+    async def wait_for_version(self, uri: str, version: int | None) -> dict:
+        return await self.wait_for(
+            lambda m: m.get("method") == "textDocument/publishDiagnostics"
+            and m["params"]["uri"] == uri
+            and m["params"]["version"] == version
+        )
+
+    def diagnostics(self) -> list[tuple[str, int | None, list[str]]]:
+        return [
+            (
+                m["params"]["uri"],
+                m["params"]["version"],
+                [d["code"] for d in m["params"]["diagnostics"]],
+            )
+            for m in self.received
+            if m.get("method") == "textDocument/publishDiagnostics"
+        ]
+
+    async def shut_down(self) -> int:
+        request = self.request("shutdown")
+        await self.wait_for(lambda m: m.get("id") == request)
+        self.notify("exit", {})
+
+        return await asyncio.wait_for(self.serving, 10)
+
+
+def insert(line: int, character: int, text: str) -> dict:
+    """
+    Creates a change inserting text at a position.
+
+    :param line: zero-based line
+    :param character: character of the line in UTF-16 code units
+    :param text: inserted text
+    :return: change
+    """
+    position = {"line": line, "character": character}
+
+    return {"range": {"start": position, "end": position}, "text": text}
+
+
+def test_text_offset():
+    text = "a = 1\nb = '\U0001f600x'\n"
+
+    assert text_offset(text, {"line": 0, "character": 3}) == 3
+    assert text_offset(text, {"line": 0, "character": 99}) == 5
+    # The emoji takes 2 UTF-16 code units but a single code point
+    assert text_offset(text, {"line": 1, "character": 7}) == 6 + 6
+    assert text_offset(text, {"line": 2, "character": 0}) == len(text)
+    assert text_offset(text, {"line": 9, "character": 0}) == len(text)
+
+
+def test_utf16_column():
+    assert utf16_column("    x = 1", 4) == 4
+    assert utf16_column("\U0001f600 = 1", 4) == 2
+    assert utf16_column("é = 1", 2) == 1
+
+
+def test_document_apply():
+    document = Document("file:///a.py", "x = 'é'\ny = 2\n", 1, 0.0)
+    document.apply(
+        {
+            "range": {
+                "start": {"line": 0, "character": 5},
+                "end": {"line": 1, "character": 1},
+            },
+            "text": "e'\nz",
+        }
+    )
+
+    assert document.text == "x = 'e'\nz = 2\n"
+
+    document.apply({"text": "w = 3\n"})
+
+    assert document.text == "w = 3\n"
+
+
+def test_read_message():
+    async def read(data: bytes) -> list:
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        output = []
+
+        try:
+            while (message := await read_message(reader)) is not None:
+                output.append(message)
+        except ValueError as e:
+            output.append(type(e))
+
+        return output
+
+    message = {"jsonrpc": "2.0", "method": "x", "params": {"text": "é"}}
+
+    assert asyncio.run(read(encode_message(message) * 2)) == [message] * 2
+    assert asyncio.run(read(b"Content-Type: x\r\n\r\n{}")) == [ValueError]
+    assert asyncio.run(read(b"Content-Length: 5\r\n\r\n{}")) == [ValueError]
+    assert asyncio.run(read(b"Content-Length: 2\r\n\r\n[]")) == [ValueError]
+    assert asyncio.run(read(b"Content-Length: 2\r\n")) == [ValueError]
+
+
+def test_lifecycle():
+    async def run() -> None:
+        client = ScriptedClient()
+        request = client.request("initialize", {"processId": None})
+        response = await client.wait_for(lambda m: m.get("id") == request)
+
+        assert response["result"]["capabilities"]["textDocumentSync"]["change"] == (
+            INCREMENTAL_SYNC
+        )
+
+        client.open_document("file:///a.py", INVALID)
+        await client.wait_for_version("file:///a.py", 1)
+        client.change("file:///a.py", 2, [insert(1, 0, "\n")])
+        await client.wait_for_version("file:///a.py", 2)
+        client.notify(
+            "textDocument/didClose", {"textDocument": {"uri": "file:///a.py"}}
+        )
+        await client.wait_for_version("file:///a.py", None)
+
+        assert client.diagnostics() == [
+            ("file:///a.py", 1, ["BAS506"]),
+            ("file:///a.py", 2, []),
+            ("file:///a.py", None, []),
+        ]
+
+        diagnostic = client.received[1]["params"]["diagnostics"][0]
+
+        assert diagnostic["range"]["start"] == {"line": 1, "character": 0}
+        assert diagnostic["message"] == 'Missing blank line before "if" statement.'
+        assert await client.shut_down() == 0
+
+    asyncio.run(run())
+
+
+def test_debounce():
+    async def run() -> None:
+        client = ScriptedClient(debounce=0.5)
+        client.open_document("file:///a.py", VALID)
+        await client.wait_for_version("file:///a.py", 1)
+
+        # Each change postpones the check of the document
+        for version in range(2, 6):
+            client.change("file:///a.py", version, [insert(2, 0, "x = 1\n")])
+            await asyncio.sleep(0.02)
+
+        await client.wait_for_version("file:///a.py", 5)
+
+        assert client.diagnostics() == [
+            ("file:///a.py", 1, []),
+            ("file:///a.py", 5, ["BAS506"]),
+        ]
+        assert await client.shut_down() == 0
+
+    asyncio.run(run())
+
+
+def test_cancel_stale_check(monkeypatch: pytest.MonkeyPatch):
+    check_source = sys.modules["flake8_bas.aio"].check_source
+
+    def slow_check_source(source, **kwargs):
+        time.sleep(0.3)
+
+        return check_source(source, **kwargs)
+
+    monkeypatch.setattr("flake8_bas.aio.check_source", slow_check_source)
+
+    async def run() -> None:
+        client = ScriptedClient()
+        client.open_document("file:///a.py", INVALID)
+        await asyncio.sleep(0.1)
+        # The check of the first version is in progress
+        client.change("file:///a.py", 2, [{"text": VALID}])
+        await client.wait_for_version("file:///a.py", 2)
+        await asyncio.sleep(0.3)
+
+        assert client.diagnostics() == [("file:///a.py", 2, [])]
+        assert await client.shut_down() == 0
+
+    asyncio.run(run())
+
+
+def test_priority():
+    async def run() -> None:
+        client = ScriptedClient()
+        client.open_document("file:///a.py", INVALID)
+        client.open_document("file:///b.py", INVALID)
+        client.open_document("file:///c.py", INVALID)
+        client.notify(VISIBLE_DOCUMENTS, {"uris": ["file:///b.py"]})
+
+        for uri in ("file:///a.py", "file:///b.py", "file:///c.py"):
+            await client.wait_for_version(uri, 1)
+
+        # The visible document first, then the most recently opened one
+        assert [uri for uri, _, _ in client.diagnostics()] == [
+            "file:///b.py",
+            "file:///c.py",
+            "file:///a.py",
+        ]
+        assert await client.shut_down() == 0
+
+    asyncio.run(run())
+
+
+def test_errors():
+    async def run() -> None:
+        client = ScriptedClient()
+        unknown = client.request("textDocument/hover", {})
+        invalid = client.request("textDocument/didOpen", {})
+        client.reader.feed_data(b"Content-Length: 1\r\n\r\n{")
+        await client.wait_for(lambda m: m.get("id") is None and "error" in m)
+
+        errors = {m["id"]: m["error"]["code"] for m in client.received}
+
+        assert errors[unknown] == METHOD_NOT_FOUND
+        assert errors[invalid] == -32602
+        assert errors[None] == PARSE_ERROR
+
+        # Exit without a shutdown request
+        client.notify("exit", {})
+
+        assert await asyncio.wait_for(client.serving, 10) == 1
+
+    asyncio.run(run())
+
+
+def test_failed_check():
+    async def run() -> None:
+        client = ScriptedClient()
+        # Crashes the checker
+        client.open_document("file:///crash.py", "import os\nf = lambda: (yield)\n")
+        log = await client.wait_for(lambda m: m.get("method") == "window/logMessage")
+
+        assert log["params"]["type"] == 1
+        assert log["params"]["message"].startswith("Check of file:///crash.py failed")
+
+        # The other documents are still checked
+        client.open_document("file:///a.py", INVALID)
+        await client.wait_for_version("file:///a.py", 1)
+
+        assert client.diagnostics() == [("file:///a.py", 1, ["BAS506"])]
+        assert await client.shut_down() == 0
+
+    asyncio.run(run())
+
+
+def test_cli_lsp():
+    process = subprocess.Popen(  # nosec B603
+        [sys.executable, "-m", "flake8_bas", "lsp", "--isolated", "--debounce=0"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    document = {"uri": "file:///a.py", "languageId": "python", "version": 1}
+    messages = [
+        {"id": 1, "method": "initialize", "params": {"processId": None}},
+        {"method": "initialized", "params": {}},
+        {
+            "method": "textDocument/didOpen",
+            "params": {"textDocument": {**document, "text": INVALID}},
+        },
+    ]
+    process.stdin.write(b"".join(encode_message(m) for m in messages))
+    process.stdin.flush()
+
+    def receive() -> dict:
+        length = int(process.stdout.readline().split(b":")[1])
+        process.stdout.readline()
+
+        return json.loads(process.stdout.read(length))
+
+    assert receive()["id"] == 1
+
+    diagnostics = receive()
+
+    assert diagnostics["method"] == "textDocument/publishDiagnostics"
+    assert [d["code"] for d in diagnostics["params"]["diagnostics"]] == ["BAS506"]
+
+    process.stdin.write(
+        encode_message({"id": 2, "method": "shutdown"})
+        + encode_message({"method": "exit"})
+    )
+    process.stdin.close()
+
+    assert receive() == {"jsonrpc": "2.0", "id": 2, "result": None}
+    assert process.wait(timeout=30) == 0
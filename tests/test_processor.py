@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.checker import StatementChecker
+from flake8_bas.processor import (
+    MMAP_THRESHOLD,
+    blank_line_numbers,
+    check_buffer,
+    check_file,
+    check_source,
+    has_noqa,
+    read_lines,
+)
+
+SOURCE = b"import os\nif os:\n    pass\n"
+FIXTURES = sorted((Path(__file__).parent / "fixtures").rglob("*.py"))
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    (
+        (b"a = 1\r\nb = 2\r\n", ["a = 1\n", "b = 2\n"]),
+        (b"\xef\xbb\xbfa = 1\n", ["a = 1\n"]),
+        (
+            b"# -*- coding: latin-1 -*-\na = '\xe9'\n",
+            ["# -*- coding: latin-1 -*-\n", "a = 'é'\n"],
+        ),
+        (b"a = '\xe9'\n", ["a = 'é'\n"]),
+    ),
+)
+def test_read_lines(source: bytes, expected: list):
+    assert read_lines(source) == expected
+
+
+@pytest.mark.parametrize(
+    "comment, count",
+    (
+        ("", 1),
+        ("# noqa", 0),
+        ("# NOQA:BAS506", 0),
+        ("# noqa: BAS5", 0),
+        ("# noqa: BAS606,E501", 1),
+    ),
+)
+def test_inline_noqa(comment: str, count: int):
+    source = f"import os\nif os:  {comment}\n    pass\n".encode()
+
+    assert len(check_source(source)) == count
+    assert len(check_source(source, disable_noqa=True)) == 1
+
+
+def test_inline_noqa_multiline_string():
+    source = b'import os\nif os == """\n""":  # noqa\n    pass\n'
+
+    assert check_source(source) == []
+
+
+def test_file_noqa():
+    assert check_source(b"# flake8: noqa\n" + SOURCE) == []
+    assert len(check_source(b"# flake8: noqa\n" + SOURCE, disable_noqa=True)) == 2
+
+
+def test_syntax_error():
+    errors = check_source(b"def f(:\n    pass\n")
+
+    assert len(errors) == 1
+    assert errors[0].message.startswith("E999 SyntaxError")
+
+
+def test_sorted_errors():
+    errors = check_source(b"import os\nif os:\n    pass\nimport sys\n")
+
+    assert [(e.lineno, e.message[:6]) for e in errors] == [
+        (2, "BAS506"),
+        (4, "BAS606"),
+        (4, "BAS106"),
+    ]
+
+
+def test_check_file(tmp_path: Path):
+    (tmp_path / "module.py").write_bytes(SOURCE)
+    result = check_file(str(tmp_path / "module.py"), journal=True)
+
+    assert len(result.errors) == 1
+    assert result.entry.size == len(SOURCE)
+    assert check_file(str(tmp_path / "module.py")).entry is None
+
+
+def test_check_missing_file(tmp_path: Path):
+    result = check_file(str(tmp_path / "missing.py"))
+
+    assert result.errors[0].message.startswith("E902 FileNotFoundError")
+    assert result.entry is None
+
+
+@pytest.mark.parametrize("file", FIXTURES, ids=lambda f: f.name)
+def test_blank_line_numbers(file: Path):
+    source = file.read_bytes()
+    lines = read_lines(source)
+
+    assert blank_line_numbers(source) == {
+        lineno
+        for lineno, line in enumerate(lines, start=1)
+        if StatementChecker.BLANK_LINE_RE.match(line)
+    }
+    assert check_buffer(source) == check_source(source)
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    (
+        (b"\na = 1\n \t\n\r\nb = 2\n  ", {1, 3, 4}),
+        (b"a = 1\r\n\r\nb = 2\r\n", {2}),
+        (b"a = 1\n\x0c\n", {2}),
+        (b"", set()),
+        # Lines which might be blank once decoded
+        (b"a = 1\n\xc2\xa0\nb = 2\n", None),
+        (b"\xef\xbb\xbf\na = 1\n", None),
+        (b"a = 1\r\rb = 2\n", None),
+    ),
+)
+def test_blank_line_numbers_special(source: bytes, expected: set | None):
+    assert blank_line_numbers(source) == expected
+
+
+@pytest.mark.parametrize(
+    "source",
+    (
+        b"import os\n\xc2\xa0\nif os:\n    pass\n",
+        b"import os\rif os:\r    pass\r",
+        b"import os\nif os:  # NoQA\n    pass\n",
+        b"def f(:\n    pass\n",
+        b"import os\x00\n",
+        b"a = '\xe9'\nif a:\n    pass\n",
+    ),
+)
+def test_check_buffer(source: bytes):
+    assert check_buffer(source) == check_source(source)
+    assert check_buffer(source, disable_noqa=True) == check_source(
+        source, disable_noqa=True
+    )
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    ((b"x = 1  # noqa", True), (b"# NoQA: BAS", True), (b"aqua = 1", False)),
+)
+def test_has_noqa(source: bytes, expected: bool):
+    assert has_noqa(source) is expected
+
+
+def test_check_file_mapped(tmp_path: Path):
+    source = SOURCE * (MMAP_THRESHOLD // len(SOURCE) + 1)
+    (tmp_path / "module.py").write_bytes(source)
+    result = check_file(str(tmp_path / "module.py"), journal=True)
+
+    assert result.errors == check_source(source)
+    assert result.entry.size == len(source)
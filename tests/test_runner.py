@@ -0,0 +1,191 @@
+import io
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+import pytest
+
+from flake8_bas.cli import main, size_argument
+from flake8_bas.config import Options
+from flake8_bas.discovery import discover
+from flake8_bas.journal import Journal
+from flake8_bas.runner import Runner
+
+INVALID = "import os\nif os:\n    pass\n"
+VALID = "import os\n\nif os:\n    pass\n"
+
+
+@pytest.fixture()
+def tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    for index in range(20):
+        file = tmp_path / "src" / f"package_{index % 3}" / f"module_{index}.py"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(INVALID if index % 2 else VALID)
+
+    (tmp_path / "src" / "README.md").write_text(INVALID)
+    (tmp_path / "src" / "script").write_text(INVALID)
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "module.py").write_text(INVALID)
+    monkeypatch.chdir(tmp_path)
+
+    return tmp_path
+
+
+def test_discover(tree: Path):
+    options = Options().updated({"extend_exclude": "build"}, tree)
+    files = set(discover([".", "src/script", "src/README.md"], options))
+
+    assert len(files) == 22
+    assert "src/script" in files
+    assert not any("build" in f for f in files)
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_runner(tree: Path, jobs: int):
+    results = Runner(Options(), jobs=jobs).run(["src"])
+
+    assert [r.filename for r in results] == sorted(r.filename for r in results)
+    assert sum(len(r.errors) for r in results) == 10
+
+
+def test_runner_journal(tree: Path, monkeypatch: pytest.MonkeyPatch):
+    expected = Runner(
+        Options(), jobs=1, journal=Journal(tree / "journal.json", "1.0.0")
+    ).run(["src"])
+    journal = Journal(tree / "journal.json", "1.0.0").load()
+    monkeypatch.setattr(
+        "flake8_bas.runner.check_chunks", lambda *_, **__: pytest.fail("Checked")
+    )
+    results = Runner(Options(), jobs=1, journal=journal).run(["src"])
+
+    assert len(journal.entries) == 20
+    assert [r[:2] for r in results] == [r[:2] for r in expected]
+
+
+def test_cli(tree: Path, capsys: pytest.CaptureFixture):
+    (tree / "setup.cfg").write_text("[flake8]\nexclude = build\n")
+
+    assert main(["--count"]) == 1
+
+    output = capsys.readouterr().out.splitlines()
+
+    assert len(output) == 11
+    assert output[0].startswith("./src/package_0/module_15.py:2:1: BAS506 ")
+    assert output[-1] == "10"
+
+    assert main(["--extend-ignore=BAS5", "--jobs=2"]) == 0
+    assert main(["--isolated", "--exit-zero", "build"]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+
+def test_cli_stdin(tree: Path, capsys: pytest.CaptureFixture, monkeypatch):
+    stdin = SimpleNamespace(buffer=io.BytesIO(INVALID.encode()))
+    monkeypatch.setattr("sys.stdin", stdin)
+
+    assert main(["--stdin-display-name=module.py", "-"]) == 1
+    assert capsys.readouterr().out.startswith("module.py:2:1: BAS506 ")
+
+
+@pytest.mark.parametrize("exception", [OSError, ValueError, RuntimeError])
+def test_cli_errors(
+    tree: Path,
+    capsys: pytest.CaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    exception: type,
+):
+    def run(self: Runner, paths: list[str]) -> None:
+        raise exception("Failed")
+
+    monkeypatch.setattr(Runner, "run", run)
+
+    # Errors of a run are reported the same way with or without --rev
+    with pytest.raises(SystemExit) as info:
+        main(["src"])
+
+    assert info.value.code == 2
+    assert capsys.readouterr().err.endswith("error: Failed\n")
+
+
+def test_cli_shards(tree: Path, capsys: pytest.CaptureFixture):
+    (tree / "setup.cfg").write_text("[flake8]\nexclude = build\n")
+    main([])
+    expected = capsys.readouterr().out
+
+    for index in (1, 2, 3):
+        main([f"--shard={index}/3", f"--results=results/{index}.json"])
+
+    capsys.readouterr()
+
+    assert main(["merge", *(f"results/{i}.json" for i in (3, 1, 2))]) == 1
+    assert capsys.readouterr().out == expected
+
+    with pytest.raises(SystemExit):
+        main(["merge", "results/1.json", "results/3.json"])
+
+    with pytest.raises(SystemExit):
+        main(["--shard=4/3"])
+
+
+def test_cli_shards_same_position(
+    tree: Path, capsys: pytest.CaptureFixture, file_fixture: Callable
+):
+    # Two errors at the same position, reported in the order they were found
+    source = file_fixture("overlapping_errors.py").read_text()
+    (tree / "src" / "overlapping.py").write_text(source)
+    main(["src"])
+    expected = capsys.readouterr().out
+
+    for index in (1, 2):
+        main([f"--shard={index}/2", f"--results=results/{index}.json", "src"])
+
+    capsys.readouterr()
+
+    assert main(["merge", "results/2.json", "results/1.json"]) == 1
+    assert capsys.readouterr().out == expected
+
+
+def test_cli_benchmark(tree: Path, capsys: pytest.CaptureFixture):
+    main(["--benchmark", "--exit-zero", "--jobs=2", "src/package_0"])
+    output = capsys.readouterr().out.splitlines()
+    index = next(i for i, line in enumerate(output) if "seconds elapsed" in line)
+
+    workers = output[index + 1 :]  # noqa: E203
+
+    assert index == 4
+    assert " seconds discovery of 7 files in 1 directories" in output[3]
+    assert 1 <= len(workers) <= 2
+    assert all(" seconds idle of worker " in line for line in workers)
+
+
+@pytest.mark.parametrize(
+    "value, expected", (("512", 512), ("64k", 64 << 10), ("2G", 2 << 30))
+)
+def test_size_argument(value: str, expected: int):
+    assert size_argument(value) == expected
+
+
+def test_cli_memory_limit(tree: Path, capsys: pytest.CaptureFixture):
+    (tree / "setup.cfg").write_text("[flake8]\nexclude = build\n")
+    main([])
+    expected = capsys.readouterr().out
+
+    assert main(["--memory-limit=1G", "--jobs=2"]) == 1
+    assert capsys.readouterr().out == expected
+
+    with pytest.raises(SystemExit):
+        main(["--memory-limit=1T"])
+
+    with pytest.raises(SystemExit):
+        main(["--recycle-after=10", "--pool=thread"])
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="Requires Python 3.11+")
+def test_recycle_after(tree: Path):
+    runner = Runner(Options(), jobs=2, recycle_after=5)
+    results = runner.run(["src"])
+
+    assert len(results) == 20
+    # Each worker process is replaced after exactly 5 files
+    assert len(runner.stats.workers()) == 4
+    assert all(w.files == 5 for w in runner.stats.workers())
@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.api import check_chunks
+from flake8_bas.scheduler import (
+    FILE_COST,
+    MEMORY_PER_BYTE,
+    TARGET_COST,
+    WORKER_MEMORY,
+    ChunkTiming,
+    RunStats,
+    batched,
+    chunk_memory,
+    memory_workers,
+    schedule,
+)
+
+
+def create_files(directory: Path, sizes: list[int]) -> list[str]:
+    """
+    Creates files of the given sizes.
+
+    :param directory: target directory
+    :param sizes: sizes in bytes
+    :return: file paths
+    """
+    files = []
+
+    for index, size in enumerate(sizes):
+        files.append(str(directory / f"module_{index}.py"))
+        Path(files[-1]).write_bytes(b"#" * size)
+
+    return files
+
+
+def test_schedule_largest_first(tmp_path: Path):
+    files = create_files(tmp_path, [0] * 500 + [TARGET_COST * 4, TARGET_COST * 2])
+    chunks = schedule(files, 2, 64)
+
+    assert chunks[0] == [files[500]]
+    assert chunks[1] == [files[501]]
+    assert sorted(f for c in chunks for f in c) == sorted(files)
+
+
+def test_schedule_batches_small_files(tmp_path: Path):
+    files = create_files(tmp_path, [0] * 1000)
+    chunks = schedule(files, 1, 1000)
+
+    assert len(chunks) == -(-1000 * FILE_COST // TARGET_COST)
+    assert all(len(c) == TARGET_COST // FILE_COST for c in chunks[:-1])
+    assert max(len(c) for c in schedule(files, 1, 16)) == 16
+
+
+def test_schedule_balances_few_files(tmp_path: Path):
+    files = create_files(tmp_path, [100] * 16)
+
+    assert len(schedule(files, 2, 64)) == 8
+    assert schedule([], 2, 64) == []
+
+
+def test_batched():
+    sizes = [10] * 5 + [TARGET_COST * 2] + [10] * 3
+    chunks = list(batched(sizes, 4, lambda size: size + FILE_COST))
+
+    # Order is kept, a big item ends the chunk before it and gets a chunk of its own
+    assert chunks == [[10] * 4, [10], [TARGET_COST * 2], [10] * 3]
+    assert list(batched([], 4, len)) == []
+
+
+def test_run_stats(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("flake8_bas.scheduler.time.monotonic", lambda: 10.0)
+    stats = RunStats()
+    stats.record(ChunkTiming("b", 10.0, 12.0, 3))
+    stats.record(ChunkTiming("a", 10.5, 11.0, 1))
+    stats.record(ChunkTiming("b", 12.0, 13.0, 2))
+    stats.finished = 14.0
+
+    assert stats.elapsed == 4.0
+    assert [tuple(w) for w in stats.workers()] == [
+        ("a", 1, 1, 0.5, 3.5),
+        ("b", 2, 5, 3.0, 1.0),
+    ]
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_check_chunks_stats(workers: int):
+    chunks = [
+        [(f"{c}-{i}.py", "import os\nif os:\n    pass\n") for i in range(3)]
+        for c in range(4)
+    ]
+    stats = RunStats()
+    results = list(check_chunks(chunks, workers, stats=stats))
+
+    assert len(results) == 12
+    assert all(r.errors for r in results)
+    assert len(stats.timings) == 4
+    assert sum(w.files for w in stats.workers()) == 12
+    assert all(w.busy >= 0 and w.idle >= 0 for w in stats.workers())
+
+
+def test_chunk_memory(tmp_path: Path):
+    files = create_files(tmp_path, [10, 300, 20])
+
+    assert chunk_memory(files) == 300 * MEMORY_PER_BYTE
+    assert chunk_memory([("a.py", "x = 1\n"), files[0]]) == 10 * MEMORY_PER_BYTE
+    assert chunk_memory([str(tmp_path / "missing.py")]) == 0
+
+
+@pytest.mark.parametrize(
+    "limit, workers, expected",
+    (
+        (1 << 30, 4, 4),
+        (8 * WORKER_MEMORY, 16, 4),
+        (WORKER_MEMORY, 4, 1),
+    ),
+)
+def test_memory_workers(limit: int, workers: int, expected: int):
+    assert memory_workers(limit, workers) == expected
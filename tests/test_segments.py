@@ -0,0 +1,147 @@
+import ast
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.checker import StatementChecker
+from flake8_bas.processor import check_source, read_lines
+from flake8_bas.segments import (
+    SegmentPool,
+    check_segments,
+    segment_count,
+    split_points,
+    worker_segment_pool,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+BOUNDARY_CHAIN = """import a
+x = 1
+"docstring of x"
+"another one"
+import b
+import c
+"""
+DECORATED = """import a
+@decorator
+def f():
+    pass
+import b
+"""
+BARE_YIELD = """def f():
+    x = yield
+import b
+"""
+LEADING_CONSTANT = """import a
+...
+import b
+"""
+UNTERMINATED_STRING = """x = '''
+\"\"\"
+import a
+'''
+"""
+
+
+def serial(lines: list[str]) -> list:
+    return list(StatementChecker(ast.parse("".join(lines)), lines).run())
+
+
+def segments(lines: list[str], count: int) -> list | None:
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return check_segments(lines, count, executor)
+
+
+@pytest.mark.parametrize("file", sorted(FIXTURES.rglob("*.py")), ids=lambda f: f.name)
+def test_identical_errors(file: Path):
+    lines = read_lines(file.read_bytes())
+
+    for count in range(2, 7):
+        if (errors := segments(lines, count)) is not None:
+            assert errors == serial(lines)
+
+
+def test_identical_errors_concatenated():
+    lines = read_lines("\n".join(f.read_text() for f in sorted(FIXTURES.rglob("*.py"))))
+
+    for count in (2, 3, 5, 8, 13, 21):
+        assert segments(lines, count) == serial(lines)
+
+
+def test_boundary_chain():
+    lines = read_lines(BOUNDARY_CHAIN)
+
+    assert split_points(lines, 50) == [1, 4, 5]
+    assert segments(lines, 50) == serial(lines)
+
+
+def test_decorated():
+    lines = read_lines(DECORATED)
+
+    assert split_points(lines, 50) == [1, 4]
+    assert segments(lines, 50) == serial(lines)
+
+
+@pytest.mark.parametrize(
+    "source", (BARE_YIELD, LEADING_CONSTANT, UNTERMINATED_STRING, "import a\nif\n")
+)
+def test_unresolved(source: str):
+    lines = read_lines(source)
+
+    assert split_points(lines, 50)
+    assert segments(lines, 50) is None
+
+
+def test_split_points():
+    lines = read_lines("x = [\n1,\n]\nif x:\n    pass\nelse:\n    pass\n# a\ny = 1\n")
+
+    assert split_points(lines, 50) == [3, 8]
+    assert split_points(lines, 2) == [8]
+    assert split_points(lines, 1) == []
+
+
+def test_segment_count(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    lines = ["x = 1\n"] * 10
+
+    assert segment_count(lines, None) == 1
+    assert segment_count(lines, 60) == 1
+    assert segment_count(lines, 59) == 4
+    assert segment_count(lines, 59, workers=2) == 2
+
+
+def test_check_source(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 3)
+    source = "\n".join(f.read_text() for f in sorted(FIXTURES.rglob("*.py")))
+
+    assert check_source(source, split_threshold=1000) == check_source(source)
+    assert check_source("x = 1\nif\n" * 100, split_threshold=100)[0].message.startswith(
+        "E999 "
+    )
+
+
+def test_segment_pool():
+    source = "\n".join(f.read_text() for f in sorted(FIXTURES.rglob("*.py")))
+
+    with SegmentPool(2) as pool:
+        assert pool._executor is None
+
+        # Both modules are checked by the same processes
+        assert check_source(source, split_threshold=1000, segment_pool=pool) == (
+            check_source(source)
+        )
+        executor = pool.executor
+        check_source(source, split_threshold=1000, segment_pool=pool)
+
+        assert pool.executor is executor
+
+    assert pool._executor is None
+
+    # A pool sent to a worker is replaced by the worker's own pool
+    worker_pool = pickle.loads(pickle.dumps(pool))
+
+    assert worker_pool is not pool
+    assert worker_pool is worker_segment_pool(2)
+    assert worker_pool.workers == 2
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from flake8_bas.shards import Shard, merge_results, partition, save_results
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    (
+        ("1/1", Shard(1, 1)),
+        ("3/16", Shard(3, 16)),
+        (" 16/16 ", Shard(16, 16)),
+    ),
+)
+def test_parse(value: str, expected: Shard):
+    assert Shard.parse(value) == expected
+    assert str(expected) == value.strip()
+
+
+@pytest.mark.parametrize("value", ("0/3", "4/3", "1", "a/b", "1/-2"))
+def test_parse_invalid(value: str):
+    with pytest.raises(ValueError):
+        Shard.parse(value)
+
+
+def test_partition(tmp_path: Path):
+    sizes = [1000, 700, 300, 300, 200, 200, 100, 100, 50, 50]
+    files = []
+
+    for index, size in enumerate(sizes):
+        files.append(str(tmp_path / f"module_{index}.py"))
+        Path(files[-1]).write_bytes(b"#" * size)
+
+    parts = partition(files, 3)
+    totals = [sum(Path(f).stat().st_size for f in part) for part in parts]
+
+    assert sorted(f for part in parts for f in part) == sorted(files)
+    assert max(totals) - min(totals) <= 100
+    assert partition(reversed(files), 3) == parts
+    assert [Shard(i, 3).select(files) for i in (1, 2, 3)] == parts
+
+
+def test_partition_more_parts_than_files():
+    parts = partition(["a.py", "b.py"], 4)
+
+    assert parts == [["a.py"], ["b.py"], [], []]
+
+
+def test_merge_results(tmp_path: Path):
+    save_results(tmp_path / "2.json", Shard(2, 2), 3, [("b.py", 3, 0, "BAS1")])
+    save_results(
+        tmp_path / "1.json",
+        Shard(1, 2),
+        2,
+        [("b.py", 1, 4, "BAS2"), ("a.py", 9, 0, "BAS3")],
+    )
+
+    assert merge_results([tmp_path / "2.json", tmp_path / "1.json"]) == (
+        5,
+        [("a.py", 9, 0, "BAS3"), ("b.py", 1, 4, "BAS2"), ("b.py", 3, 0, "BAS1")],
+    )
+
+
+@pytest.mark.parametrize(
+    "shards",
+    (
+        ("1/3", "2/3"),
+        ("1/2", "1/2", "2/2"),
+        ("1/2", "2/3"),
+        ("1/1", None),
+    ),
+)
+def test_merge_results_invalid(tmp_path: Path, shards: tuple):
+    files = []
+
+    for index, shard in enumerate(shards):
+        files.append(tmp_path / f"{index}.json")
+        files[-1].write_text(json.dumps({"shard": shard, "files": 1, "errors": []}))
+
+    with pytest.raises(ValueError):
+        merge_results(files)
@@ -0,0 +1,71 @@
+import ast
+
+from flake8_bas.api import check_files, packed_chunk
+from flake8_bas.checker import StatementChecker
+from flake8_bas.journal import JournalEntry
+from flake8_bas.processor import FileResult, check_source
+from flake8_bas.transport import (
+    MESSAGES,
+    RECORD,
+    PackedChunk,
+    pack_chunk,
+    unpack_chunk,
+)
+
+INVALID = "import os\nif os:\n    pass\nx = 1\ndel x\n"
+
+
+def test_messages():
+    source = "".join(
+        f"{keyword}\n" for keyword in ("import os", "x = 1", "pass", "del x")
+    )
+    errors = list(StatementChecker(ast.parse(source), source.splitlines(True)).run())
+
+    assert len(MESSAGES) == len(set(MESSAGES)) == 72
+    assert errors
+    assert all(e.message in MESSAGES for e in errors)
+
+
+def test_round_trip():
+    entry = JournalEntry(10, 20, 30, "digest")
+    results = [
+        FileResult("a.py", check_source(INVALID)),
+        FileResult("b.py", check_source("x = (\n")),
+        FileResult("c.py", [], entry),
+        FileResult("d.py", check_source("if True:\n    pass\nx = [\n")),
+    ]
+    packed = pack_chunk(results)
+
+    assert len(packed.records) == RECORD.size * sum(len(r.errors) for r in results)
+    assert len(packed.extras) == 2
+    assert packed.entries == (None, None, entry, None)
+    assert unpack_chunk([r.filename for r in results], packed) == results
+
+
+def test_round_trip_empty():
+    packed = pack_chunk([FileResult("a.py", []), FileResult("b.py", [])])
+
+    assert packed == PackedChunk(b"", (), None)
+    assert unpack_chunk(["a.py", "b.py"], packed) == [
+        FileResult("a.py", []),
+        FileResult("b.py", []),
+    ]
+
+
+def test_packed_chunk():
+    items = [("a.py", INVALID), ("b.py", "pass\n")]
+    packed = packed_chunk(items, timed=True)
+
+    assert packed.timing.files == 2
+    assert unpack_chunk(["a.py", "b.py"], packed) == [
+        FileResult("a.py", check_source(INVALID)),
+        FileResult("b.py", []),
+    ]
+
+
+def test_check_files_workers():
+    items = [(f"{i}.py", INVALID if i % 3 else "x = (\n") for i in range(30)]
+
+    assert list(check_files(items, workers=2, ordered=True, chunk_size=4)) == list(
+        check_files(items)
+    )